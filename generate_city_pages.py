@@ -1,87 +1,54 @@
+import argparse
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tools"))
+
+from city_registry import load_cities
+from render_pool import render_all
+from service_area_links import apply_service_area_links
+from template_compiler import load_template
 
 TEMPLATE_FILE = "city-template.html"
 OUTPUT_ROOT = "service-areas"
 
-cities = [
-    {"slug": "des-moines-ia", "name": "Des Moines", "nearby": "West Des Moines and Altoona"},
-    {"slug": "west-des-moines-ia", "name": "West Des Moines", "nearby": "Clive and Waukee"},
-    {"slug": "ankeny-ia", "name": "Ankeny", "nearby": "Alleman and Polk City"},
-    {"slug": "altoona-ia", "name": "Altoona", "nearby": "Bondurant and Pleasant Hill"},
-    {"slug": "urbandale-ia", "name": "Urbandale", "nearby": "Clive and Johnston"},
-    {"slug": "clive-ia", "name": "Clive", "nearby": "Urbandale and West Des Moines"},
-    {"slug": "johnston-ia", "name": "Johnston", "nearby": "Grimes and Urbandale"},
-    {"slug": "waukee-ia", "name": "Waukee", "nearby": "Clive and Adel"},
-    {"slug": "grimes-ia", "name": "Grimes", "nearby": "Johnston and Dallas Center"},
-    {"slug": "pleasant-hill-ia", "name": "Pleasant Hill", "nearby": "Altoona and Des Moines"},
-    {"slug": "norwalk-ia", "name": "Norwalk", "nearby": "West Des Moines and Cumming"},
-    {"slug": "indianola-ia", "name": "Indianola", "nearby": "Carlisle and Norwalk"},
-    {"slug": "carlisle-ia", "name": "Carlisle", "nearby": "Pleasant Hill and Indianola"},
-    {"slug": "bondurant-ia", "name": "Bondurant", "nearby": "Altoona and Elkhart"},
-    {"slug": "adel-ia", "name": "Adel", "nearby": "Dallas Center and Van Meter"},
-    {"slug": "dallas-center-ia", "name": "Dallas Center", "nearby": "Grimes and Adel"},
-    {"slug": "van-meter-ia", "name": "Van Meter", "nearby": "Waukee and Adel"},
-    {"slug": "winterset-ia", "name": "Winterset", "nearby": "Earlham and Patterson"},
-    {"slug": "perry-ia", "name": "Perry", "nearby": "Dallas Center and Minburn"},
-    {"slug": "boone-ia", "name": "Boone", "nearby": "Ames and Ogden"},
-    {"slug": "ames-ia", "name": "Ames", "nearby": "Gilbert and Nevada"},
-    {"slug": "nevada-ia", "name": "Nevada", "nearby": "Ames and Maxwell"},
-    {"slug": "huxley-ia", "name": "Huxley", "nearby": "Slater and Cambridge"},
-    {"slug": "story-city-ia", "name": "Story City", "nearby": "Roland and Ames"},
-    {"slug": "marshalltown-ia", "name": "Marshalltown", "nearby": "State Center and Melbourne"},
-    {"slug": "newton-ia", "name": "Newton", "nearby": "Colfax and Baxter"},
-    {"slug": "colfax-ia", "name": "Colfax", "nearby": "Prairie City and Mitchellville"},
-    {"slug": "prairie-city-ia", "name": "Prairie City", "nearby": "Monroe and Colfax"},
-    {"slug": "monroe-ia", "name": "Monroe", "nearby": "Prairie City and Reasnor"},
-    {"slug": "pella-ia", "name": "Pella", "nearby": "Otley and New Sharon"},
-    {"slug": "oskaloosa-ia", "name": "Oskaloosa", "nearby": "University Park and New Sharon"},
-    {"slug": "grinnell-ia", "name": "Grinnell", "nearby": "Brooklyn and Newton"},
-    {"slug": "knoxville-ia", "name": "Knoxville", "nearby": "Pella and Melcher-Dallas"},
-    {"slug": "chariton-ia", "name": "Chariton", "nearby": "Corydon and Lucas"},
-    {"slug": "madrid-ia", "name": "Madrid", "nearby": "Slater and Perry"},
-    {"slug": "polk-city-ia", "name": "Polk City", "nearby": "Alleman and Ankeny"},
-    {"slug": "slater-ia", "name": "Slater", "nearby": "Huxley and Madrid"},
-    {"slug": "melbourne-ia", "name": "Melbourne", "nearby": "Marshalltown and Baxter"},
-    {"slug": "baxter-ia", "name": "Baxter", "nearby": "Newton and Collins"},
-    {"slug": "sully-ia", "name": "Sully", "nearby": "Lynnville and Grinnell"},
-    {"slug": "lynnville-ia", "name": "Lynnville", "nearby": "Sully and Grinnell"},
-    {"slug": "earlham-ia", "name": "Earlham", "nearby": "Stuart and Dexter"},
-    {"slug": "redfield-ia", "name": "Redfield", "nearby": "Earlham and Dexter"},
-    {"slug": "stuart-ia", "name": "Stuart", "nearby": "Redfield and Menlo"},
-    {"slug": "greenfield-ia", "name": "Greenfield", "nearby": "Stuart and Fontanelle"},
-    {"slug": "osceola-ia", "name": "Osceola", "nearby": "Murray and Saint Charles"},
-    {"slug": "jefferson-ia", "name": "Jefferson", "nearby": "Grand Junction and Scranton"},
-    {"slug": "eldora-ia", "name": "Eldora", "nearby": "Union and Iowa Falls"},
-    {"slug": "belle-plaine-ia", "name": "Belle Plaine", "nearby": "Marengo and Tama"},
-    {"slug": "corydon-ia", "name": "Corydon", "nearby": "Chariton and Allerton"},
-]
+# Template placeholder -> city record field (records: data/cities.json, see tools/city_registry.py)
+PLACEHOLDER_FIELDS = {"CITY_NAME": "name", "CITY_SLUG": "slug", "NEARBY_TOWNS": "nearby"}
 
-def main():
-    with open(TEMPLATE_FILE, "r", encoding="utf-8") as f:
-        template = f.read()
+def render_city_page(template, city):
+    """Fill the compiled city template's placeholders for one city record."""
+    return template.render({name: city[field] for name, field in PLACEHOLDER_FIELDS.items()})
 
-    os.makedirs(OUTPUT_ROOT, exist_ok=True)
+_template = None
+
+def _set_template(template):
+    global _template
+    _template = template
 
-    for city in cities:
-        slug = city["slug"]
-        name = city["name"]
-        nearby = city["nearby"]
+def _render_city(city):
+    html = render_city_page(_template, city)
+    return city["slug"], apply_service_area_links(html, load_cities()) or html
 
-        html = (
-            template
-            .replace("{{CITY_NAME}}", name)
-            .replace("{{CITY_SLUG}}", slug)
-            .replace("{{NEARBY_TOWNS}}", nearby)
-        )
+def _write_city(result):
+    slug, html = result
+    out_dir = os.path.join(OUTPUT_ROOT, slug)
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = os.path.join(out_dir, "index.html")
 
-        out_dir = os.path.join(OUTPUT_ROOT, slug)
-        os.makedirs(out_dir, exist_ok=True)
-        out_path = os.path.join(out_dir, "index.html")
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(html)
 
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write(html)
+    print(f"Generated {out_path}")
+
+def main(jobs=1):
+    template = load_template(TEMPLATE_FILE)
+
+    os.makedirs(OUTPUT_ROOT, exist_ok=True)
 
-        print(f"Generated {out_path}")
+    render_all(load_cities().records, _render_city, _write_city, jobs=jobs,
+               initializer=_set_template, initargs=(template,))
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Generate service-area pages from city-template.html.")
+    parser.add_argument("--jobs", type=int, default=1, help="render pages across N worker processes")
+    main(jobs=parser.parse_args().jobs)
@@ -1,4 +1,11 @@
+import argparse
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tools"))
+
+from city_registry import load_cities
+from render_pool import render_all
 
 # -----------------------------
 # SETTINGS
@@ -101,15 +108,6 @@ Phone: (515) 329-5128</p>
     }
 }
 
-# 50-city master list (same as installed pages)
-CITY_LIST = [
-    "des-moines-ia","west-des-moines-ia","ankeny-ia","altoona-ia","urbandale-ia","clive-ia","johnston-ia","waukee-ia","grimes-ia",
-    "pleasant-hill-ia","norwalk-ia","indianola-ia","carlisle-ia","bondurant-ia","adel-ia","dallas-center-ia","van-meter-ia","winterset-ia",
-    "perry-ia","boone-ia","ames-ia","nevada-ia","huxley-ia","story-city-ia","marshalltown-ia","newton-ia","colfax-ia","prairie-city-ia",
-    "monroe-ia","pella-ia","oskaloosa-ia","grinnell-ia","knoxville-ia","chariton-ia","madrid-ia","polk-city-ia","slater-ia","melbourne-ia",
-    "baxter-ia","sully-ia","lynnville-ia","earlham-ia","redfield-ia","stuart-ia","greenfield-ia"
-]
-
 # Template for all city pages
 CITY_TEMPLATE = """
 <!DOCTYPE html>
@@ -217,18 +215,22 @@ def generate_legal_pages():
 # GENERATE CITY PAGES
 # -----------------------------
 
-def generate_city_pages():
-    base_path = os.path.join(OUTPUT_DIR, "service-areas")
-    os.makedirs(base_path, exist_ok=True)
+def render_city_page(city):
+    return city["slug"], CITY_TEMPLATE.format(city_title=f"{city['name']}, IA")
 
-    for slug in CITY_LIST:
-        city_title = slug.replace("-", " ").replace(" ia", ", IA").title()
+def write_city_page(result):
+    slug, html = result
+    city_path = os.path.join(OUTPUT_DIR, "service-areas", slug)
+    os.makedirs(city_path, exist_ok=True)
 
-        city_path = os.path.join(base_path, slug)
-        os.makedirs(city_path, exist_ok=True)
+    with open(os.path.join(city_path, "index.html"), "w", encoding="utf8") as f:
+        f.write(html)
 
-        with open(os.path.join(city_path, "index.html"), "w", encoding="utf8") as f:
-            f.write(CITY_TEMPLATE.format(city_title=city_title))
+def generate_city_pages(jobs=1):
+    base_path = os.path.join(OUTPUT_DIR, "service-areas")
+    os.makedirs(base_path, exist_ok=True)
+
+    render_all(load_cities().records, render_city_page, write_city_page, jobs=jobs)
 
     print("✔ City pages created.")
 
@@ -238,6 +240,10 @@ def generate_city_pages():
 # -----------------------------
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate legal and city pages.")
+    parser.add_argument("--jobs", type=int, default=1, help="render city pages across N worker processes")
+    args = parser.parse_args()
+
     generate_legal_pages()
-    generate_city_pages()
+    generate_city_pages(jobs=args.jobs)
     print("\n🎉 All pages have been generated uniformly.")
@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+from faq_engine import Faq, FaqEngine, compile_rules, render_items  # noqa: E402
+
+def test_question_and_answer_markup_is_escaped():
+    items = render_items([Faq("Do you do A & B <fast>?", "Yes <b>now</b> & later")])
+    assert "Do you do A &amp; B &lt;fast&gt;?" in items[0]
+    assert "Yes &lt;b&gt;now&lt;/b&gt; &amp; later" in items[0]
+    assert "<fast>" not in items[0] and "<b>" not in items[0]
+
+def test_general_faqs_are_escaped_on_city_pages():
+    engine = FaqEngine([("only", [(None, "Why {name}?", "Because <i>{name}</i>.")])],
+                       [Faq("Gutters & guards?", "Yes.")])
+    html = engine.render({"name": "Ames & Co"}).html
+    assert "Why Ames &amp; Co?" in html
+    assert "Because &lt;i&gt;Ames &amp; Co&lt;/i&gt;." in html
+    assert "Gutters &amp; guards?" in html
+    assert "Gutter Guards in Ames &amp; Co</h2>" in html
+
+def test_unconditional_case_must_be_last():
+    rules = [("slot", [(None, "Always?", "Yes."), (("distance", "==", "local"), "Local?", "Yes."),
+                         (None, "Otherwise?", "Yes.")])]
+    with pytest.raises(SystemExit, match="case 1 has no condition"):
+        compile_rules(rules)
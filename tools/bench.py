@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Build benchmark: per-stage wall time, memory and bytes written on synthetic sites.
+
+For each size (50, 500 and 5,000 cities by default) the site is copied to a
+temporary directory without its service-area pages, its data/cities.json is
+grown to that size by cloning the real city records under new slugs, and every registered build stage is run over all
+pages in a fresh process. Results are compared against a stored baseline.
+
+Memory: the process's peak RSS is reported for the whole run. A stage's
+"peak_growth_mb" is how far that stage raised the peak (0 when it fit in
+memory an earlier stage had already used), not the stage's own footprint.
+
+Usage:
+  python tools/bench.py                          # run and compare to the baseline
+  python tools/bench.py --sizes 50 500           # only these tree sizes
+  python tools/bench.py --repeat 3               # keep the best of 3 runs per size
+  python tools/bench.py --threshold 0.10         # flag anything >10% slower/larger
+  python tools/bench.py --save-baseline          # store this run as the new baseline
+
+Exits with status 1 when a stage regresses past the threshold.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from city_registry import load_cities
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+BENCH_DIR = SITE_ROOT / ".build-cache" / "bench"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+RESULTS_PATH = BENCH_DIR / "latest.json"
+
+DEFAULT_SIZES = [50, 500, 5000]
+DEFAULT_THRESHOLD = 0.20
+
+# Stages faster than this are too noisy to judge against a percentage threshold.
+MIN_COMPARABLE_SECONDS = 0.05
+
+# Not needed to build pages (and service-areas is replaced by the synthetic cities).
+COPY_IGNORE = shutil.ignore_patterns(
+    ".git", "audit", ".build-cache", ".build-manifest.json", "__pycache__", "service-areas", "*.pdf",
+)
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+# -----------------------------
+# WORKER (runs inside the synthetic tree)
+# -----------------------------
+
+def run_worker(count: int) -> dict:
+    import build
+    import responsive_images
+    from pipeline import BuildContext, discover_pages, normalize_newlines, write_pages
+
+    stages = {}
+    peak = peak_rss_mb()
+
+    def record(name: str, t0: float, pages: int, bytes_written: int) -> None:
+        nonlocal peak
+        now = peak_rss_mb()
+        stages[name] = {
+            "wall_s": time.perf_counter() - t0,
+            "peak_growth_mb": now - peak,
+            "pages": pages,
+            "bytes_written": bytes_written,
+        }
+        peak = now
+
+    # As in build.py: the image records the responsive_images stage reads are written first,
+    # so a fresh checkout (no .build-cache) benchmarks the same as a built one.
+    t0 = time.perf_counter()
+    responsive_images.encode_images()
+    record("encode_images", t0, 0, 0)
+
+    t0 = time.perf_counter()
+    city_pages = [build.CITIES.page_rel(slug) for slug in build.CITIES.slugs]
+    ctx = BuildContext(pages=discover_pages(extra=city_pages))
+    record("read_pages", t0, len(ctx.pages), 0)
+
+    for stage in build.STAGES:
+        pages = 0
+        bytes_written = 0
+        t0 = time.perf_counter()
+        for page in ctx.pages.values():
+            if not stage.applies(page):
+                continue
+            html = stage.fn(page, ctx)
+            if html != page.html:
+                # What the standalone script would have written for this page.
+                bytes_written += len(normalize_newlines(html).encode("utf-8"))
+            page.html = html
+            pages += 1
+        record(stage.name, t0, pages, bytes_written)
+
+    t0 = time.perf_counter()
+    written = write_pages(ctx)
+    record("write_pages", t0, len(written), sum(p.path.stat().st_size for p in written))
+
+    return {
+        "cities": count,
+        "stages": stages,
+        "total_wall_s": sum(s["wall_s"] for s in stages.values()),
+        "peak_rss_mb": peak_rss_mb(),
+        "bytes_written": stages["write_pages"]["bytes_written"],
+    }
+
+# -----------------------------
+# DRIVER
+# -----------------------------
+
+def synthetic_cities(base: list[dict], count: int) -> list[dict]:
+    """`count` city records cloned from `base`; copies get a numbered slug and name."""
+    out = []
+    for i in range(count):
+        src = base[i % len(base)]
+        copy_no = i // len(base)
+        if copy_no == 0:
+            out.append(dict(src))
+            continue
+        stem = src["slug"].removesuffix("-ia")
+        out.append(dict(src, slug=f"{stem}-{copy_no + 1}-ia", name=f"{src['name']} {copy_no + 1}"))
+    return out
+
+def run_size(count: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix=f"igg-bench-{count}-") as tmp:
+        tree = Path(tmp) / "site"
+        shutil.copytree(SITE_ROOT, tree, ignore=COPY_IGNORE)
+        # Growing the site is only a data change: the copy gets a bigger city registry.
+        cities = synthetic_cities(load_cities().records, count)
+        (tree / "data" / "cities.json").write_text(
+            json.dumps(cities, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        proc = subprocess.run(
+            [sys.executable, str(tree / "tools" / "bench.py"), "--worker", str(count)],
+            cwd=tree, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise SystemExit(f"Benchmark worker failed for {count} cities:\n{proc.stderr}")
+        # Stage functions may print; the result is the last line.
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def best_of(runs: list[dict]) -> dict:
+    """Per-stage minimum wall time across repeated runs (memory and bytes are deterministic enough)."""
+    best = runs[0]
+    for run in runs[1:]:
+        for name, stage in run["stages"].items():
+            if stage["wall_s"] < best["stages"][name]["wall_s"]:
+                best["stages"][name]["wall_s"] = stage["wall_s"]
+    best["total_wall_s"] = sum(s["wall_s"] for s in best["stages"].values())
+    return best
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for size, result in current["sizes"].items():
+        base = baseline.get("sizes", {}).get(size)
+        if base is None:
+            continue
+        checks = [("total", "wall_s", result["total_wall_s"], base["total_wall_s"]),
+                  ("total", "peak_rss_mb", result["peak_rss_mb"], base["peak_rss_mb"])]
+        for name, stage in result["stages"].items():
+            base_stage = base["stages"].get(name)
+            if base_stage is not None:
+                checks.append((name, "wall_s", stage["wall_s"], base_stage["wall_s"]))
+        for name, metric, now, before in checks:
+            if metric == "wall_s" and before < MIN_COMPARABLE_SECONDS:
+                continue
+            if before > 0 and now > before * (1 + threshold):
+                regressions.append(
+                    f"{size} cities / {name}: {metric} {before:.3f} -> {now:.3f} (+{(now / before - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+def print_report(results: dict, baseline: dict | None) -> None:
+    for size, result in results["sizes"].items():
+        base = (baseline or {}).get("sizes", {}).get(size, {}).get("stages", {})
+        print(f"\n{size} cities")
+        print(f"  {'stage':<24} {'pages':>6} {'wall s':>9} {'vs base':>8} {'peak MB':>9} {'written':>12}")
+        for name, s in result["stages"].items():
+            before = base.get(name, {}).get("wall_s")
+            delta = f"{(s['wall_s'] / before - 1) * 100:+.0f}%" if before else ""
+            print(f"  {name:<24} {s['pages']:>6} {s['wall_s']:>9.3f} {delta:>8} "
+                  f"{s['peak_growth_mb']:>+9.1f} {s['bytes_written']:>12,}")
+        print(f"  {'total':<24} {'':>6} {result['total_wall_s']:>9.3f} {'':>8} "
+              f"{result['peak_rss_mb']:>9.1f} {result['bytes_written']:>12,}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the build stages on synthetic city trees.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="city counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per size; the fastest is kept")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown/growth as a fraction (default 0.20)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        print(json.dumps(run_worker(args.worker)))
+        return
+
+    results = {"python": platform.python_version(), "machine": platform.machine(), "sizes": {}}
+    for count in args.sizes:
+        print(f"Benchmarking {count} cities...", flush=True)
+        runs = [run_size(count) for _ in range(max(1, args.repeat))]
+        results["sizes"][str(count)] = best_of(runs)
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.is_file() else None
+    print_report(results, baseline)
+
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    RESULTS_PATH.write_text(json.dumps(results, indent=1) + "\n", encoding="utf-8")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=1) + "\n", encoding="utf-8")
+        print(f"\nSaved baseline: {args.baseline}")
+        return
+
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one.")
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nREGRESSIONS (threshold {args.threshold:.0%}):")
+        for line in regressions:
+            print(f"  {line}")
+        raise SystemExit(1)
+    print(f"\nOK: no stage regressed more than {args.threshold:.0%}.")
+
+if __name__ == "__main__":
+    main()
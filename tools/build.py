@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Iowa Gutter Guards - single-pass site build.
+
+Replaces running these scripts one after another:
+  generate_city_pages.py, tools/service_area_links.py, tools/fix_site_content.py,
+  tools/enhance_all_pages.py, update_faqs.py, tools/expand_home_faq_fixed.py, tools/inject_schema.py,
+  tools/wire_forms_to_api_lead.py, tools/finalize_pages.py, tools/favicons.py,
+  tools/responsive_images.py, tools/critical_css.py
+
+Each script's transform is registered as a stage below (in the same order).
+Pages are read once, every stage runs in memory, and each page is written once.
+City pages are rendered from city-template.html (the homepage's layout with
+{{CITY_NAME}}/{{CITY_SLUG}}/{{NEARBY_TOWNS}} slots), never from the built
+index.html. Every other page is both the build's output and its input, so
+every stage must leave its own output unchanged: building a freshly built
+tree writes nothing (tools/check_build.py checks this).
+
+Builds are incremental: .build-manifest.json records a hash of each page's
+inputs (template, per-city data records, stage versions, shared assets) and
+only pages whose inputs changed are rebuilt. Bump a stage's `version` when its
+transform changes.
+
+Usage:
+  python tools/build.py                 # incremental build
+  python tools/build.py --force         # rebuild every page
+  python tools/build.py --jobs 8        # render pages across 8 worker processes
+  python tools/build.py --list          # show registered stages
+  python tools/build.py --dry-run       # run stages, report, write nothing
+  python tools/build.py --profile       # time every transform (see tools/profiling.py)
+  python tools/build.py --compress      # also write .gz/.br sidecars (tools/compress_assets.py; local only)
+  python tools/build.py --no-prune      # ship styles.min.css without removing unused rules
+  python tools/build.py --audit-fail-on MissingTitle   # exit 1 on an audit issue (repeatable; for CI)
+
+After the stages, the site-level steps run on the full page set: the favicon
+set is checked and optimized (tools/favicons.py), unused CSS is pruned (tools/prune_css.py), the stylesheet and script are published under
+content-hashed names with every reference rewritten
+(tools/fingerprint_assets.py), sitemap.xml is written (tools/sitemap.py), and
+pages are written; then every page is audited into audit/ (tools/site_audit.py),
+internal links and anchors are checked (tools/check_links.py), and near-duplicate
+city pages are reported (tools/near_duplicates.py). With --compress, text
+assets are also pre-compressed (tools/compress_assets.py); the sidecars are
+git-ignored, so the deployed site never has them.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from pipeline import (
+    SITE_ROOT, STAGES, BuildContext, Manifest, Page, discover_pages, normalize_newlines,
+    record_hash, register_stage, run_stages, write_pages,
+)
+
+sys.path.append(str(SITE_ROOT))
+
+import generate_city_pages
+import update_faqs
+import enhance_all_pages
+import expand_home_faq_fixed
+import finalize_pages
+import fix_site_content
+import inject_schema
+import wire_forms_to_api_lead
+import check_links
+import compress_assets
+import critical_css
+import favicons
+import fingerprint_assets
+import near_duplicates
+import profiling
+import prune_css
+import responsive_images
+import service_area_links
+import site_audit
+import sitemap
+from city_registry import load_cities
+from faq_store import load_faqs
+from template_compiler import compile_template
+
+HOME = "index.html"
+TEMPLATE = Path(generate_city_pages.TEMPLATE_FILE).as_posix()
+CITIES = load_cities()
+# styles.min.css is written by prune_css from the built pages, so its source is hashed instead.
+SHARED_ASSETS = [prune_css.SOURCE_CSS, "assets/js/tracking.js"]
+
+# Modules whose functions are timed by --profile.
+PROFILED_MODULES = [
+    generate_city_pages, service_area_links, fix_site_content, update_faqs, expand_home_faq_fixed,
+    enhance_all_pages, inject_schema, wire_forms_to_api_lead, finalize_pages,
+    favicons, responsive_images, critical_css,
+]
+
+def template_fields(slug: str) -> dict:
+    # Only what city-template.html uses; the paragraph and FAQ profile are inputs of later stages.
+    return {field: CITIES[slug][field] for field in generate_city_pages.PLACEHOLDER_FIELDS.values()}
+
+def is_template(page: Page) -> bool:
+    # city-template.html is a source: stages render from it, they never rewrite it.
+    return "template" in Path(page.rel).name.lower()
+
+def is_index_or_top_level(page: Page) -> bool:
+    # Same selection as the *.html + **/index.html globs in the scripts.
+    return not is_template(page) and ("/" not in page.rel or page.rel.endswith("/index.html"))
+
+# -----------------------------
+# STAGES (run in this order)
+# -----------------------------
+
+@register_stage(
+    "generate_city_pages",
+    applies=lambda p: p.city_slug in CITIES,
+    inputs=lambda p, ctx: record_hash(template_fields(p.city_slug)) + ctx.file_hash(TEMPLATE),
+)
+def stage_generate_city_pages(page: Page, ctx: BuildContext) -> str:
+    template = compile_template(ctx.source_of(TEMPLATE))
+    return generate_city_pages.render_city_page(template, CITIES[page.city_slug])
+
+@register_stage(
+    "service_area_links",
+    applies=lambda p: p.rel == HOME or p.city_slug in CITIES,
+    inputs=lambda p, ctx: record_hash([(city["slug"], city["name"]) for city in CITIES]),
+)
+def stage_service_area_links(page: Page, ctx: BuildContext) -> str:
+    html = service_area_links.apply_service_area_links(page.html, CITIES)
+    if html is None:
+        print(f"Warning: Could not find the service-area list in {page.rel}")
+        return page.html
+    return html
+
+@register_stage(
+    "fix_site_content",
+    applies=lambda p: p.rel == HOME or (p.city_slug or "").endswith("-ia"),
+    inputs=lambda p, ctx: record_hash((CITIES.get(p.city_slug) or {}).get("paragraph")),
+    version=3,
+)
+def stage_fix_site_content(page: Page, ctx: BuildContext) -> str:
+    # Schema is left to the inject_schema stage (the standalone script applies it itself).
+    if page.rel == HOME:
+        return fix_site_content.fix_home_page(page.html)
+    if page.city_slug not in CITIES:
+        raise SystemExit(f"Missing data/cities.json entries for: {[page.city_slug]}")
+    return fix_site_content.fix_city_page(page.html, page.city_slug)
+
+@register_stage(
+    "enhance_all_pages",
+    applies=lambda p: not is_template(p),
+    inputs=lambda p, ctx: "".join(ctx.file_hash(rel) for rel in SHARED_ASSETS),
+    version=3,
+)
+def stage_enhance_all_pages(page: Page, ctx: BuildContext) -> str:
+    return enhance_all_pages.enhance_html(page.html, page.path)
+
+@register_stage(
+    "update_faqs",
+    applies=lambda p: p.rel == HOME or p.city_slug in CITIES,
+    # The homepage only loses the trust badges enhance_all_pages adds; its FAQs are the next stage's input.
+    inputs=lambda p, ctx: "" if p.rel == HOME else record_hash(
+        [update_faqs.get_city_info(p.city_slug), load_faqs().section("city"), update_faqs.CITY_FAQ_RULES]),
+    version=2,
+)
+def stage_update_faqs(page: Page, ctx: BuildContext) -> str:
+    if page.rel == HOME:
+        return update_faqs.strip_trust_badges(page.html)
+    html = update_faqs.apply_city_faqs(page.html, page.city_slug)
+    if html is None:
+        print(f"Warning: Could not find FAQ section in {page.rel}")
+        return page.html
+    return html
+
+@register_stage(
+    "expand_home_faq",
+    applies=lambda p: p.rel == HOME,
+    inputs=lambda p, ctx: record_hash(load_faqs().section("home")),
+)
+def stage_expand_home_faq(page: Page, ctx: BuildContext) -> str:
+    html, dropped = expand_home_faq_fixed.apply_home_faqs(page.html)
+    for question in dropped:
+        print(f"Warning: {page.rel} FAQ not in data/faqs.json, removed: {question}")
+    return html
+
+@register_stage("inject_schema", applies=is_index_or_top_level, version=2)
+def stage_inject_schema(page: Page, ctx: BuildContext) -> str:
+    return inject_schema.apply_schema(page.html, page.rel)
+
+@register_stage("wire_forms_to_api_lead", applies=is_index_or_top_level)
+def stage_wire_forms(page: Page, ctx: BuildContext) -> str:
+    return wire_forms_to_api_lead.wire_lead_form(normalize_newlines(page.html))
+
+@register_stage("finalize_pages", applies=lambda p: not is_template(p))
+def stage_finalize_pages(page: Page, ctx: BuildContext) -> str:
+    return finalize_pages.finalize_html(page.html)
+
+@register_stage("favicons", applies=lambda p: not is_template(p), version=2)
+def stage_favicons(page: Page, ctx: BuildContext) -> str:
+    return favicons.dedupe_favicon_links(page.html, page.rel)
+
+@register_stage(
+    "responsive_images",
+    applies=lambda p: not is_template(p),
+    inputs=lambda p, ctx: ctx.file_hash(responsive_images.RECORDS_REL),
+)
+def stage_responsive_images(page: Page, ctx: BuildContext) -> str:
+    # Written by encode_images() before the stages run.
+    records = json.loads(ctx.asset_text(responsive_images.RECORDS_REL))
+    return responsive_images.responsive_html(page.html, page.rel, records)
+
+@register_stage(
+    "critical_css",
+    applies=lambda p: not is_template(p),
+    inputs=lambda p, ctx: ctx.file_hash(critical_css.SOURCE_CSS),
+)
+def stage_critical_css(page: Page, ctx: BuildContext) -> str:
+    return critical_css.inline_critical_css(page.html, ctx.asset_text(critical_css.SOURCE_CSS))
+
+# -----------------------------
+# MAIN
+# -----------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the site in a single pass.")
+    parser.add_argument("--list", action="store_true", help="list registered stages and exit")
+    parser.add_argument("--only", action="append", metavar="STAGE", help="run only this stage (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="run every stage but write nothing")
+    parser.add_argument("--force", action="store_true", help="ignore the build manifest and rebuild every page")
+    parser.add_argument("--jobs", type=int, default=1, help="render pages across N worker processes")
+    parser.add_argument("--compress", action="store_true",
+                        help="also write .gz/.br sidecars, for hosts that serve pre-compressed files")
+    parser.add_argument("--no-prune", action="store_true", help="don't prune unused rules from styles.min.css")
+    parser.add_argument("--no-audit", action="store_true", help="skip the audit/ reports (site audit, links, near-duplicates)")
+    parser.add_argument("--audit-fail-on", action="append", default=[], choices=site_audit.ISSUE_COLUMNS,
+                        metavar="COLUMN", help="exit 1 if an indexable page has this audit issue (repeatable)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time every transform; writes .build-cache/profile/timeline.json")
+    args = parser.parse_args()
+
+    if args.list:
+        for i, stage in enumerate(STAGES, 1):
+            print(f"{i}. {stage.name}")
+        return
+
+    stages = STAGES
+    manifest = Manifest(load=not args.force)
+    if args.only:
+        # A partial run can't vouch for the full set of inputs, so it bypasses the manifest.
+        manifest = None
+        unknown = set(args.only) - {s.name for s in STAGES}
+        if unknown:
+            raise SystemExit(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+        stages = [s for s in STAGES if s.name in args.only]
+
+    city_pages = [CITIES.page_rel(slug) for slug in CITIES.slugs]
+    ctx = BuildContext(pages=discover_pages(extra=city_pages))
+
+    prof = None
+    if args.profile:
+        prof = profiling.enable()
+        for module in PROFILED_MODULES:
+            prof.instrument(module)
+        if args.jobs > 1:
+            # Timings from several processes can't be laid on one timeline.
+            print("Note: --profile runs serially; ignoring --jobs.")
+            args.jobs = 1
+
+    if any(s.name == "responsive_images" for s in stages):
+        print("Images:")
+        records, encoded = responsive_images.encode_images(jobs=args.jobs, write=not args.dry_run)
+        responsive_images.print_report(records, encoded)
+        print()
+
+    counts = run_stages(ctx, stages, manifest, jobs=args.jobs)
+    for name, count in counts.items():
+        print(f"  {name}: {count} pages")
+
+    # Site-level steps need every page, so partial (--only) runs skip them.
+    site_level = not args.only and not args.dry_run
+    built = [p for p in ctx.pages.values() if not is_template(p)]
+    if site_level:
+        print("\nFavicons:")
+        favicons.print_report(favicons.generate_favicons())
+
+        print("\nUnused CSS:")
+        prune_css.print_report(prune_css.prune_site(None if args.no_prune else [p.html for p in built]))
+
+        print("\nFingerprinted assets:")
+        names = fingerprint_assets.fingerprint_assets()
+        for asset, rel in names.items():
+            print(f"  {asset.source} -> {rel}")
+        for page in built:
+            html = fingerprint_assets.rewrite_references(page.html, page.rel, names)
+            if html != page.html:
+                page.html = html
+                if manifest is not None:
+                    manifest.refresh(page)
+
+        print("\nSitemap:")
+        sitemap.print_report(sitemap.write_sitemap((p.rel, p.html) for p in built if p.html))
+
+    if args.dry_run:
+        changed = sum(1 for p in ctx.pages.values() if p.changed)
+        print(f"\nDry run: {changed} of {len(ctx.pages)} pages would be written.")
+        return
+
+    written = write_pages(ctx)
+    if manifest is not None:
+        manifest.save({p.rel for p in ctx.pages.values() if p.source is not None or p.changed})
+    print(f"\nOK: read {len(ctx.pages)} pages once, wrote {len(written)} pages once.")
+
+    failing = []
+    if site_level and not args.no_audit:
+        print("\nSite audit:")
+        rows = site_audit.audit_site(((p.rel, p.html) for p in built if p.html), jobs=args.jobs)
+        site_audit.print_summary(rows)
+        failing = site_audit.failures(rows, args.audit_fail_on)
+
+        print("\nLinks:")
+        check_links.print_report(*check_links.check_site({p.rel: p.html for p in built if p.html}))
+
+        print("\nJSON-LD:")
+        inject_schema.print_report(inject_schema.schema_report((p.rel, p.html) for p in built if p.html))
+
+        print("\nNear-duplicate city pages:")
+        dupes = near_duplicates.find_near_duplicates(
+            ((p.rel, p.html) for p in built if p.html and p.rel.startswith(near_duplicates.CITY_PREFIX)),
+            jobs=args.jobs)
+        near_duplicates.write_reports(dupes)
+        near_duplicates.print_report(dupes)
+
+    if site_level and args.compress:
+        print("\nPre-compressed sidecars:")
+        report = compress_assets.compress_site(jobs=args.jobs)
+        compress_assets.print_report(report, len(compress_assets.load_cache()) - len(report))
+
+    if prof is not None:
+        timeline_path, folded_path = prof.write_reports()
+        print("\n" + prof.flame_text())
+        print(f"\nProfile: {timeline_path.relative_to(SITE_ROOT)}, {folded_path.relative_to(SITE_ROOT)}")
+
+    if failing:
+        for rel, column in failing:
+            print(f"FAIL {column}: {rel}")
+        raise SystemExit(f"Audit failed: {len(failing)} issue(s).")
+
+if __name__ == "__main__":
+    main()
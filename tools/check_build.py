@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Check that the committed tree is what the build produces, and that building it again changes nothing.
+
+The site's files are copied to a temporary directory the way a fresh clone
+has them (no .build-manifest.json, no .build-cache), tools/build.py runs
+there twice, and every file is compared:
+
+  1. the first build must leave the tree as it was: whatever it changes is
+     output that was never committed, or a stage that isn't idempotent;
+  2. the second build must write nothing at all.
+
+Nothing in this tree is modified. Exits with status 1 and lists the files
+that differ when either build changed anything.
+
+Usage:
+  python tools/check_build.py
+  python tools/check_build.py --keep      # keep the temporary tree to inspect (prints its path)
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+
+# Written by every build but not part of the site (all ignored by git).
+IGNORED_PARTS = {".git", ".build-cache", "__pycache__", ".leads"}
+IGNORED_NAMES = {".build-manifest.json"}
+IGNORED_SUFFIXES = {".gz", ".br", ".pyc"}
+
+def site_files() -> list[str]:
+    """Files a fresh clone of the working tree would have: tracked, plus new files git doesn't ignore."""
+    out = subprocess.run(["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+                         cwd=SITE_ROOT, capture_output=True, check=True).stdout
+    return sorted({rel for rel in out.decode("utf-8").split("\0") if rel and (SITE_ROOT / rel).is_file()})
+
+def snapshot(root: Path) -> dict[str, str]:
+    files = {}
+    for path in root.rglob("*"):
+        rel = path.relative_to(root)
+        if (not path.is_file() or IGNORED_PARTS.intersection(rel.parts)
+                or rel.name in IGNORED_NAMES or path.suffix in IGNORED_SUFFIXES):
+            continue
+        files[rel.as_posix()] = hashlib.sha256(path.read_bytes()).hexdigest()
+    return files
+
+def compare(before: dict[str, str], after: dict[str, str]) -> list[str]:
+    lines = []
+    for rel in sorted(before.keys() | after.keys()):
+        if rel not in after:
+            lines.append(f"  D {rel}")
+        elif rel not in before:
+            lines.append(f"  A {rel}")
+        elif before[rel] != after[rel]:
+            lines.append(f"  M {rel}")
+    return lines
+
+def run_build(root: Path, label: str) -> None:
+    result = subprocess.run([sys.executable, "tools/build.py"], cwd=root,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.stdout.write(result.stdout[-4000:] + result.stderr[-4000:])
+        raise SystemExit(f"{label} failed (exit {result.returncode}).")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check that the build reproduces the committed tree.")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary tree")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="igg-check-build-"))
+    try:
+        for rel in site_files():
+            (tmp / rel).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(SITE_ROOT / rel, tmp / rel)
+        committed = snapshot(tmp)
+
+        run_build(tmp, "First build")
+        first = snapshot(tmp)
+        run_build(tmp, "Second build")
+        second = snapshot(tmp)
+    finally:
+        if args.keep:
+            print(f"Kept: {tmp}")
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    failed = False
+    changes = compare(committed, first)
+    if changes:
+        failed = True
+        print(f"The build changes {len(changes)} committed file(s); commit what it writes:")
+        print("\n".join(changes))
+    changes = compare(first, second)
+    if changes:
+        failed = True
+        print(f"A second build changed {len(changes)} file(s); a stage isn't idempotent:")
+        print("\n".join(changes))
+    if failed:
+        raise SystemExit(1)
+    print(f"OK: the build reproduces all {len(committed)} committed files, and a second build writes nothing.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Offline check of every internal link, asset reference and #anchor.
+
+One pass over the site builds an in-memory index: the set of deployed files
+and, per page, the set of element ids. Each href/src/srcset/action of every
+page is then resolved against the page's directory and checked with set
+lookups, so the whole site is checked in a fraction of a second. Nothing is
+fetched; external URLs are not checked.
+
+Issues:
+  Missing        the link points at no deployed file
+  MissingAnchor  the page exists but has no element with that id
+  WrongDepth     a relative link that only resolves from another directory
+                 depth (e.g. "../assets/..." on a page two levels deep); the
+                 Suggestion column has the path that works from this page
+
+Routes served by Cloudflare Pages Functions (functions/**/*.js) count as
+files, so form actions like /api/lead are checked too.
+
+Writes audit/broken-links.csv (every issue) and audit/relative-links.csv
+(the WrongDepth rows). Exits 1 if there is any issue.
+
+Usage (standalone; tools/build.py runs this after writing pages):
+  python tools/check_links.py
+"""
+from __future__ import annotations
+
+import csv
+import os
+import posixpath
+import re
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import unquote
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+AUDIT_DIR = SITE_ROOT / "audit"
+FUNCTIONS_DIR = "functions"
+
+# Not deployed (see .wranglerignore), so nothing on the site can link to them.
+EXCLUDE_DIRS = {".git", ".build-cache", "tools", "data", "node_modules", "__pycache__", FUNCTIONS_DIR}
+
+EXTERNAL_RE = re.compile(r"^(?:[a-z][a-z0-9+.-]*:|//)", re.I)  # http:, mailto:, tel:, data:, //cdn...
+# Case-sensitive on purpose: every page is generated with lowercase attribute names,
+# and these two patterns are most of the check's run time (re.I makes them ~3x slower).
+ID_RE = re.compile(r"""\sid\s*=\s*(?:"([^"]+)"|'([^']+)'|([^\s>"']+))""")
+LINK_ATTR_RE = re.compile(r"""\s(href|src|srcset|action|poster)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>"']+))""")
+RAW_TEXT_RE = re.compile(r"<!--.*?-->|<(script|style)\b[^>]*>(.*?)</\1\s*>", re.I | re.S)
+
+# Fragments every browser resolves without a matching id.
+IMPLICIT_ANCHORS = {"", "top"}
+
+COLUMNS = ["Page", "Line", "Attribute", "Link", "Target", "Issue", "Suggestion"]
+
+@dataclass(frozen=True, slots=True)
+class LinkIssue:
+    page: str
+    line: int
+    attribute: str
+    link: str
+    target: str
+    issue: str
+    suggestion: str = ""
+
+    def row(self) -> dict:
+        return dict(zip(COLUMNS, (self.page, self.line, self.attribute, self.link, self.target,
+                                  self.issue, self.suggestion)))
+
+# -----------------------------
+# INDEX
+# -----------------------------
+
+def page_ids(html: str) -> frozenset[str]:
+    return frozenset(next(g for g in m.groups() if g is not None) for m in ID_RE.finditer(html))
+
+@dataclass
+class SiteIndex:
+    files: set[str] = field(default_factory=set)             # site-relative posix paths
+    ids: dict[str, frozenset[str]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, pages: dict[str, str]) -> "SiteIndex":
+        """Index the deployed files on disk plus `pages` (rel -> html, may not be written yet)."""
+        index = cls()
+        for dirpath, dirnames, filenames in os.walk(SITE_ROOT):
+            dirnames[:] = [d for d in dirnames if d not in EXCLUDE_DIRS]
+            base = Path(dirpath).relative_to(SITE_ROOT).as_posix()
+            for name in filenames:
+                index.files.add(name if base == "." else f"{base}/{name}")
+        for path in (SITE_ROOT / FUNCTIONS_DIR).rglob("*.js"):
+            route = path.relative_to(SITE_ROOT / FUNCTIONS_DIR).with_suffix("").as_posix()
+            index.files.add(route.removesuffix("/index") if route != "index" else "")
+        index.files.update(pages)
+        index.ids = {rel: page_ids(html) for rel, html in pages.items()}
+        return index
+
+    def lookup(self, target: str) -> str | None:
+        """The file a resolved path is served from ("dir/" and "dir" serve dir/index.html)."""
+        if target in self.files:
+            return target
+        page = posixpath.join(target, "index.html") if target else "index.html"
+        return page if page in self.files else None
+
+# -----------------------------
+# CHECK
+# -----------------------------
+
+def split_url(url: str) -> tuple[str, str]:
+    path, _, fragment = url.partition("#")
+    return unquote(path.split("?", 1)[0]), unquote(fragment)
+
+def link_urls(html: str):
+    """(offset, attribute, url) for every link attribute outside comments, scripts and styles."""
+    raw = [m.span(2) if m.group(1) else m.span() for m in RAW_TEXT_RE.finditer(html)]
+    starts = [s for s, _ in raw]
+    for m in LINK_ATTR_RE.finditer(html):
+        i = bisect_right(starts, m.start()) - 1
+        if i >= 0 and m.start() < raw[i][1]:
+            continue
+        attr = m.group(1).lower()
+        value = next(g for g in m.groups()[1:] if g is not None).strip()
+        if attr == "srcset":
+            for candidate in value.split(","):
+                if candidate.strip():
+                    yield m.start(), attr, candidate.split()[0]
+        else:
+            yield m.start(), attr, value
+
+def _depth_fix(index: SiteIndex, page_rel: str, path: str) -> str | None:
+    """For a relative path that doesn't resolve, the path that would from this page."""
+    stripped = path
+    while stripped.startswith(("../", "./")):
+        stripped = stripped.split("/", 1)[1]
+    target = index.lookup(posixpath.normpath(stripped) if stripped else "")
+    if target is None:
+        return None
+    fix = posixpath.relpath(target, posixpath.dirname(page_rel) or ".")
+    if path.endswith("/") and target.endswith("index.html"):
+        fix = posixpath.dirname(fix) + "/" if posixpath.dirname(fix) else "./"
+    return fix
+
+def check_page(index: SiteIndex, page_rel: str, html: str) -> tuple[list[LinkIssue], int]:
+    """Issues on one page, and the number of links checked."""
+    issues = []
+    checked = 0
+    line, pos = 1, 0
+    for offset, attr, url in link_urls(html):
+        checked += 1
+        if not url or EXTERNAL_RE.match(url):
+            continue
+        path, fragment = split_url(url)
+        line += html.count("\n", pos, offset)
+        pos = offset
+
+        if not path:
+            target = page_rel
+        else:
+            joined = path.lstrip("/") if path.startswith("/") else posixpath.join(posixpath.dirname(page_rel), path)
+            resolved = posixpath.normpath(joined) if joined else ""
+            resolved = "" if resolved == "." else resolved
+            target = None if resolved.startswith("..") else index.lookup(resolved)
+            if target is None:
+                fix = None if path.startswith("/") else _depth_fix(index, page_rel, path)
+                issue = "WrongDepth" if fix else "Missing"
+                issues.append(LinkIssue(page_rel, line, attr, url, resolved, issue, fix or ""))
+                continue
+
+        if fragment not in IMPLICIT_ANCHORS and target in index.ids and fragment not in index.ids[target]:
+            issues.append(LinkIssue(page_rel, line, attr, url, target, "MissingAnchor"))
+    return issues, checked
+
+def check_site(pages: dict[str, str], out_dir: Path = AUDIT_DIR) -> tuple[list[LinkIssue], int, float]:
+    """Check every page (rel -> html) and write the reports. Returns (issues, links checked, seconds)."""
+    started = time.perf_counter()
+    index = SiteIndex.build(pages)
+    issues: list[LinkIssue] = []
+    checked = 0
+    for rel in sorted(pages):
+        page_issues, count = check_page(index, rel, pages[rel])
+        issues += page_issues
+        checked += count
+    elapsed = time.perf_counter() - started
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, rows in (("broken-links.csv", issues),
+                       ("relative-links.csv", [i for i in issues if i.issue == "WrongDepth"])):
+        with (out_dir / name).open("w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS, quoting=csv.QUOTE_ALL)
+            writer.writeheader()
+            writer.writerows(i.row() for i in rows)
+    return issues, checked, elapsed
+
+def print_report(issues: list[LinkIssue], checked: int, elapsed: float, limit: int = 20) -> None:
+    for issue in issues[:limit]:
+        hint = f" (use {issue.suggestion})" if issue.suggestion else ""
+        print(f"  {issue.issue}: {issue.page}:{issue.line} {issue.attribute}=\"{issue.link}\"{hint}")
+    if len(issues) > limit:
+        print(f"  ... and {len(issues) - limit} more (see audit/broken-links.csv)")
+    print(f"  {checked} links checked in {elapsed * 1000:.0f} ms: {len(issues)} issue(s)")
+
+def main() -> None:
+    from pipeline import discover_pages
+
+    pages = {rel: p.source for rel, p in discover_pages().items()
+             if p.source is not None and "template" not in Path(rel).name.lower()}
+    issues, checked, elapsed = check_site(pages)
+    print_report(issues, checked, elapsed)
+    if issues:
+        raise SystemExit(f"Link check failed: {len(issues)} issue(s).")
+
+if __name__ == "__main__":
+    main()
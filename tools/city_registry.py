@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+City registry: the one list of service-area cities, from data/cities.json.
+
+Every generator and build stage reads its cities from here (the template
+fields, the unique hero paragraph, the FAQ profile, the service-area link
+list on the homepage and city pages), so adding a city, or 500,
+is a data change: append records to data/cities.json and run the build.
+
+The file is read and validated once per process and then looked up by slug
+in O(1). Each record:
+
+  slug       folder under service-areas/ (lowercase, ends in "-ia")
+  name       display name ("West Des Moines")
+  nearby     NEARBY_TOWNS in city-template.html ("Clive and Waukee")
+  paragraph  the page's unique hero paragraph (tools/fix_site_content.py)
+  profile    the facts the city FAQs are written from (update_faqs.py):
+             population, description, home_age, tree_types, unique_factor,
+             distance, weather_concern, home_style
+
+Usage (standalone: validate the file and list the cities):
+  python tools/city_registry.py
+"""
+from __future__ import annotations
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+CITIES_PATH = SITE_ROOT / "data" / "cities.json"
+CITY_PREFIX = "service-areas/"
+
+SLUG_RE = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*-ia$")
+TEXT_FIELDS = ("slug", "name", "nearby", "paragraph")
+PROFILE_FIELDS = (
+    "population", "description", "home_age", "tree_types", "unique_factor",
+    "distance", "weather_concern", "home_style",
+)
+
+class CityRegistry:
+    """City records in file order, indexed by slug."""
+
+    def __init__(self, records: Iterable[dict]) -> None:
+        self.records = list(records)
+        self.by_slug = {city["slug"]: city for city in self.records}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.records)
+
+    def __contains__(self, slug: object) -> bool:
+        return slug in self.by_slug
+
+    def __getitem__(self, slug: str) -> dict:
+        return self.by_slug[slug]
+
+    def get(self, slug: str | None) -> dict | None:
+        return self.by_slug.get(slug)
+
+    @property
+    def slugs(self) -> list[str]:
+        return [city["slug"] for city in self.records]
+
+    def page_rel(self, slug: str) -> str:
+        return f"{CITY_PREFIX}{slug}/index.html"
+
+    def city_for_page(self, rel: str) -> dict | None:
+        """The record for service-areas/<slug>/index.html, None for any other page."""
+        parts = rel.split("/")
+        if len(parts) == 3 and f"{parts[0]}/" == CITY_PREFIX and parts[2] == "index.html":
+            return self.by_slug.get(parts[1])
+        return None
+
+# -----------------------------
+# LOAD + VALIDATE
+# -----------------------------
+
+def validate(records: object) -> list[str]:
+    """Every problem with a parsed cities file (empty if it is usable)."""
+    if not isinstance(records, list):
+        return ["top level must be a list of city records"]
+    errors = []
+    seen: set[str] = set()
+    for i, city in enumerate(records):
+        if not isinstance(city, dict):
+            errors.append(f"record {i}: not an object")
+            continue
+        where = f"record {i} ({city.get('slug', '?')})"
+        for name in TEXT_FIELDS:
+            if not isinstance(city.get(name), str) or not city[name].strip():
+                errors.append(f"{where}: missing or empty {name!r}")
+        slug = city.get("slug")
+        if isinstance(slug, str):
+            if not SLUG_RE.match(slug):
+                errors.append(f"{where}: slug must be lowercase words joined by '-' and end in '-ia'")
+            if slug in seen:
+                errors.append(f"{where}: duplicate slug")
+            seen.add(slug)
+        profile = city.get("profile")
+        if not isinstance(profile, dict):
+            errors.append(f"{where}: missing 'profile'")
+            continue
+        missing = [name for name in PROFILE_FIELDS if not profile.get(name)]
+        if missing:
+            errors.append(f"{where}: profile missing {', '.join(missing)}")
+        if not isinstance(profile.get("tree_types", []), list):
+            errors.append(f"{where}: profile.tree_types must be a list")
+    return errors
+
+@lru_cache(maxsize=None)
+def load_cities(path: Path = CITIES_PATH) -> CityRegistry:
+    """The validated registry (read once per process)."""
+    try:
+        records = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise SystemExit(f"City registry not found: {path}")
+    except json.JSONDecodeError as e:
+        raise SystemExit(f"City registry {path} is not valid JSON: {e}")
+    errors = validate(records)
+    if errors:
+        raise SystemExit(f"Invalid city registry {path}:\n  " + "\n  ".join(errors))
+    return CityRegistry(records)
+
+def main() -> None:
+    cities = load_cities()
+    for city in cities:
+        print(f"{city['slug']:<24} {city['name']:<20} near {city['nearby']}")
+    print(f"{len(cities)} cities in {CITIES_PATH.relative_to(SITE_ROOT)}: OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Write pre-compressed .gz and .br sidecars next to every text asset of the site.
+
+  index.html -> index.html.gz, index.html.br
+
+Sidecars are compressed at the maximum level (gzip -9, Brotli quality 11) so
+a host that serves pre-compressed files never compresses on the fly. Files
+whose content hash matches the last run (.build-cache/compress.json) are
+skipped, the rest are compressed across --jobs worker processes.
+
+Brotli needs the optional `brotli` package (pip install brotli); without it
+only .gz sidecars are written.
+
+Usage:
+  python tools/compress_assets.py            # compress changed files
+  python tools/compress_assets.py --force    # recompress everything
+  python tools/compress_assets.py --jobs 8
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from pipeline import SKIP_DIRS
+from render_pool import render_all
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+CACHE_PATH = SITE_ROOT / ".build-cache" / "compress.json"
+
+TEXT_EXTENSIONS = {".html", ".css", ".js", ".xml", ".svg", ".txt", ".json", ".webmanifest"}
+# Server code, build data and templates are not served as static files.
+SKIP_ASSET_DIRS = SKIP_DIRS | {"functions", "data", ".build-cache"}
+SKIP_FILES = {"city-template.html"}
+
+# Below this, compression headers and framing cost more than they save.
+MIN_SIZE = 1024
+
+def find_text_assets() -> list[str]:
+    rels = []
+    for dirpath, dirnames, filenames in os.walk(SITE_ROOT):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_ASSET_DIRS and not d.startswith(".")]
+        for name in filenames:
+            if Path(name).suffix.lower() in TEXT_EXTENSIONS and name not in SKIP_FILES:
+                rels.append((Path(dirpath) / name).relative_to(SITE_ROOT).as_posix())
+    return sorted(rels)
+
+def sidecars(rel: str) -> list[Path]:
+    path = SITE_ROOT / rel
+    out = [path.with_name(path.name + ".gz")]
+    if brotli is not None:
+        out.append(path.with_name(path.name + ".br"))
+    return out
+
+def compress(rel: str) -> tuple[str, int, bytes, bytes | None]:
+    data = (SITE_ROOT / rel).read_bytes()
+    # mtime=0 keeps the .gz byte-identical across runs for the same input.
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    br = brotli.compress(data, quality=11, mode=brotli.MODE_TEXT) if brotli is not None else None
+    return rel, len(data), gz, br
+
+def load_cache() -> dict[str, str]:
+    if CACHE_PATH.is_file():
+        return json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+    return {}
+
+def compress_site(jobs: int = 1, force: bool = False) -> list[tuple[str, int, int, int | None]]:
+    """Compress every changed text asset. Returns (rel, size, gz size, br size) per compressed file."""
+    old_cache = {} if force else load_cache()
+    cache = {}
+    todo = []
+    for rel in find_text_assets():
+        if (SITE_ROOT / rel).stat().st_size < MIN_SIZE:
+            continue
+        digest = hashlib.sha256((SITE_ROOT / rel).read_bytes()).hexdigest()
+        cache[rel] = digest
+        if old_cache.get(rel) != digest or not all(p.is_file() for p in sidecars(rel)):
+            todo.append(rel)
+
+    # Sidecars of files that are gone (or now too small) would be served stale.
+    for rel in set(old_cache) - set(cache):
+        for suffix in (".gz", ".br"):
+            (SITE_ROOT / (rel + suffix)).unlink(missing_ok=True)
+
+    report = []
+
+    def write(result: tuple[str, int, bytes, bytes | None]) -> None:
+        rel, size, gz, br = result
+        path = SITE_ROOT / rel
+        path.with_name(path.name + ".gz").write_bytes(gz)
+        if br is not None:
+            path.with_name(path.name + ".br").write_bytes(br)
+        report.append((rel, size, len(gz), len(br) if br is not None else None))
+
+    render_all(todo, compress, write, jobs=jobs)
+
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    CACHE_PATH.write_text(json.dumps(cache, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+    return report
+
+def print_report(report: list[tuple[str, int, int, int | None]], unchanged: int) -> None:
+    if report:
+        print(f"  {'file':<52} {'bytes':>8} {'gz':>8} {'ratio':>6} {'br':>8} {'ratio':>6}")
+    for rel, size, gz, br in report:
+        br_cols = f"{br:>8} {br / size:>6.1%}" if br is not None else f"{'-':>8} {'':>6}"
+        print(f"  {rel[:52]:<52} {size:>8} {gz:>8} {gz / size:>6.1%} {br_cols}")
+    if report:
+        total = sum(r[1] for r in report)
+        total_gz = sum(r[2] for r in report)
+        line = f"  {'TOTAL':<52} {total:>8} {total_gz:>8} {total_gz / total:>6.1%}"
+        if brotli is not None:
+            total_br = sum(r[3] for r in report)
+            line += f" {total_br:>8} {total_br / total:>6.1%}"
+        print(line)
+    print(f"Compressed {len(report)} file(s), {unchanged} unchanged.")
+    if brotli is None:
+        print("Note: brotli is not installed (pip install brotli); wrote .gz sidecars only.")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write .gz/.br sidecars for every text asset.")
+    parser.add_argument("--jobs", type=int, default=1, help="compress across N worker processes")
+    parser.add_argument("--force", action="store_true", help="recompress files even if unchanged")
+    args = parser.parse_args()
+
+    report = compress_site(jobs=args.jobs, force=args.force)
+    print_report(report, len(load_cache()) - len(report))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Inline each page's above-the-fold CSS and load the full stylesheet without blocking render.
+
+The fold is the page from <body> to the end of the first <section> (the
+header and hero on every template). The rules of assets/css/styles.css that
+can match anything there are minified into a <style> block in <head>, and the
+render-blocking <link rel="stylesheet"> to the site stylesheet becomes a
+preload that switches itself to a stylesheet once loaded (with a <noscript>
+fallback). Pages that share a template share one computed block.
+
+Re-running is safe: an existing critical block is replaced, not duplicated.
+
+Usage (standalone; tools/build.py runs this as the critical_css stage):
+  python tools/critical_css.py
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from pathlib import Path
+
+import css_rules
+from html_index import HtmlIndex, TagTree, splice
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+SOURCE_CSS = "assets/css/styles.css"
+
+BLOCK_START = "<!-- Critical CSS -->"
+BLOCK_END = "<!-- /Critical CSS -->"
+# The site stylesheet, however it is named or fingerprinted (styles.min.css, styles.3f9a1c.min.css).
+SITE_STYLESHEET_RE = re.compile(r"(?:^|/)assets/css/styles(?:\.[0-9a-f]+)?(?:\.min)?\.css$")
+
+# Used by every page regardless of markup.
+ALWAYS_USED = css_rules.UsedTokens(tags={"html", "body"})
+
+# If a page has no <section>, treat this much of <body> as above the fold.
+FALLBACK_FOLD_CHARS = 16_000
+
+def fold_bounds(html: str) -> tuple[int, int]:
+    """Offsets of the above-the-fold part of the page."""
+    body = html.find("<body")
+    body = 0 if body == -1 else body
+    sections = [el for el in TagTree(html, "section").roots if el.start > body]
+    return body, sections[0].end if sections else body + FALLBACK_FOLD_CHARS
+
+def above_the_fold(html: str) -> str:
+    start, end = fold_bounds(html)
+    return html[start:end]
+
+@lru_cache(maxsize=32)
+def _parsed(css_text: str) -> list[css_rules.Rule]:
+    return css_rules.parse_css(css_text)
+
+@lru_cache(maxsize=64)
+def critical_css(css_text: str, used_key: tuple[frozenset, frozenset, frozenset]) -> str:
+    used = css_rules.UsedTokens(set(used_key[0]), set(used_key[1]), set(used_key[2]))
+    return css_rules.serialize(css_rules.filter_rules(_parsed(css_text), used), minify=True)
+
+def critical_block(css: str, href: str) -> str:
+    return (
+        f"{BLOCK_START}\n"
+        f"  <style data-critical-css>{css}</style>\n"
+        f'  <link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        f'  <noscript><link rel="stylesheet" href="{href}"></noscript>\n'
+        f"  {BLOCK_END}"
+    )
+
+def site_stylesheet_links(html: str, rel: str = "stylesheet") -> list:
+    return [
+        el for el in HtmlIndex(html).by_tag("link")
+        if el.attrs.get("rel", "").lower() == rel and SITE_STYLESHEET_RE.search(el.attrs.get("href", ""))
+    ]
+
+def inline_critical_css(html: str, css_text: str) -> str:
+    """Replace the page's blocking link(s) to the site stylesheet with critical CSS + async load."""
+    # A block from an earlier run is taken out and rebuilt in the same place.
+    insert_at, href = None, None
+    start = html.find(BLOCK_START)
+    end = html.find(BLOCK_END, start) if start != -1 else -1
+    if end != -1:
+        preload = site_stylesheet_links(html[start:end], rel="preload")
+        href = preload[0].attrs["href"] if preload else None
+        html = html[:start] + html[end + len(BLOCK_END):]
+        insert_at = start
+
+    links = site_stylesheet_links(html)
+    if links:
+        href = links[0].attrs["href"]
+        if insert_at is None:
+            insert_at = links[0].start
+    if href is None:
+        return html
+
+    used = css_rules.html_tokens(above_the_fold(html))
+    used.update(ALWAYS_USED)
+    css = critical_css(css_text, used.key())
+
+    # Any remaining blocking links to the stylesheet would block render again.
+    edits = [(el.start, el.end, "") for el in links]
+    edits.append((insert_at, insert_at, critical_block(css, href)))
+    return splice(html, edits)
+
+def main() -> None:
+    css_text = (SITE_ROOT / SOURCE_CSS).read_text(encoding="utf-8")
+
+    changed = 0
+    for page in sorted(SITE_ROOT.glob("**/*.html")):
+        rel = page.relative_to(SITE_ROOT)
+        if rel.parts[0] in {"tools", "audit", ".git"} or "template" in page.name.lower():
+            continue
+        html = page.read_text(encoding="utf-8", errors="replace")
+        new_html = inline_critical_css(html, css_text)
+        if new_html != html:
+            page.write_text(new_html, encoding="utf-8")
+            changed += 1
+    print(f"OK: inlined critical CSS in {changed} page(s).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Small CSS rule model shared by the CSS build stages.
+
+parse_css() splits a stylesheet into rules: qualified rules (selectors +
+declarations), statement at-rules (@import), block at-rules kept whole
+(@font-face, @keyframes) and grouping at-rules whose children are parsed
+(@media, @supports). filter_rules() keeps only the selectors a page set
+actually uses; serialize() writes the rules back, optionally minified.
+
+Selector matching is deliberately conservative: a selector is kept when every
+tag, class and id it names appears somewhere in the pages, ignoring
+combinators and pseudo-classes. It can keep a rule that never applies, but
+never drops one that does.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+
+COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+# Strings first so braces and semicolons inside them are skipped.
+BLOCK_TOKEN_RE = re.compile(r""""(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|[{};]""")
+GROUPING_AT_RULES = {"@media", "@supports", "@document", "@layer", "@container"}
+
+# Selector pieces that never need a matching token in the HTML.
+PSEUDO_RE = re.compile(r"::?[\w-]+(?:\((?:[^()]|\([^()]*\))*\))?")
+ATTRIBUTE_RE = re.compile(r"\[[^\]]*\]")
+CLASS_RE = re.compile(r"\.(-?[_a-zA-Z][\w-]*)")
+ID_RE = re.compile(r"#(-?[_a-zA-Z][\w-]*)")
+TAG_RE = re.compile(r"(?:^|[\s>+~])([a-zA-Z][\w-]*)")
+
+HTML_TAG_RE = re.compile(r"<([a-zA-Z][a-zA-Z0-9-]*)")
+HTML_CLASS_RE = re.compile(r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.I)
+HTML_ID_RE = re.compile(r"""\bid\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.I)
+# Classes that scripts add at runtime (classList.add('open'), className = 'x').
+JS_CLASS_RE = re.compile(
+    r"""classList\.(?:add|toggle|replace)\(([^)]*)\)|className\s*\+?=\s*(['"])(.*?)\2""")
+JS_STRING_RE = re.compile(r"""['"]([\w\s-]+)['"]""")
+KEYFRAMES_NAME_RE = re.compile(r"@(?:-webkit-)?keyframes\s+([\w-]+)", re.I)
+
+@dataclass
+class Rule:
+    prelude: str                        # selector list, or "@media (...)" etc.
+    body: str | None = None             # declarations / raw block body; None for statements and groups
+    children: list[Rule] | None = None  # nested rules of grouping at-rules
+
+    @property
+    def at_keyword(self) -> str | None:
+        return self.prelude.split(None, 1)[0].lower() if self.prelude.startswith("@") else None
+
+    @property
+    def selectors(self) -> list[str]:
+        return split_top_level(self.prelude, ",")
+
+@dataclass
+class UsedTokens:
+    tags: set[str] = field(default_factory=set)
+    classes: set[str] = field(default_factory=set)
+    ids: set[str] = field(default_factory=set)
+
+    def update(self, other: UsedTokens) -> None:
+        self.tags |= other.tags
+        self.classes |= other.classes
+        self.ids |= other.ids
+
+    def key(self) -> tuple[frozenset, frozenset, frozenset]:
+        return frozenset(self.tags), frozenset(self.classes), frozenset(self.ids)
+
+def split_top_level(text: str, sep: str) -> list[str]:
+    """Split on `sep` outside parentheses and brackets (":is(a, b)" stays whole)."""
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(text):
+        if ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+    parts.append(text[start:].strip())
+    return [p for p in parts if p]
+
+# -----------------------------
+# PARSE / SERIALIZE
+# -----------------------------
+
+def parse_css(text: str) -> list[Rule]:
+    rules, _ = _parse_block(COMMENT_RE.sub("", text), 0)
+    return rules
+
+def _parse_block(text: str, pos: int) -> tuple[list[Rule], int]:
+    rules = []
+    start = pos
+    while True:
+        m = _next_token(text, pos)
+        if m is None:
+            return rules, len(text)
+        tok = m.group()
+        if tok == "}":
+            return rules, m.end()
+        prelude = text[start:m.start()].strip()
+        if tok == ";":
+            if prelude:
+                rules.append(Rule(prelude))
+            start = pos = m.end()
+            continue
+        # tok == "{"
+        keyword = prelude.split(None, 1)[0].lower() if prelude.startswith("@") else None
+        if keyword in GROUPING_AT_RULES:
+            children, pos = _parse_block(text, m.end())
+            rules.append(Rule(prelude, children=children))
+        else:
+            end = _matching_brace(text, m.end())
+            rules.append(Rule(prelude, body=text[m.end():end].strip()))
+            pos = end + 1
+        start = pos
+
+def _next_token(text: str, pos: int) -> re.Match | None:
+    for m in BLOCK_TOKEN_RE.finditer(text, pos):
+        if m.group() in "{};":
+            return m
+    return None
+
+def _matching_brace(text: str, pos: int) -> int:
+    depth = 1
+    for m in BLOCK_TOKEN_RE.finditer(text, pos):
+        tok = m.group()
+        if tok == "{":
+            depth += 1
+        elif tok == "}":
+            depth -= 1
+            if depth == 0:
+                return m.start()
+    return len(text)
+
+def minify_selector(selector: str) -> str:
+    selector = re.sub(r"\s+", " ", selector.strip())
+    return re.sub(r"\s*([>+~,])\s*", r"\1", selector)
+
+def minify_declarations(body: str) -> str:
+    out = []
+    pos = 0
+    # Leave strings untouched; squeeze whitespace everywhere else.
+    for m in re.finditer(r""""(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'""", body):
+        out.append(_squeeze(body[pos:m.start()]))
+        out.append(m.group())
+        pos = m.end()
+    out.append(_squeeze(body[pos:]))
+    return "".join(out).strip().rstrip(";")
+
+def _squeeze(text: str) -> str:
+    text = re.sub(r"\s+", " ", text)
+    # Spaces around + and - are significant inside calc(), so only these go.
+    return re.sub(r"\s*([:;,{}])\s*", r"\1", text)
+
+def _collapse(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip())
+
+def serialize(rules: list[Rule], minify: bool = False) -> str:
+    if minify:
+        return "".join(_minified(rule) for rule in rules)
+    return "\n".join(_pretty(rule, "") for rule in rules)
+
+def _minified(rule: Rule) -> str:
+    if rule.children is not None:
+        return f"{_collapse(rule.prelude)}{{{serialize(rule.children, minify=True)}}}"
+    if rule.body is None:
+        return f"{_collapse(rule.prelude)};"
+    if rule.at_keyword:
+        prelude = _collapse(rule.prelude)
+        # @keyframes / @page bodies hold nested blocks.
+        body = serialize(parse_css(rule.body), minify=True) if "{" in rule.body else minify_declarations(rule.body)
+    else:
+        prelude = ",".join(minify_selector(s) for s in rule.selectors)
+        body = minify_declarations(rule.body)
+    return f"{prelude}{{{body}}}"
+
+def _pretty(rule: Rule, indent: str) -> str:
+    if rule.children is not None:
+        inner = "".join(_pretty(child, indent + "  ") for child in rule.children)
+        return f"{indent}{rule.prelude} {{\n{inner}{indent}}}\n"
+    if rule.body is None:
+        return f"{indent}{rule.prelude};\n"
+    body = "".join(f"{indent}  {line.strip()}\n" for line in rule.body.splitlines() if line.strip())
+    return f"{indent}{rule.prelude} {{\n{body}{indent}}}\n"
+
+# -----------------------------
+# USAGE
+# -----------------------------
+
+def html_tokens(html: str) -> UsedTokens:
+    used = UsedTokens()
+    used.tags.update(t.lower() for t in HTML_TAG_RE.findall(html))
+    for a, b in HTML_CLASS_RE.findall(html):
+        used.classes.update((a or b).split())
+    for a, b in HTML_ID_RE.findall(html):
+        used.ids.add((a or b).strip())
+    used.update(js_tokens(html))
+    return used
+
+def js_tokens(js: str) -> UsedTokens:
+    """Classes a script adds at runtime, plus any markup it builds from strings."""
+    used = UsedTokens()
+    for args, _, assigned in JS_CLASS_RE.findall(js):
+        for s in JS_STRING_RE.findall(args) if args else [assigned]:
+            used.classes.update(s.split())
+    for a, b in HTML_CLASS_RE.findall(js):
+        used.classes.update((a or b).split())
+    return used
+
+def selector_used(selector: str, used: UsedTokens) -> bool:
+    bare = ATTRIBUTE_RE.sub("", PSEUDO_RE.sub("", selector))
+    return (
+        all(c in used.classes for c in CLASS_RE.findall(bare))
+        and all(i in used.ids for i in ID_RE.findall(bare))
+        and all(t.lower() in used.tags for t in TAG_RE.findall(CLASS_RE.sub("", ID_RE.sub("", bare))))
+    )
+
+def filter_rules(rules: list[Rule], used: UsedTokens) -> list[Rule]:
+    """Rules (and selectors within them) that can match the used tokens; unreferenced @keyframes go too."""
+    kept = _filter(rules, used)
+    animations = " ".join(_declarations(kept))
+    return _drop_unused_keyframes(kept, animations)
+
+def _filter(rules: list[Rule], used: UsedTokens) -> list[Rule]:
+    kept = []
+    for rule in rules:
+        if rule.children is not None:
+            children = _filter(rule.children, used)
+            if children:
+                kept.append(Rule(rule.prelude, children=children))
+        elif rule.at_keyword or rule.body is None:
+            kept.append(rule)
+        else:
+            selectors = [s for s in rule.selectors if selector_used(s, used)]
+            if selectors:
+                kept.append(Rule(", ".join(selectors), body=rule.body))
+    return kept
+
+def _declarations(rules: list[Rule]):
+    for rule in rules:
+        if rule.children is not None:
+            yield from _declarations(rule.children)
+        elif rule.body is not None and "keyframes" not in (rule.at_keyword or ""):
+            yield rule.body
+
+def _drop_unused_keyframes(rules: list[Rule], animations: str) -> list[Rule]:
+    kept = []
+    for rule in rules:
+        if rule.children is not None:
+            kept.append(Rule(rule.prelude, children=_drop_unused_keyframes(rule.children, animations)))
+            continue
+        m = KEYFRAMES_NAME_RE.match(rule.prelude)
+        if m and not re.search(rf"(?<![\w-]){re.escape(m.group(1))}(?![\w-])", animations):
+            continue
+        kept.append(rule)
+    return kept
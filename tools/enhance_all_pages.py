@@ -21,11 +21,15 @@ import re
 import glob
 from pathlib import Path
 
+from favicons import favicon_block
+from html_index import HtmlIndex, splice
+
 # Configuration
 BASE_URL = "https://www.iowagutterguards.com"
 GA_MEASUREMENT_ID = "G-XXXXXXXXXX"  # Replace with actual GA4 ID
 PHONE_NUMBER = "(515) 329-5128"
 PHONE_LINK = "tel:+15153295128"
+BASE_DIR = Path(__file__).resolve().parents[1]
 
 # Page metadata
 PAGE_METADATA = {
@@ -67,26 +71,9 @@ PAGE_METADATA = {
     }
 }
 
-# Cities list for service area pages
-CITIES = [
-    "adel", "altoona", "ames", "ankeny", "baxter", "belle-plaine", "bondurant", "boone",
-    "carlisle", "chariton", "clive", "colfax", "corydon", "dallas-center", "des-moines",
-    "earlham", "eldora", "greenfield", "grimes", "grinnell", "huxley", "indianola",
-    "jefferson", "johnston", "knoxville", "lynnville", "madrid", "marshalltown",
-    "melbourne", "monroe", "nevada", "newton", "norwalk", "osceola", "oskaloosa",
-    "pella", "perry", "pleasant-hill", "polk-city", "prairie-city", "redfield",
-    "slater", "story-city", "stuart", "sully", "urbandale", "van-meter", "waukee",
-    "west-des-moines", "winterset"
-]
-
-def get_city_name(slug):
-    """Convert slug to proper city name."""
-    return slug.replace("-", " ").title()
-
 def get_page_path_from_file(filepath):
     """Get the URL path from a file path."""
-    base_dir = Path("/home/ubuntu/iowa_gutter_guards_improved")
-    rel_path = Path(filepath).relative_to(base_dir)
+    rel_path = Path(filepath).relative_to(BASE_DIR)
     
     if str(rel_path) == "index.html":
         return "/"
@@ -100,8 +87,7 @@ def get_page_path_from_file(filepath):
 
 def get_css_path(filepath):
     """Get the correct relative path to CSS based on file location."""
-    base_dir = Path("/home/ubuntu/iowa_gutter_guards_improved")
-    rel_path = Path(filepath).relative_to(base_dir)
+    rel_path = Path(filepath).relative_to(BASE_DIR)
     
     # Count directory depth
     depth = len(rel_path.parts) - 1  # -1 for the filename
@@ -113,8 +99,7 @@ def get_css_path(filepath):
 
 def get_js_path(filepath):
     """Get the correct relative path to JS based on file location."""
-    base_dir = Path("/home/ubuntu/iowa_gutter_guards_improved")
-    rel_path = Path(filepath).relative_to(base_dir)
+    rel_path = Path(filepath).relative_to(BASE_DIR)
     
     depth = len(rel_path.parts) - 1
     
@@ -125,8 +110,7 @@ def get_js_path(filepath):
 
 def get_favicon_path(filepath, filename):
     """Get the correct relative path to favicon based on file location."""
-    base_dir = Path("/home/ubuntu/iowa_gutter_guards_improved")
-    rel_path = Path(filepath).relative_to(base_dir)
+    rel_path = Path(filepath).relative_to(BASE_DIR)
     
     depth = len(rel_path.parts) - 1
     
@@ -137,15 +121,7 @@ def get_favicon_path(filepath, filename):
 
 def generate_favicon_links(filepath):
     """Generate favicon link tags."""
-    return f'''
-  <!-- Favicons -->
-  <link rel="icon" href="{get_favicon_path(filepath, 'favicon.ico')}" sizes="any">
-  <link rel="icon" href="{get_favicon_path(filepath, 'favicon.svg')}" type="image/svg+xml">
-  <link rel="icon" type="image/png" sizes="16x16" href="{get_favicon_path(filepath, 'favicon-16x16.png')}">
-  <link rel="icon" type="image/png" sizes="32x32" href="{get_favicon_path(filepath, 'favicon-32x32.png')}">
-  <link rel="icon" type="image/png" sizes="48x48" href="{get_favicon_path(filepath, 'favicon-48x48.png')}">
-  <link rel="icon" type="image/png" sizes="192x192" href="{get_favicon_path(filepath, 'favicon-192x192.png')}">
-  <link rel="apple-touch-icon" sizes="180x180" href="{get_favicon_path(filepath, 'apple-touch-icon.png')}">'''
+    return "\n" + favicon_block(get_favicon_path(filepath, "")).rstrip("\n")
 
 def generate_og_meta(filepath, title, description):
     """Generate Open Graph meta tags."""
@@ -185,47 +161,6 @@ def generate_ga_tracking():
     gtag('config', '{GA_MEASUREMENT_ID}');
   </script>'''
 
-def generate_sticky_phone_css():
-    """Generate CSS for sticky phone bar."""
-    return '''
-  /* Sticky Phone Bar for Mobile */
-  .sticky-phone {
-    display: none;
-    position: fixed;
-    bottom: 0;
-    left: 0;
-    right: 0;
-    background: linear-gradient(135deg, #16a34a 0%, #15803d 100%);
-    padding: 0.85rem 1rem;
-    z-index: 9999;
-    box-shadow: 0 -4px 20px rgba(0,0,0,0.3);
-  }
-  .sticky-phone a {
-    display: flex;
-    align-items: center;
-    justify-content: center;
-    gap: 0.6rem;
-    color: white;
-    font-weight: 700;
-    font-size: 1.15rem;
-    text-decoration: none;
-  }
-  .sticky-phone svg {
-    width: 24px;
-    height: 24px;
-    animation: phone-ring 1.5s ease-in-out infinite;
-  }
-  @keyframes phone-ring {
-    0%, 100% { transform: rotate(0); }
-    10%, 30% { transform: rotate(-10deg); }
-    20%, 40% { transform: rotate(10deg); }
-    50% { transform: rotate(0); }
-  }
-  @media (max-width: 768px) {
-    .sticky-phone { display: block; }
-    body { padding-bottom: 60px; }
-  }'''
-
 def generate_sticky_phone_html():
     """Generate HTML for sticky phone bar."""
     return f'''
@@ -276,51 +211,6 @@ def generate_trust_badges_section():
   </div>
 </section>'''
 
-def generate_trust_badges_css():
-    """Generate CSS for trust badges."""
-    return '''
-  /* Trust Badges Section */
-  .trust-badges-section {
-    padding: 1.5rem 0;
-    margin: 1.5rem 0;
-    border-top: 1px solid rgba(148, 163, 184, 0.3);
-    border-bottom: 1px solid rgba(148, 163, 184, 0.3);
-  }
-  .trust-badges-grid {
-    display: grid;
-    grid-template-columns: repeat(4, 1fr);
-    gap: 1rem;
-    text-align: center;
-  }
-  .trust-badge-item {
-    display: flex;
-    flex-direction: column;
-    align-items: center;
-    gap: 0.5rem;
-  }
-  .trust-badge-icon {
-    font-size: 2rem;
-  }
-  .trust-badge-text {
-    display: flex;
-    flex-direction: column;
-    line-height: 1.3;
-  }
-  .trust-badge-text strong {
-    font-size: 1.1rem;
-    color: #4ade80;
-  }
-  .trust-badge-text span {
-    font-size: 0.8rem;
-    color: var(--muted);
-  }
-  @media (max-width: 768px) {
-    .trust-badges-grid {
-      grid-template-columns: repeat(2, 1fr);
-      gap: 1.5rem;
-    }
-  }'''
-
 def generate_exit_intent_popup():
     """Generate exit-intent popup placeholder."""
     return '''
@@ -335,59 +225,6 @@ def generate_exit_intent_popup():
   </div>
 </div>'''
 
-def generate_exit_popup_css():
-    """Generate CSS for exit-intent popup."""
-    return '''
-  /* Exit Intent Popup */
-  .exit-popup {
-    position: fixed;
-    top: 0;
-    left: 0;
-    right: 0;
-    bottom: 0;
-    z-index: 10000;
-    display: flex;
-    align-items: center;
-    justify-content: center;
-  }
-  .exit-popup.hidden { display: none !important; }
-  .exit-popup-overlay {
-    position: absolute;
-    top: 0;
-    left: 0;
-    right: 0;
-    bottom: 0;
-    background: rgba(0,0,0,0.7);
-  }
-  .exit-popup-content {
-    position: relative;
-    background: #0f172a;
-    padding: 2rem;
-    border-radius: 12px;
-    max-width: 400px;
-    text-align: center;
-    border: 1px solid rgba(148, 163, 184, 0.4);
-    box-shadow: 0 20px 50px rgba(0,0,0,0.5);
-  }
-  .exit-popup-close {
-    position: absolute;
-    top: 10px;
-    right: 15px;
-    background: none;
-    border: none;
-    color: var(--muted);
-    font-size: 1.5rem;
-    cursor: pointer;
-  }
-  .exit-popup h3 {
-    color: var(--accent);
-    margin-bottom: 0.75rem;
-  }
-  .exit-popup p {
-    color: var(--muted);
-    margin-bottom: 1.25rem;
-  }'''
-
 def generate_why_choose_us_section():
     """Generate Why Choose Us section for homepage."""
     return '''
@@ -418,58 +255,6 @@ def generate_why_choose_us_section():
   </div>
 </section>'''
 
-def generate_why_choose_css():
-    """Generate CSS for Why Choose Us section."""
-    return '''
-  /* Why Choose Us Section */
-  .why-choose-section {
-    padding: 2.5rem 0;
-    margin: 2rem 0;
-  }
-  .why-choose-section h2 {
-    text-align: center;
-    font-size: 1.8rem;
-    margin-bottom: 2rem;
-    color: var(--accent);
-  }
-  .why-choose-grid {
-    display: grid;
-    grid-template-columns: repeat(4, 1fr);
-    gap: 1.5rem;
-  }
-  .why-choose-item {
-    background: rgba(15, 23, 42, 0.6);
-    border: 1px solid rgba(148, 163, 184, 0.3);
-    border-radius: var(--radius);
-    padding: 1.5rem;
-    text-align: center;
-    transition: transform 0.2s, box-shadow 0.2s;
-  }
-  .why-choose-item:hover {
-    transform: translateY(-5px);
-    box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-  }
-  .why-choose-icon {
-    font-size: 2.5rem;
-    margin-bottom: 1rem;
-  }
-  .why-choose-item h3 {
-    font-size: 1.1rem;
-    margin-bottom: 0.75rem;
-    color: #4ade80;
-  }
-  .why-choose-item p {
-    font-size: 0.9rem;
-    color: var(--muted);
-    line-height: 1.5;
-  }
-  @media (max-width: 900px) {
-    .why-choose-grid { grid-template-columns: repeat(2, 1fr); }
-  }
-  @media (max-width: 600px) {
-    .why-choose-grid { grid-template-columns: 1fr; }
-  }'''
-
 def generate_before_after_section():
     """Generate before/after image placeholders section."""
     return '''
@@ -492,46 +277,6 @@ def generate_before_after_section():
   </div>
 </section>'''
 
-def generate_before_after_css():
-    """Generate CSS for before/after section."""
-    return '''
-  /* Before/After Section */
-  .before-after-section {
-    padding: 2rem 0;
-    margin: 2rem 0;
-  }
-  .before-after-section h2 {
-    text-align: center;
-    margin-bottom: 1.5rem;
-    color: var(--accent);
-  }
-  .before-after-grid {
-    display: grid;
-    grid-template-columns: repeat(2, 1fr);
-    gap: 1.5rem;
-  }
-  .before-after-item {
-    position: relative;
-  }
-  .before-after-label {
-    position: absolute;
-    top: 10px;
-    left: 10px;
-    background: #dc2626;
-    color: white;
-    padding: 0.25rem 0.75rem;
-    border-radius: 4px;
-    font-size: 0.8rem;
-    font-weight: 600;
-    z-index: 1;
-  }
-  .before-after-label.after {
-    background: #16a34a;
-  }
-  @media (max-width: 600px) {
-    .before-after-grid { grid-template-columns: 1fr; }
-  }'''
-
 def extract_title_description(content):
     """Extract title and description from HTML content."""
     title_match = re.search(r'<title>([^<]+)</title>', content)
@@ -565,37 +310,48 @@ def enhance_cta_buttons(content):
 
 def add_tracking_attributes(content):
     """Add tracking attributes to clickable elements."""
-    # Add tracking to phone links
+    # Add tracking to phone links (ones already tracked are left alone)
     content = re.sub(
-        r'(<a[^>]*href="tel:[^"]*"[^>]*)>',
+        r'(<a(?![^>]*data-track=)[^>]*href="tel:[^"]*"[^>]*)>',
         r'\1 data-track="phone-click" onclick="gtag(\'event\', \'phone_click\', {\'event_category\': \'engagement\'});">',
         content
     )
     return content
 
-def process_html_file(filepath):
-    """Process a single HTML file with all enhancements."""
-    print(f"Processing: {filepath}")
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
+# Each enhancement is added once: a page that already has its marker is left as it is,
+# so enhancing an enhanced page (every build does) changes nothing.
+HEAD_MARKER = '<meta property="og:type"'
+STICKY_MARKER = 'class="sticky-phone"'
+EXIT_POPUP_MARKER = 'id="exit-popup"'
+TRUST_BADGES_MARKER = "<!-- Trust Badges Section -->"
+WHY_CHOOSE_MARKER = 'id="why-choose-us"'
+# Opens the <style> block enhanced pages used to carry; its rules are in styles.css now.
+LEGACY_STYLE_MARKER = "/* Sticky Phone Bar for Mobile */"
+
+def line_start(content, pos):
+    """Where pos's line begins, counting its newline, if only indentation precedes pos on it."""
+    start = len(content[:pos].rstrip(' \t'))
+    return start - 1 if start > 0 and content[start - 1] == '\n' else pos
+
+def enhance_html(content, filepath):
+    """Apply all enhancements to the HTML of the page stored at filepath."""
     title, description = extract_title_description(content)
     
-    # Remove existing inline CSS (between <style> and </style>)
-    # Keep the content but replace with external CSS link
-    style_pattern = r'<style>.*?</style>'
-    inline_style_match = re.search(style_pattern, content, re.DOTALL)
-    
-    if inline_style_match:
-        # Remove inline styles
-        content = re.sub(style_pattern, '', content, flags=re.DOTALL)
-    
-    # Build the enhanced head section
-    css_path = get_css_path(filepath)
-    js_path = get_js_path(filepath)
-    
-    enhanced_head = f'''
+    # The enhancements are styled by the site stylesheet (assets/css/styles.css). A page's own
+    # plain <style> blocks are dropped when it is first enhanced, and so is the inline copy of
+    # those rules that earlier runs added.
+    first_run = HEAD_MARKER not in content
+    inline_styles = [el for el in HtmlIndex(content).by_tag("style")
+                     if not el.attr_text and (first_run or LEGACY_STYLE_MARKER in el.inner(content))]
+    if inline_styles:
+        content = splice(content, [(line_start(content, el.start), el.end, '') for el in inline_styles])
+    
+    if HEAD_MARKER not in content:
+        # Build the enhanced head section
+        css_path = get_css_path(filepath)
+        js_path = get_js_path(filepath)
+        
+        enhanced_head = f'''
   <!-- External Stylesheet -->
   <link rel="stylesheet" href="{css_path}">
 {generate_favicon_links(filepath)}
@@ -604,33 +360,22 @@ def process_html_file(filepath):
   
   <!-- Event Tracking -->
   <script src="{js_path}" defer></script>'''
-    
-    # Add enhanced head content after viewport meta
-    content = re.sub(
-        r'(<meta name="viewport"[^>]*>)',
-        r'\1' + enhanced_head,
-        content,
-        count=1
-    )
-    
-    # Add additional CSS for enhanced features (inline for now, critical CSS)
-    enhanced_css = f'''
-  <style>
-{generate_sticky_phone_css()}
-{generate_trust_badges_css()}
-{generate_exit_popup_css()}
-{generate_why_choose_css()}
-{generate_before_after_css()}
-  </style>'''
-    
-    # Add before </head>
-    content = content.replace('</head>', enhanced_css + '\n</head>')
+        
+        # Add enhanced head content after viewport meta
+        content = re.sub(
+            r'(<meta name="viewport"[^>]*>)',
+            lambda m: m.group(1) + enhanced_head,
+            content,
+            count=1
+        )
     
     # Add sticky phone bar before </body>
-    content = content.replace('</body>', generate_sticky_phone_html() + '\n</body>')
+    if STICKY_MARKER not in content:
+        content = content.replace('</body>', generate_sticky_phone_html() + '\n</body>', 1)
     
     # Add exit intent popup placeholder
-    content = content.replace('</body>', generate_exit_intent_popup() + '\n</body>')
+    if EXIT_POPUP_MARKER not in content:
+        content = content.replace('</body>', generate_exit_intent_popup() + '\n</body>', 1)
     
     # Add lazy loading to images
     content = add_lazy_loading(content)
@@ -643,16 +388,27 @@ def process_html_file(filepath):
     if page_path == "/":
         # Add trust badges after hero section
         hero_end = content.find('</section>', content.find('class="hero"'))
-        if hero_end > 0:
+        if hero_end > 0 and TRUST_BADGES_MARKER not in content:
             content = content[:hero_end+10] + generate_trust_badges_section() + content[hero_end+10:]
         
         # Add Why Choose Us section (find a good spot)
         faq_section = content.find('id="faq"')
-        if faq_section > 0:
+        if faq_section > 0 and WHY_CHOOSE_MARKER not in content:
             section_start = content.rfind('<section', 0, faq_section)
             if section_start > 0:
                 content = content[:section_start] + generate_why_choose_us_section() + '\n' + content[section_start:]
     
+    return content
+
+def process_html_file(filepath):
+    """Process a single HTML file with all enhancements."""
+    print(f"Processing: {filepath}")
+    
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    content = enhance_html(content, filepath)
+    
     # Write the enhanced file
     with open(filepath, 'w', encoding='utf-8') as f:
         f.write(content)
@@ -661,10 +417,8 @@ def process_html_file(filepath):
 
 def main():
     """Main function to process all HTML files."""
-    base_dir = Path("/home/ubuntu/iowa_gutter_guards_improved")
-    
     # Find all HTML files
-    html_files = list(base_dir.glob("**/*.html"))
+    html_files = list(BASE_DIR.glob("**/*.html"))
     
     # Exclude template and backup files
     html_files = [f for f in html_files if 
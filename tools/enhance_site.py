@@ -19,6 +19,8 @@ import os
 import re
 from pathlib import Path
 
+from favicons import favicon_block
+
 BASE_URL = "https://www.iowagutterguards.com"
 PHONE_NUMBER = "(515) 249-9929"
 GA4_ID = "G-XXXXXXXXXX"  # Replace with actual GA4 ID
@@ -27,13 +29,7 @@ GA4_ID = "G-XXXXXXXXXX"  # Replace with actual GA4 ID
 def get_head_inject(title, description, canonical_path, og_image="/assets/images/og-image.jpg"):
     """Generate the head elements to inject into each page."""
     return f'''
-  <!-- Favicon -->
-  <link rel="icon" type="image/x-icon" href="/favicon.ico">
-  <link rel="icon" type="image/svg+xml" href="/favicon.svg">
-  <link rel="icon" type="image/png" sizes="32x32" href="/favicon-32x32.png">
-  <link rel="icon" type="image/png" sizes="16x16" href="/favicon-16x16.png">
-  <link rel="apple-touch-icon" sizes="180x180" href="/apple-touch-icon.png">
-  
+{favicon_block("/")}  
   <!-- Canonical URL -->
   <link rel="canonical" href="{BASE_URL}{canonical_path}">
   
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+City FAQ engine: a declarative rule table, checked once, rendered once per city record.
+
+The rules (update_faqs.CITY_FAQ_RULES) list the city-specific FAQ slots in
+page order. Each slot is a list of cases tried in order; a case is
+(condition, question, answer), where condition is None (always) or
+(field, test, value) and question/answer are "{field}" templates over the
+city's text profile fields, "name" and DERIVED_FIELDS.
+
+compile_rules() checks every field, test and template up front (a typo in a
+rule fails when the table is loaded, not on the one city that reaches it) and
+returns a function that reads the table directly: for each slot, the first
+case whose test holds has its templates filled with str.format_map. The
+fields the table uses are looked up (or derived) once per city.
+
+FaqEngine.faqs(city) gives the FAQs on the city's page (a tuple of Faq: the
+city's own questions, then the general ones, which come from the FAQ store's
+"city" section, tools/faq_store.py). FaqEngine.render() turns them into the
+FAQ <section> HTML; the general FAQs are rendered once, when the engine is
+built. Rendered blocks are cached by the city record's value, so each
+distinct record is rendered once per process. The FAQPage schema is not made
+here: tools/inject_schema.py reads it back from the rendered <details>, the
+same way for every page.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from html import escape
+from string import Formatter
+from typing import Callable, Iterable, NamedTuple
+
+from city_registry import PROFILE_FIELDS
+
+# Condition tests: (field, test, value) holds when TESTS[test](city[field], value).
+TESTS: dict[str, Callable[[object, object], bool]] = {
+    "==": lambda actual, expected: actual == expected,
+    "contains": lambda actual, words: any(word in actual for word in words),
+}
+
+# Template fields computed from the profile.
+DERIVED_FIELDS: dict[str, Callable[[dict], str]] = {
+    "tree_list": lambda city: ", ".join(city["tree_types"][:2]),
+    "home_style_first": lambda city: city["home_style"].split(",")[0],
+}
+
+# tree_types is a list; templates use it through tree_list.
+TEMPLATE_FIELDS = {"name", *PROFILE_FIELDS, *DERIVED_FIELDS} - {"tree_types"}
+
+ITEM_HTML = '''          <details>
+            <summary><strong>{question}</strong></summary>
+            <p style="margin-top:0.4rem; font-size:0.88rem; color:var(--muted);">
+              {answer}
+            </p>
+          </details>
+
+'''
+
+SECTION_HTML = '''      <section class="section" id="faq">
+        <h2>Frequently Asked Questions About Gutter Guards in {name}</h2>
+        <p>
+          These are the questions we hear most often from {name} homeowners. If you don't see your question here, call us at <a href="tel:+15153295128">(515) 329-5128</a> or include it in your estimate request.
+        </p>
+        <div style="display:grid; gap:0.75rem;">
+{items}
+        </div>
+      </section>'''
+
+class Faq(NamedTuple):
+    question: str
+    answer: str
+
+    def schema_node(self) -> dict:
+        """The schema.org Question node for this FAQ."""
+        return {"@type": "Question", "name": self.question, "acceptedAnswer": {"@type": "Answer", "text": self.answer}}
+
+@dataclass(frozen=True, slots=True)
+class FaqBlock:
+    faqs: tuple[Faq, ...]
+    html: str                   # the <section id="faq"> element
+
+# -----------------------------
+# COMPILE
+# -----------------------------
+
+def check_template(source: str, allowed: set[str], where: str) -> set[str]:
+    """The fields a "{field}" template uses; fails on any field outside `allowed`, or a format spec."""
+    fields = set()
+    for _, name, spec, conversion in Formatter().parse(source):
+        if name is not None:
+            if name not in allowed or spec or conversion:
+                raise SystemExit(f"{where}: unknown template field {{{name}}}")
+            fields.add(name)
+    return fields
+
+def compile_template(source: str, params: tuple[str, ...]) -> Callable[..., str]:
+    """A "{field}" template as a function of `params`, in that order."""
+    check_template(source, set(params), "template")
+
+    def render(*values: str) -> str:
+        return source.format_map(dict(zip(params, values)))
+    return render
+
+render_item = compile_template(ITEM_HTML, ("question", "answer"))
+render_section = compile_template(SECTION_HTML, ("name", "items"))
+
+class _Case(NamedTuple):
+    test: Callable[[object, object], bool] | None   # None: always
+    field: str
+    expected: object
+    question: str
+    answer: str
+
+def compile_rules(rules: Iterable[tuple[str, list[tuple]]]) -> Callable[[dict], tuple[Faq, ...]]:
+    """The checked rule table as a function: city record -> its FAQs, one per slot."""
+    slots: list[tuple[_Case, ...]] = []
+    used: set[str] = set()
+    for slot, cases in rules:
+        where = f"FAQ rule {slot!r}"
+        if not cases or cases[-1][0] is not None:
+            raise SystemExit(f"{where} needs a last case with no condition")
+        checked = []
+        for n, (condition, question, answer) in enumerate(cases, 1):
+            used |= check_template(question, TEMPLATE_FIELDS, where) | check_template(answer, TEMPLATE_FIELDS, where)
+            if condition is None:
+                if n < len(cases):
+                    raise SystemExit(f"{where}: case {n} has no condition, so the {len(cases) - n} after it never apply")
+                checked.append(_Case(None, "", None, question, answer))
+                continue
+            field, test, expected = condition
+            if field not in PROFILE_FIELDS:
+                raise SystemExit(f"{where}: unknown field {field!r}")
+            if test not in TESTS:
+                raise SystemExit(f"{where}: unknown test {test!r} (use one of {', '.join(TESTS)})")
+            checked.append(_Case(TESTS[test], field, expected, question, answer))
+        slots.append(tuple(checked))
+
+    plain = sorted(used - set(DERIVED_FIELDS))
+    derived = [(name, DERIVED_FIELDS[name]) for name in sorted(used & set(DERIVED_FIELDS))]
+
+    def city_faqs(city: dict) -> tuple[Faq, ...]:
+        values = {name: city[name] for name in plain}
+        values.update((name, fn(city)) for name, fn in derived)
+        faqs = []
+        for cases in slots:
+            case = next(c for c in cases if c.test is None or c.test(city[c.field], c.expected))
+            faqs.append(Faq(case.question.format_map(values), case.answer.format_map(values)))
+        return tuple(faqs)
+    return city_faqs
+
+# -----------------------------
+# RENDER
+# -----------------------------
+
+def render_items(faqs: Iterable[Faq]) -> list[str]:
+    """The <details> HTML of each FAQ.
+
+    Questions and answers are plain text: they are escaped into the HTML, as
+    the homepage FAQs are (expand_home_faq_fixed.build_details_block).
+    """
+    return [render_item(escape(faq.question, quote=False), escape(faq.answer, quote=False)) for faq in faqs]
+
+def _record_key(city: dict) -> tuple:
+    return tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in city.items()))
+
+class FaqEngine:
+    def __init__(self, rules: Iterable[tuple[str, list[tuple]]], general: Iterable[Faq]) -> None:
+        self.city_faqs = compile_rules(rules)
+        self.general = tuple(general)
+        self._general_items = render_items(self.general)
+        self._rendered: dict[tuple, FaqBlock] = {}
+
+    def faqs(self, city: dict) -> tuple[Faq, ...]:
+        """Everything on the city's page: its own FAQs, then the general ones."""
+        return self.city_faqs(city) + self.general
+
+    def render(self, city: dict) -> FaqBlock:
+        """The rendered block for a city record (name plus profile), cached by the record's value."""
+        key = _record_key(city)
+        block = self._rendered.get(key)
+        if block is None:
+            own = self.city_faqs(city)
+            items = render_items(own) + self._general_items
+            html = render_section(escape(city["name"], quote=False), "".join(items).rstrip())
+            block = self._rendered[key] = FaqBlock(own + self.general, html)
+        return block
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+FAQ store: the site's shared FAQs, from data/faqs.json.
+
+The homepage FAQ section (tools/expand_home_faq_fixed.py) and the general
+questions at the end of every city FAQ section (update_faqs.py) both read
+their entries from here, so adding or rewording an FAQ is a data edit: change
+data/faqs.json and run the build, which rewrites only the pages that embed
+the section that changed. The city-specific questions are rules, not entries
+(update_faqs.CITY_FAQ_RULES).
+
+The file is read and validated on first use, once per process, and indexed
+by id and by normalized question (per section), so "is this question already
+on the page?" is one dict lookup. Each record:
+
+  id        stable lowercase key ("ice-dams")
+  sections  where it is shown, in file order: "home", "city", or [] (kept, not shown)
+  question  plain text
+  answer    plain text
+
+Questions are compared with normalize_question(): case, curly quotes,
+punctuation and spacing don't make two questions different. A question may
+appear in more than one section (with a different answer each), but only once
+within a section.
+
+Usage (standalone: validate the file and list the FAQs by section):
+  python tools/faq_store.py
+"""
+from __future__ import annotations
+
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from faq_engine import Faq
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+FAQS_PATH = SITE_ROOT / "data" / "faqs.json"
+
+SECTIONS = ("home", "city")
+ID_RE = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
+TEXT_FIELDS = ("id", "question", "answer")
+
+_QUOTES = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"'})
+_NOISE_RE = re.compile(r"[^\w\s']+")
+
+def normalize_question(text: str) -> str:
+    """The key questions are deduplicated by: "What’s  gutter-guard cost?" == "whats gutter guard cost"."""
+    text = unicodedata.normalize("NFKC", text).translate(_QUOTES).casefold().replace("'", "")
+    return " ".join(_NOISE_RE.sub(" ", text).split())
+
+class FaqStore:
+    """FAQ records in file order, indexed by id and by (section, normalized question)."""
+
+    def __init__(self, records: Iterable[dict]) -> None:
+        self.records = list(records)
+        self.by_id = {faq["id"]: faq for faq in self.records}
+        self.by_question: dict[str, dict[str, dict]] = {name: {} for name in SECTIONS}
+        for faq in self.records:
+            for name in faq["sections"]:
+                self.by_question[name][normalize_question(faq["question"])] = faq
+        self._sections = {
+            name: tuple(Faq(faq["question"], faq["answer"]) for faq in by_q.values())
+            for name, by_q in self.by_question.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.records)
+
+    def __contains__(self, faq_id: object) -> bool:
+        return faq_id in self.by_id
+
+    def __getitem__(self, faq_id: str) -> dict:
+        return self.by_id[faq_id]
+
+    def get(self, faq_id: str | None) -> dict | None:
+        return self.by_id.get(faq_id)
+
+    def find(self, section: str, question: str) -> dict | None:
+        """The entry in `section` asking `question` (compared normalized), if any."""
+        return self.by_question[section].get(normalize_question(question))
+
+    def section(self, name: str) -> tuple[Faq, ...]:
+        """The FAQs shown in a section, in file order."""
+        return self._sections[name]
+
+# -----------------------------
+# LOAD + VALIDATE
+# -----------------------------
+
+def validate(records: object) -> list[str]:
+    """Every problem with a parsed FAQ file (empty if it is usable)."""
+    if not isinstance(records, list):
+        return ["top level must be a list of FAQ records"]
+    errors = []
+    ids: set[str] = set()
+    questions: dict[tuple[str, str], str] = {}
+    for i, faq in enumerate(records):
+        if not isinstance(faq, dict):
+            errors.append(f"record {i}: not an object")
+            continue
+        where = f"record {i} ({faq.get('id', '?')})"
+        for name in TEXT_FIELDS:
+            if not isinstance(faq.get(name), str) or not faq[name].strip():
+                errors.append(f"{where}: missing or empty {name!r}")
+        faq_id = faq.get("id")
+        if isinstance(faq_id, str):
+            if not ID_RE.match(faq_id):
+                errors.append(f"{where}: id must be lowercase words joined by '-'")
+            if faq_id in ids:
+                errors.append(f"{where}: duplicate id")
+            ids.add(faq_id)
+        sections = faq.get("sections")
+        if not isinstance(sections, list) or any(name not in SECTIONS for name in sections):
+            errors.append(f"{where}: sections must be a list of {', '.join(SECTIONS)}")
+            continue
+        if len(set(sections)) != len(sections):
+            errors.append(f"{where}: section listed twice")
+        if not isinstance(faq.get("question"), str):
+            continue
+        key = normalize_question(faq["question"])
+        for name in sections:
+            other = questions.setdefault((name, key), str(faq_id))
+            if other != str(faq_id):
+                errors.append(f"{where}: same question as {other!r} in section {name!r}")
+    return errors
+
+@lru_cache(maxsize=None)
+def load_faqs(path: Path = FAQS_PATH) -> FaqStore:
+    """The validated store (read on first use, once per process)."""
+    try:
+        records = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise SystemExit(f"FAQ store not found: {path}")
+    except json.JSONDecodeError as e:
+        raise SystemExit(f"FAQ store {path} is not valid JSON: {e}")
+    errors = validate(records)
+    if errors:
+        raise SystemExit(f"Invalid FAQ store {path}:\n  " + "\n  ".join(errors))
+    return FaqStore(records)
+
+def main() -> None:
+    store = load_faqs()
+    for name in SECTIONS:
+        faqs = store.section(name)
+        print(f"{name} ({len(faqs)}):")
+        for faq in faqs:
+            print(f"  {faq.question}")
+    unshown = sum(1 for faq in store if not faq["sections"])
+    print(f"{len(store)} FAQs in {FAQS_PATH.relative_to(SITE_ROOT)} ({unshown} not shown): OK")
+
+if __name__ == "__main__":
+    main()
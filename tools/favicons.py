@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+The site's favicon set, kept as committed, and one minimal set of links per page.
+
+The icons are the brand badge as drawn (IGG over "IOWA GUTTER GUARDS"); the
+committed files are the source and nothing renders them:
+
+  favicon.ico           16/32 px, for old browsers and /favicon.ico requests
+  favicon-192x192.png   high-DPI tabs, Android / web manifest
+  favicon-512x512.png   web manifest (install splash)
+  apple-touch-icon.png  180 px, iOS home screen
+
+To change the icons, replace these files. generate_favicons() checks they
+are all there, optimizes the PNGs losslessly (ancillary metadata stripped,
+image data recompressed at zlib level 9; a PNG that is already optimal is
+left as it is) and writes site.webmanifest.
+
+dedupe_favicon_links() is the favicons build stage: it removes every icon,
+apple-touch-icon and manifest <link> of a page (repeated enhancement runs
+pile them up) and puts back one block:
+
+  <link rel="icon" href="favicon.ico" sizes="32x32">
+  <link rel="icon" href="favicon-192x192.png" type="image/png" sizes="192x192">
+  <link rel="apple-touch-icon" href="apple-touch-icon.png">
+  <link rel="manifest" href="site.webmanifest">
+
+Usage (standalone; tools/build.py runs this as the favicons stage):
+  python tools/favicons.py           # optimize the icons, rewrite page links
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import struct
+import zlib
+from pathlib import Path
+
+from html_index import HtmlIndex, splice
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+
+ICO = "favicon.ico"
+PNGS = {"apple-touch-icon.png": 180, "favicon-192x192.png": 192, "favicon-512x512.png": 512}
+TAB_ICON = "favicon-192x192.png"
+MANIFEST = "site.webmanifest"
+
+SITE_NAME = "Iowa Gutter Guards"
+SHORT_NAME = "IGG"
+THEME_COLOR = "#ffffff"  # the icons' background
+
+ICON_RELS = {"icon", "apple-touch-icon", "manifest", "mask-icon"}
+FAVICON_COMMENT_RE = re.compile(r"<!--\s*Favicons?\s*-->")
+
+# -----------------------------
+# PNG / ICO
+# -----------------------------
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Chunks that change how the pixels are decoded or displayed; everything else is metadata.
+KEEP_CHUNKS = {b"IHDR", b"PLTE", b"tRNS", b"gAMA", b"cHRM", b"sRGB", b"iCCP", b"sBIT", b"IDAT", b"IEND"}
+
+def png_chunks(data: bytes) -> list[tuple[bytes, bytes]]:
+    if not data.startswith(PNG_SIGNATURE):
+        raise SystemExit("Not a PNG file")
+    chunks, i = [], len(PNG_SIGNATURE)
+    while i < len(data):
+        length, kind = struct.unpack(">I4s", data[i:i + 8])
+        chunks.append((kind, data[i + 8:i + 8 + length]))
+        i += 12 + length
+    return chunks
+
+def _chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+def optimize_png(data: bytes) -> bytes:
+    """Same pixels, fewer bytes: drop metadata chunks and recompress the image data."""
+    chunks = png_chunks(data)
+    raw = zlib.decompress(b"".join(body for kind, body in chunks if kind == b"IDAT"))
+    idat = min(zlib.compress(raw, 9), b"".join(body for kind, body in chunks if kind == b"IDAT"), key=len)
+
+    out = [PNG_SIGNATURE]
+    for kind, body in chunks:
+        if kind == b"IDAT":
+            if idat is not None:
+                out.append(_chunk(b"IDAT", idat))
+                idat = None
+        elif kind in KEEP_CHUNKS:
+            out.append(_chunk(kind, body))
+    optimized = b"".join(out)
+    return optimized if len(optimized) < len(data) else data
+
+def web_manifest() -> str:
+    manifest = {
+        "name": SITE_NAME,
+        "short_name": SHORT_NAME,
+        "icons": [
+            {"src": f"/{rel}", "type": "image/png", "sizes": f"{size}x{size}"}
+            for rel, size in PNGS.items() if size >= 192
+        ],
+        "start_url": "/",
+        "display": "standalone",
+        "theme_color": THEME_COLOR,
+        "background_color": THEME_COLOR,
+    }
+    return json.dumps(manifest, indent=2) + "\n"
+
+# -----------------------------
+# GENERATE
+# -----------------------------
+
+def _write_if_changed(rel: str, data: bytes, report: list[tuple[str, int, int]]) -> None:
+    path = SITE_ROOT / rel
+    before = path.read_bytes() if path.is_file() else b""
+    if before != data:
+        path.write_bytes(data)
+        report.append((rel, len(before), len(data)))
+
+def generate_favicons() -> list[tuple[str, int, int]]:
+    """Optimize the committed icons and write the manifest. Returns (file, old bytes, new bytes) per file written."""
+    missing = [rel for rel in (ICO, *PNGS) if not (SITE_ROOT / rel).is_file()]
+    if missing:
+        raise SystemExit(f"Missing {', '.join(missing)}; the favicon set is committed, not generated")
+    report: list[tuple[str, int, int]] = []
+    _write_if_changed(MANIFEST, web_manifest().encode("utf-8"), report)
+    for rel in PNGS:
+        _write_if_changed(rel, optimize_png((SITE_ROOT / rel).read_bytes()), report)
+    return report
+
+def print_report(report: list[tuple[str, int, int]]) -> None:
+    for rel, before, after in report:
+        change = f"{before:,} -> {after:,} bytes" if before else f"{after:,} bytes (new)"
+        print(f"  {rel}: {change}")
+    print(f"Favicons: {len(report)} file(s) written.")
+
+# -----------------------------
+# LINKS
+# -----------------------------
+
+def favicon_block(prefix: str = "", indent: str = "  ") -> str:
+    """The page's favicon links; `prefix` leads from the page to the site root ("../../" or "/")."""
+    lines = [
+        "<!-- Favicons -->",
+        f'<link rel="icon" href="{prefix}{ICO}" sizes="32x32">',
+        f'<link rel="icon" href="{prefix}{TAB_ICON}" type="image/png" sizes="192x192">',
+        f'<link rel="apple-touch-icon" href="{prefix}apple-touch-icon.png">',
+        f'<link rel="manifest" href="{prefix}{MANIFEST}">',
+    ]
+    return "".join(f"{indent}{line}\n" for line in lines)
+
+def _line_span(html: str, start: int, end: int) -> tuple[int, int]:
+    """Widen start/end to whole lines when nothing else is on them."""
+    line_start = html.rfind("\n", 0, start) + 1
+    line_end = html.find("\n", end)
+    line_end = len(html) if line_end == -1 else line_end + 1
+    if html[line_start:start].strip() or html[end:line_end].strip():
+        return start, end
+    return line_start, line_end
+
+def dedupe_favicon_links(html: str, page_rel: str) -> str:
+    """Replace every favicon/manifest link of the page with one minimal block."""
+    head_end = html.find("</head>")
+    head_end = len(html) if head_end == -1 else head_end
+    index = HtmlIndex(html)
+    spans = [
+        el for el in index.by_tag("link")
+        if el.start < head_end and ICON_RELS & set(el.attrs.get("rel", "").lower().split())
+    ]
+    if not spans:
+        return html
+    edits = [_line_span(html, el.start, el.end) for el in spans]
+    edits += [_line_span(html, *m.span()) for m in FAVICON_COMMENT_RE.finditer(html, 0, head_end)]
+    edits.sort()
+
+    prefix = "../" * page_rel.count("/")
+    insert_at = edits[0][0]
+    block = favicon_block(prefix)
+    if html[insert_at - 1:insert_at] != "\n":
+        block = "\n" + block
+    merged = []
+    for start, end in edits:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return splice(html, [(s, e, block if s == insert_at else "") for s, e in merged])
+
+def main() -> None:
+    argparse.ArgumentParser(description="Optimize the favicon set and rewrite every page's favicon links.").parse_args()
+    print_report(generate_favicons())
+
+    from pipeline import discover_pages
+
+    changed = 0
+    for rel, page in discover_pages().items():
+        if page.source is None or "template" in Path(rel).name.lower():
+            continue
+        html = dedupe_favicon_links(page.source, rel)
+        if html != page.source:
+            page.path.write_text(html, encoding="utf-8")
+            changed += 1
+    print(f"OK: rewrote favicon links in {changed} page(s).")
+
+if __name__ == "__main__":
+    main()
@@ -79,6 +79,14 @@ def comment_out_ga4(content):
     
     return content
 
+def finalize_html(content):
+    """Apply all finalization steps to a page's HTML."""
+    # Add Bing verification
+    content = add_bing_verification(content)
+    
+    # Comment out GA4
+    return comment_out_ga4(content)
+
 def process_file(filepath):
     """Process a single HTML file."""
     try:
@@ -86,12 +94,7 @@ def process_file(filepath):
             content = f.read()
         
         original_content = content
-        
-        # Add Bing verification
-        content = add_bing_verification(content)
-        
-        # Comment out GA4
-        content = comment_out_ga4(content)
+        content = finalize_html(content)
         
         if content != original_content:
             with open(filepath, 'w', encoding='utf-8') as f:
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Publish the site stylesheet and script under content-hashed file names.
+
+  assets/css/styles.min.css -> assets/css/styles.3f9a1c2e.min.css
+  assets/js/tracking.js     -> assets/js/tracking.8b04d7aa.min.js   (minified)
+
+Every <link href> / <script src> that points at an asset (by its plain name
+or an older fingerprint, relative or root-absolute) is rewritten to the
+current name, older fingerprinted copies are deleted, and _headers gets a
+one-year immutable Cache-Control for each current file. A changed file gets
+a new name, so browsers and the CDN never need to revalidate.
+
+Usage (standalone; tools/build.py runs this before writing pages):
+  python tools/fingerprint_assets.py
+"""
+from __future__ import annotations
+
+import hashlib
+import posixpath
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable
+
+from html_index import HtmlIndex, splice
+from js_minify import minify_js
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+HEADERS_PATH = SITE_ROOT / "_headers"
+HEADERS_START = "# Fingerprinted assets (written by tools/fingerprint_assets.py)"
+HEADERS_END = "# /Fingerprinted assets"
+IMMUTABLE = "Cache-Control: public, max-age=31536000, immutable"
+
+DIGEST_CHARS = 8
+
+# Directories whose file names already carry a content hash (see tools/responsive_images.py).
+IMMUTABLE_DIRS = ["assets/images/variants"]
+
+@dataclass(frozen=True)
+class Asset:
+    source: str                                 # file the pages reference by its plain name
+    minify: Callable[[str], str] | None = None  # None for files that are already minified
+
+    @property
+    def stem(self) -> str:
+        name = posixpath.basename(self.source)
+        return name.split(".", 1)[0]
+
+    @property
+    def suffix(self) -> str:
+        return posixpath.splitext(self.source)[1]
+
+    def name_for(self, digest: str) -> str:
+        return posixpath.join(posixpath.dirname(self.source), f"{self.stem}.{digest}.min{self.suffix}")
+
+    def matches(self, rel: str) -> bool:
+        """True for the plain name and any fingerprinted name of this asset."""
+        if rel == self.source:
+            return True
+        pattern = rf"{re.escape(self.stem)}\.[0-9a-f]{{{DIGEST_CHARS}}}\.min{re.escape(self.suffix)}"
+        return (posixpath.dirname(rel) == posixpath.dirname(self.source)
+                and re.fullmatch(pattern, posixpath.basename(rel)) is not None)
+
+# styles.min.css is written minified by tools/prune_css.py.
+ASSETS = [
+    Asset("assets/css/styles.min.css"),
+    Asset("assets/js/tracking.js", minify=minify_js),
+]
+
+# -----------------------------
+# ASSETS
+# -----------------------------
+
+def fingerprint(asset: Asset) -> str:
+    """Write the asset under its content-hashed name; returns that name."""
+    text = (SITE_ROOT / asset.source).read_text(encoding="utf-8")
+    if asset.minify is not None:
+        text = asset.minify(text)
+    data = text.encode("utf-8")
+    rel = asset.name_for(hashlib.sha256(data).hexdigest()[:DIGEST_CHARS])
+
+    path = SITE_ROOT / rel
+    if not path.is_file() or path.read_bytes() != data:
+        path.write_bytes(data)
+    for old in path.parent.iterdir():
+        old_rel = old.relative_to(SITE_ROOT).as_posix()
+        if old_rel not in (rel, asset.source) and asset.matches(old_rel):
+            old.unlink()
+    return rel
+
+def write_headers(names: Iterable[str]) -> None:
+    """Replace the fingerprinted-assets block of _headers, keeping any other rules."""
+    block = [HEADERS_START]
+    for path in sorted(f"/{rel}" for rel in names) + [f"/{d}/*" for d in IMMUTABLE_DIRS]:
+        block += [path, f"  {IMMUTABLE}"]
+    block.append(HEADERS_END)
+
+    text = HEADERS_PATH.read_text(encoding="utf-8") if HEADERS_PATH.is_file() else ""
+    start = text.find(HEADERS_START)
+    end = text.find(HEADERS_END, start)
+    if start != -1 and end != -1:
+        text = text[:start] + "\n".join(block) + text[end + len(HEADERS_END):]
+    else:
+        text = text + ("\n" if text and not text.endswith("\n") else "") + "\n".join(block) + "\n"
+    HEADERS_PATH.write_text(text, encoding="utf-8")
+
+def fingerprint_assets() -> dict[Asset, str]:
+    names = {asset: fingerprint(asset) for asset in ASSETS}
+    write_headers(names.values())
+    return names
+
+# -----------------------------
+# REFERENCES
+# -----------------------------
+
+def resolve(page_rel: str, url: str) -> str | None:
+    """Site-relative path a page's href/src points at, or None for external URLs."""
+    path = re.split(r"[?#]", url, 1)[0]
+    if not path or "://" in path or path.startswith(("//", "data:", "mailto:", "tel:")):
+        return None
+    if path.startswith("/"):
+        return posixpath.normpath(path.lstrip("/"))
+    return posixpath.normpath(posixpath.join(posixpath.dirname(page_rel), path))
+
+def rewrite_references(html: str, page_rel: str, names: dict[Asset, str]) -> str:
+    """Point every <link href>/<script src> to an asset at its current fingerprinted name."""
+    index = HtmlIndex(html)
+    edits = []
+    for tag, attr in (("link", "href"), ("script", "src")):
+        for el in index.by_tag(tag):
+            url = el.attrs.get(attr)
+            target = resolve(page_rel, url) if url else None
+            if target is None:
+                continue
+            asset = next((a for a in names if a.matches(target)), None)
+            if asset is None or target == names[asset]:
+                continue
+            new_url = re.sub(r"[^/?#]+(?=[?#]|$)", posixpath.basename(names[asset]), url, count=1)
+            open_tag = el.open_tag(html)
+            m = re.search(rf"""(?<=[\s"']){attr}\s*=\s*(["']?){re.escape(url)}\1""", open_tag, re.I)
+            if m is None:
+                continue
+            replaced = m.group().replace(url, new_url)
+            edits.append((el.start + m.start(), el.start + m.end(), replaced))
+    return splice(html, edits) if edits else html
+
+def main() -> None:
+    from pipeline import discover_pages
+
+    names = fingerprint_assets()
+    for asset, rel in names.items():
+        print(f"  {asset.source} -> {rel}")
+
+    changed = 0
+    for rel, page in discover_pages().items():
+        if page.source is None or "template" in Path(rel).name.lower():
+            continue
+        html = rewrite_references(page.source, rel, names)
+        if html != page.source:
+            page.path.write_text(html, encoding="utf-8")
+            changed += 1
+    print(f"OK: rewrote asset references in {changed} page(s); updated {HEADERS_PATH.name}.")
+
+if __name__ == "__main__":
+    main()
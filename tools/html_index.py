@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Streaming HTML element locator shared by the page transforms.
+
+Lookups find an element's exact offsets and transforms splice there, instead
+of running a backtracking `.*?` regex over the whole page for each edit. Each
+lookup is one C-speed finditer over just the tags it needs: by_tag() pairs the
+open/close tags of one tag name with a stack (so nesting is handled), and
+by_id()/by_class() scan only the attribute's occurrences. Results
+are cached on the index, so repeated lookups on one page are dict hits.
+
+Comments and the contents of <script>/<style>/<textarea>/<title> are opaque:
+markup-looking strings inside them are ignored. Elements that are never
+closed are left out, so callers never cut a page off at the end of the
+document.
+"""
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Iterator
+
+ATTRS = r"""((?:[^>"']+|"[^"]*"|'[^']*')*)"""
+OPAQUE_RE = re.compile(r"<!--.*?-->|<(script|style|textarea|title)(?=[\s/>])" + ATTRS + ">", re.I | re.S)
+ATTR_RE = re.compile(r"""([^\s=/>"']+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>"']+)))?""")
+
+RAW_TEXT_TAGS = {"script", "style", "textarea", "title"}
+RAW_TEXT_CLOSE = {tag: re.compile(rf"</{tag}\s*>", re.I) for tag in RAW_TEXT_TAGS}
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+@lru_cache(maxsize=None)
+def tag_re(tag: str) -> re.Pattern:
+    """Open and close tags of one element name."""
+    return re.compile(rf"<(/?){re.escape(tag)}(?=[\s/>])" + ATTRS + ">", re.I)
+
+ATTR_SEPARATORS = frozenset(" \t\r\n\"'")
+OPEN_TAG_RE = re.compile(r"<([a-zA-Z][a-zA-Z0-9:-]*)" + ATTRS + ">")
+
+@lru_cache(maxsize=None)
+def attr_value_re(attr: str) -> re.Pattern:
+    """`attr="value"` anywhere in the page; matches outside an open tag are discarded by the caller."""
+    return re.compile(rf"""{re.escape(attr)}\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>"']+))""")
+
+def parse_attrs(attr_text: str) -> dict[str, str]:
+    attrs = {}
+    for m in ATTR_RE.finditer(attr_text):
+        name = m.group(1).lower()
+        if name not in attrs:
+            value = m.group(2) if m.group(2) is not None else m.group(3) if m.group(3) is not None else m.group(4)
+            attrs[name] = value or ""
+    return attrs
+
+@dataclass(slots=True)
+class Element:
+    tag: str
+    start: int          # offset of "<" of the open tag
+    open_end: int       # offset just past the open tag's ">"
+    close_start: int    # offset of the close tag ("</..."); == open_end for void elements
+    end: int            # offset just past the close tag
+    attr_text: str
+    parent: Element | None = None   # nearest enclosing element of the same tag
+    children: list[Element] = field(default_factory=list)
+    _attrs: dict[str, str] | None = None
+
+    @property
+    def attrs(self) -> dict[str, str]:
+        if self._attrs is None:
+            self._attrs = parse_attrs(self.attr_text)
+        return self._attrs
+
+    @property
+    def id(self) -> str | None:
+        return self.attrs.get("id")
+
+    @property
+    def classes(self) -> list[str]:
+        return self.attrs.get("class", "").split()
+
+    def open_tag(self, html: str) -> str:
+        return html[self.start:self.open_end]
+
+    def outer(self, html: str) -> str:
+        return html[self.start:self.end]
+
+    def inner(self, html: str) -> str:
+        return html[self.open_end:self.close_start]
+
+class OpaqueRanges:
+    """Offsets covered by comments and raw-text element contents."""
+
+    def __init__(self, html: str):
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        skip_to = 0
+        for m in OPAQUE_RE.finditer(html):
+            if m.start() < skip_to:
+                continue
+            if m.group(1) is None:  # comment
+                start, end = m.span()
+            else:
+                close = RAW_TEXT_CLOSE[m.group(1).lower()].search(html, m.end())
+                start, end = m.end(), close.start() if close else len(html)
+            self.starts.append(start)
+            self.ends.append(end)
+            skip_to = end
+
+    def __contains__(self, offset: int) -> bool:
+        i = bisect_right(self.starts, offset) - 1
+        return i >= 0 and offset < self.ends[i]
+
+class TagTree:
+    """Every closed element of one tag name, in document order, with same-tag nesting."""
+
+    def __init__(self, html: str, tag: str, opaque: OpaqueRanges | None = None):
+        self.html = html
+        self.tag = tag.lower()
+        self.elements: list[Element] = []
+        self.roots: list[Element] = []
+        self._scan(opaque if opaque is not None else OpaqueRanges(html))
+        self._by_start = {el.start: el for el in self.elements}
+        self._starts = [el.start for el in self.elements]
+
+    def _scan(self, opaque: OpaqueRanges) -> None:
+        tag = self.tag
+        void = tag in VOID_TAGS
+        stack: list[Element] = []
+        opened: list[Element] = []
+        for m in tag_re(tag).finditer(self.html):
+            start, end = m.span()
+            if start in opaque:
+                continue
+            closing, attr_text = m.groups()
+            if closing:
+                if stack:
+                    el = stack.pop()
+                    el.close_start, el.end = start, end
+                continue
+            el = Element(tag, start, end, -1, -1, attr_text, stack[-1] if stack else None)
+            opened.append(el)
+            if void or attr_text.rstrip().endswith("/"):
+                el.close_start = el.end = end
+            else:
+                stack.append(el)
+
+        for el in opened:
+            if el.end < 0:
+                continue
+            parent = el.parent
+            while parent is not None and parent.end < 0:
+                parent = parent.parent
+            el.parent = parent
+            (parent.children if parent is not None else self.roots).append(el)
+            self.elements.append(el)
+
+    def at(self, start: int) -> Element | None:
+        return self._by_start.get(start)
+
+    def containing(self, offset: int) -> Element | None:
+        """Innermost element whose open tag starts at or before `offset` and that is still open there."""
+        i = bisect_right(self._starts, offset) - 1
+        el = self.elements[i] if i >= 0 else None
+        while el is not None and el.end <= offset:
+            el = el.parent
+        return el
+
+class HtmlIndex:
+    """Lazy element lookups on one document; each kind of lookup scans the page at most once."""
+
+    def __init__(self, html: str):
+        self.html = html
+        self._opaque: OpaqueRanges | None = None
+        self._trees: dict[str, TagTree] = {}
+        self._ids: dict[str, Element | None] = {}
+        self._classes: dict[str, list[Element]] = {}
+
+    @property
+    def opaque(self) -> OpaqueRanges:
+        if self._opaque is None:
+            self._opaque = OpaqueRanges(self.html)
+        return self._opaque
+
+    def tree(self, tag: str) -> TagTree:
+        tag = tag.lower()
+        if tag not in self._trees:
+            self._trees[tag] = TagTree(self.html, tag, self.opaque)
+        return self._trees[tag]
+
+    def _open_tags_where(self, attr: str, accept: Callable[[str], bool]) -> Iterator[tuple[str, int]]:
+        """(tag, start) of each open tag whose `attr` value passes `accept`, in document order."""
+        html = self.html
+        for m in attr_value_re(attr).finditer(html):
+            if m.start() == 0 or html[m.start() - 1] not in ATTR_SEPARATORS:  # e.g. data-id=, ?id=, or no tag
+                continue
+            value = next(v for v in m.groups() if v is not None)
+            if not accept(value):
+                continue
+            start = html.rfind("<", 0, m.start())
+            tag = OPEN_TAG_RE.match(html, start)
+            # Discard matches in text content, or in comments and scripts.
+            if tag is None or tag.end() < m.end() or start in self.opaque:
+                continue
+            yield tag.group(1).lower(), start
+
+    def by_tag(self, tag: str) -> list[Element]:
+        return self.tree(tag).elements
+
+    def by_id(self, element_id: str) -> Element | None:
+        if element_id not in self._ids:
+            found = next(self._open_tags_where("id", element_id.__eq__), None)
+            self._ids[element_id] = self.tree(found[0]).at(found[1]) if found else None
+        return self._ids[element_id]
+
+    def by_class(self, cls: str) -> list[Element]:
+        if cls not in self._classes:
+            found = []
+            for tag, start in self._open_tags_where("class", lambda value: cls in value.split()):
+                el = self.tree(tag).at(start)
+                if el is not None:
+                    found.append(el)
+            self._classes[cls] = found
+        return self._classes[cls]
+
+class SectionIndex(TagTree):
+    """Nesting tree of the <section> elements in one document, indexed by id."""
+
+    def __init__(self, html: str):
+        super().__init__(html, "section")
+        self._by_id: dict[str, Element] = {}
+        for el in self.elements:
+            if "id" in el.attr_text:
+                el_id = el.id
+                if el_id is not None and el_id not in self._by_id:
+                    self._by_id[el_id] = el
+
+    @property
+    def sections(self) -> list[Element]:
+        return self.elements
+
+    def by_id(self, section_id: str) -> Element | None:
+        return self._by_id.get(section_id)
+
+def remove_element(html: str, el: Element | None) -> tuple[str, bool]:
+    if el is None:
+        return html, False
+    return html[:el.start] + html[el.end:], True
+
+def splice(html: str, edits: list[tuple[int, int, str]]) -> str:
+    """Apply non-overlapping (start, end, replacement) edits in one pass."""
+    parts = []
+    pos = 0
+    for start, end, text in sorted(edits):
+        parts.append(html[pos:start])
+        parts.append(text)
+        pos = end
+    parts.append(html[pos:])
+    return "".join(parts)
@@ -1,218 +1,382 @@
 #!/usr/bin/env python3
+"""
+JSON-LD for every page: one <script id="schema-ld"> @graph per page.
+
+The site-wide nodes (LocalBusiness, WebSite) are the same on every page, so
+they are serialized once per process and the encoded fragments reused; each
+page's graph is assembled from those fragments plus its own WebPage, Service
+(home and city pages), BreadcrumbList (city pages) and FAQPage (from the
+visible <details> FAQs) nodes.
+
+Every other application/ld+json block on the page is folded into that one
+graph: nodes of a type generated here are dropped (the generated node wins),
+any other node is kept once (by @id, or by content). Blocks that aren't
+valid JSON are left alone.
+
+A page's JSON-LD is kept under SCHEMA_BUDGET bytes: past it, FAQ questions
+are dropped from the end of the FAQPage node (the visible FAQ is unchanged).
+schema_report() lists each page's JSON-LD size for the build report.
+
+Usage (standalone; tools/build.py runs this as the inject_schema stage):
+  python tools/inject_schema.py
+"""
 from __future__ import annotations
 
-import re, json
-from pathlib import Path
+import json
+import re
+from functools import lru_cache
 from html import unescape
+from pathlib import Path
+from typing import Iterable
 
-ROOT = Path(".").resolve()
+from city_registry import load_cities
+from faq_engine import Faq
+from html_index import Element, HtmlIndex, splice
+from sitemap import page_url
+
+ROOT = Path(__file__).resolve().parents[1]
 DOMAIN = "https://iowagutterguards.online"
 
 BUSINESS_NAME = "Iowa Gutter Guards"
 BUSINESS_URL  = DOMAIN + "/"
 BUSINESS_EMAIL = "info@iowagutterguards.online"
 BUSINESS_PHONE = "+1-515-329-5128"
+BUSINESS_ID = BUSINESS_URL + "#business"
+SITE_ID = BUSINESS_URL + "#website"
+
+SCHEMA_ID = "schema-ld"
+SCHEMA_BUDGET = 8 * 1024  # bytes of JSON-LD per page
+LD_JSON = "application/ld+json"
 
 SKIP_DIRS = {".git", "node_modules", ".next", "dist", "build", ".cache"}
 
+# Nodes generated here; the same types from any other block on a page are dropped.
+OWNED_TYPES = {"LocalBusiness", "WebSite", "WebPage", "Service", "BreadcrumbList", "FAQPage"}
+
+# The business details of the old hand-written LocalBusiness block are merged in here.
+BUSINESS = {
+    "@type": "LocalBusiness",
+    "@id": BUSINESS_ID,
+    "name": BUSINESS_NAME,
+    "url": BUSINESS_URL,
+    "image": DOMAIN + "/assets/gutter-guard-features-1.jpg",
+    "description": "Gutter guard installation, gutter cleaning, and gutter tune-ups for homes in Central Iowa "
+                   "communities around the Des Moines metro.",
+    "email": BUSINESS_EMAIL,
+    "telephone": BUSINESS_PHONE,
+    "priceRange": "$$",
+    "address": {"@type": "PostalAddress", "addressRegion": "IA", "addressCountry": "US"},
+    "areaServed": {
+        "@type": "GeoCircle",
+        "geoMidpoint": {"@type": "GeoCoordinates", "latitude": 41.5868, "longitude": -93.625},
+        "geoRadius": 120000,
+    },
+    "openingHoursSpecification": [{
+        "@type": "OpeningHoursSpecification",
+        "dayOfWeek": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"],
+        "opens": "08:00",
+        "closes": "18:00",
+    }],
+    "contactPoint": [{
+        "@type": "ContactPoint",
+        "telephone": BUSINESS_PHONE,
+        "contactType": "sales",
+        "areaServed": "US",
+        "availableLanguage": ["en"],
+    }],
+}
+
+WEBSITE = {
+    "@type": "WebSite",
+    "@id": SITE_ID,
+    "url": BUSINESS_URL,
+    "name": BUSINESS_NAME,
+    "publisher": {"@id": BUSINESS_ID},
+}
+
+TITLE_RE = re.compile(r"<title>(.*?)</title>", re.I | re.S)
+META_DESC_RE = re.compile(r"""<meta\s+name=["']description["']\s+content=["']([^"']+)["']""", re.I)
+DETAILS_RE = re.compile(r"<details\b[^>]*>\s*<summary\b[^>]*>(.*?)</summary>(.*?)</details>", re.I | re.S)
+
 def is_skippable(path: Path) -> bool:
     return any(part in SKIP_DIRS for part in path.parts)
 
+# -----------------------------
+# PAGE FACTS
+# -----------------------------
+
 def strip_tags(html: str) -> str:
-    html = re.sub(r"<script\\b[^>]*>.*?</script>", "", html, flags=re.I|re.S)
-    html = re.sub(r"<style\\b[^>]*>.*?</style>", "", html, flags=re.I|re.S)
+    html = re.sub(r"<script\b[^>]*>.*?</script>", "", html, flags=re.I|re.S)
+    html = re.sub(r"<style\b[^>]*>.*?</style>", "", html, flags=re.I|re.S)
     text = re.sub(r"<[^>]+>", " ", html)
-    text = re.sub(r"\\s+", " ", text).strip()
+    text = re.sub(r"\s+", " ", text).strip()
     return unescape(text)
 
-def page_url_from_path(p: Path) -> str:
-    rel = p.relative_to(ROOT).as_posix()
-    if rel == "index.html":
-        return DOMAIN + "/"
-    if rel.endswith("/index.html"):
-        return DOMAIN + "/" + rel[:-len("index.html")]
-    return DOMAIN + "/" + rel
-
-def detect_city_from_path(p: Path) -> str | None:
-    parts = p.relative_to(ROOT).parts
-    if len(parts) >= 3 and parts[0] == "service-areas" and parts[-1] == "index.html":
-        slug = parts[1].lower()
-        slug = re.sub(r"-ia$", "", slug)
-        words = [w for w in slug.split("-") if w]
+def detect_city(rel: str) -> str | None:
+    city = load_cities().city_for_page(rel)
+    if city is not None:
+        return city["name"]
+    parts = rel.split("/")
+    if len(parts) == 3 and parts[0] == "service-areas" and parts[2] == "index.html":
+        words = [w for w in re.sub(r"-ia$", "", parts[1].lower()).split("-") if w]
         return " ".join(w.capitalize() for w in words)
     return None
 
 def extract_title(html: str) -> str:
-    m = re.search(r"<title>(.*?)</title>", html, flags=re.I|re.S)
-    if m:
-        t = strip_tags(m.group(1))
-        if t:
-            return t
-    return BUSINESS_NAME
+    m = TITLE_RE.search(html)
+    title = strip_tags(m.group(1)) if m else ""
+    return title or BUSINESS_NAME
 
 def extract_meta_description(html: str) -> str | None:
-    m = re.search(r'<meta\\s+name=["\\\']description["\\\']\\s+content=["\\\']([^"\\\']+)["\\\']', html, flags=re.I)
-    if m:
-        d = m.group(1).strip()
-        return d if d else None
-    return None
+    m = META_DESC_RE.search(html)
+    desc = unescape(m.group(1).strip()) if m else ""
+    return desc or None
 
-def extract_faq_from_details(html: str) -> list[dict]:
+def extract_faqs(html: str) -> list[Faq]:
+    """The visible <details><summary>Q</summary>A</details> FAQs, in page order."""
     faqs = []
-    for m in re.finditer(
-        r"<details\\b[^>]*>\\s*<summary\\b[^>]*>(.*?)</summary>(.*?)</details>",
-        html,
-        flags=re.I|re.S
-    ):
-        q = strip_tags(m.group(1))
-        a = strip_tags(m.group(2))
-        if not q or not a:
-            continue
-        if len(q) < 6 or len(a) < 10:
-            continue
-        faqs.append({
-            "@type": "Question",
-            "name": q,
-            "acceptedAnswer": {
-                "@type": "Answer",
-                "text": a
-            }
-        })
+    for m in DETAILS_RE.finditer(html):
+        q, a = strip_tags(m.group(1)), strip_tags(m.group(2))
+        if len(q) >= 6 and len(a) >= 10:
+            faqs.append(Faq(q, a))
     return faqs
 
-def build_graph(html: str, path: Path) -> list[dict]:
-    url = page_url_from_path(path)
-    title = extract_title(html)
-    desc = extract_meta_description(html)
-    city = detect_city_from_path(path)
+# -----------------------------
+# GRAPH
+# -----------------------------
 
-    business_id = BUSINESS_URL + "#business"
-    site_id = BUSINESS_URL + "#website"
-    page_id = url + "#webpage"
-    service_id = BUSINESS_URL + "#service-gutter-guards"
+def encode(node: dict) -> str:
+    # "</" would end the <script> element early.
+    return json.dumps(node, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
 
-    graph: list[dict] = []
+@lru_cache(maxsize=None)
+def site_fragments() -> tuple[str, ...]:
+    """The site-wide nodes, encoded once per process."""
+    return encode(BUSINESS), encode(WEBSITE)
 
-    graph.append({
-        "@type": "LocalBusiness",
-        "@id": business_id,
-        "name": BUSINESS_NAME,
-        "url": BUSINESS_URL,
-        "email": BUSINESS_EMAIL,
-        "telephone": BUSINESS_PHONE,
-        "contactPoint": [{
-            "@type": "ContactPoint",
-            "telephone": BUSINESS_PHONE,
-            "contactType": "sales",
-            "areaServed": "US",
-            "availableLanguage": ["en"]
-        }]
-    })
-
-    graph.append({
-        "@type": "WebSite",
-        "@id": site_id,
-        "url": BUSINESS_URL,
-        "name": BUSINESS_NAME,
-        "publisher": {"@id": business_id}
-    })
+def page_nodes(html: str, rel: str) -> list[dict]:
+    """This page's own nodes (everything but FAQPage)."""
+    url = DOMAIN + page_url(rel)
+    city = detect_city(rel)
 
     webpage = {
         "@type": "WebPage",
-        "@id": page_id,
+        "@id": url + "#webpage",
         "url": url,
-        "name": title,
-        "isPartOf": {"@id": site_id},
-        "about": {"@id": business_id}
+        "name": extract_title(html),
+        "isPartOf": {"@id": SITE_ID},
+        "about": {"@id": BUSINESS_ID},
     }
+    desc = extract_meta_description(html)
     if desc:
         webpage["description"] = desc
-    graph.append(webpage)
-
-    service = {
-        "@type": "Service",
-        "@id": service_id,
-        "name": "Gutter Guard Installation",
-        "serviceType": "Gutter guard installation",
-        "provider": {"@id": business_id},
-        "url": url
-    }
+    nodes = [webpage]
 
     if city:
-        service["areaServed"] = {
+        area = {
             "@type": "City",
             "name": city,
-            "address": {
-                "@type": "PostalAddress",
-                "addressRegion": "IA",
-                "addressCountry": "US"
-            }
+            "address": {"@type": "PostalAddress", "addressLocality": city, "addressRegion": "IA", "addressCountry": "US"},
         }
     else:
-        service["areaServed"] = {
+        area = {
             "@type": "AdministrativeArea",
             "name": "Central Iowa",
-            "address": {
-                "@type": "PostalAddress",
-                "addressRegion": "IA",
-                "addressCountry": "US"
-            }
+            "address": {"@type": "PostalAddress", "addressRegion": "IA", "addressCountry": "US"},
         }
-
-    graph.append(service)
-
-    faqs = extract_faq_from_details(html)
-    if faqs:
-        graph.append({
-            "@type": "FAQPage",
-            "@id": url + "#faq",
-            "mainEntity": faqs
+    if rel == "index.html" or city:
+        nodes.append({
+            "@type": "Service",
+            "@id": url + "#service-gutter-guards",
+            "name": f"Gutter Guard Installation in {city}, IA" if city else "Gutter Guard Installation",
+            "serviceType": "Gutter guard installation",
+            "provider": {"@id": BUSINESS_ID},
+            "url": url,
+            "areaServed": area,
         })
 
-    return graph
-
-def inject_schema(html: str, graph: list[dict]) -> str:
-    payload = {"@context": "https://schema.org", "@graph": graph}
-    jsonld = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
-    block = f'<script id="schema-ld" type="application/ld+json">{jsonld}</script>'
-
-    pat = r'<script\\s+id=["\\\']schema-ld["\\\']\\s+type=["\\\']application/ld\\+json["\\\']\\s*>.*?</script>'
-    if re.search(pat, html, flags=re.I|re.S):
-        return re.sub(pat, block, html, flags=re.I|re.S, count=1)
-
-    if re.search(r"</head>", html, flags=re.I):
-        return re.sub(r"</head>", block + "\\n</head>", html, flags=re.I, count=1)
-
-    if re.search(r"</body>", html, flags=re.I):
-        return re.sub(r"</body>", block + "\\n</body>", html, flags=re.I, count=1)
-
-    return html + "\\n" + block + "\\n"
+    if city:
+        nodes.append({
+            "@type": "BreadcrumbList",
+            "@id": url + "#breadcrumbs",
+            "itemListElement": [
+                {"@type": "ListItem", "position": 1, "name": "Home", "item": BUSINESS_URL},
+                {"@type": "ListItem", "position": 2, "name": "Service Areas", "item": BUSINESS_URL + "#service-areas"},
+                {"@type": "ListItem", "position": 3, "name": f"{city}, IA", "item": url},
+            ],
+        })
+    return nodes
+
+def _graph(fragments: Iterable[str]) -> str:
+    return '{"@context":"https://schema.org","@graph":[' + ",".join(fragments) + "]}"
+
+def _faq_fragment(url: str, questions: list[str]) -> str:
+    return '{"@type":"FAQPage","@id":' + json.dumps(url + "#faq") + ',"mainEntity":[' + ",".join(questions) + "]}"
+
+def build_graph(html: str, rel: str, extra: Iterable[dict] = (), budget: int = SCHEMA_BUDGET) -> str:
+    """The page's JSON-LD, with FAQ questions trimmed from the end to stay within `budget` bytes."""
+    fragments = [*site_fragments(), *(encode(n) for n in page_nodes(html, rel)), *(encode(n) for n in extra)]
+    questions = [encode(faq.schema_node()) for faq in extract_faqs(html)]
+    if not questions:
+        return _graph(fragments)
+
+    url = DOMAIN + page_url(rel)
+    # Bytes without any question, then add questions while they fit.
+    size = len(_graph(fragments + [_faq_fragment(url, [])]).encode("utf-8"))
+    kept = 0
+    for q in questions:
+        cost = len(q.encode("utf-8")) + (1 if kept else 0)
+        if size + cost > budget:
+            break
+        size += cost
+        kept += 1
+    if kept:
+        fragments.append(_faq_fragment(url, questions[:kept]))
+    return _graph(fragments)
+
+# -----------------------------
+# PAGE
+# -----------------------------
+
+def _node_types(node: dict) -> set[str]:
+    t = node.get("@type", [])
+    return {t} if isinstance(t, str) else set(t)
+
+def ld_json_blocks(html: str) -> list[tuple[Element, list[dict] | None]]:
+    """(element, nodes) for every JSON-LD <script>; nodes is None when the JSON doesn't parse."""
+    blocks = []
+    for el in HtmlIndex(html).by_tag("script"):
+        if el.attrs.get("type", "").strip().lower() != LD_JSON:
+            continue
+        try:
+            data = json.loads(el.inner(html))
+        except ValueError:
+            blocks.append((el, None))
+            continue
+        items = data if isinstance(data, list) else [data]
+        nodes = []
+        for item in items:
+            if isinstance(item, dict):
+                graph = item.get("@graph")
+                nodes += [n for n in graph if isinstance(n, dict)] if isinstance(graph, list) else [item]
+        blocks.append((el, nodes))
+    return blocks
+
+def foreign_nodes(blocks: list[tuple[Element, list[dict] | None]]) -> list[dict]:
+    """Nodes from existing blocks that aren't generated here, each once."""
+    kept, seen = [], set()
+    for _, nodes in blocks:
+        for node in nodes or []:
+            if _node_types(node) & OWNED_TYPES:
+                continue
+            node = {k: v for k, v in node.items() if k != "@context"}
+            key = node.get("@id") or encode(node)
+            if key not in seen:
+                seen.add(key)
+                kept.append(node)
+    return kept
+
+def _block_span(html: str, start: int, end: int) -> tuple[int, int]:
+    """Widen a removed block to its whole line when nothing else is on it."""
+    line_start = html.rfind("\n", 0, start) + 1
+    line_end = html.find("\n", end)
+    line_end = len(html) if line_end == -1 else line_end + 1
+    if html[line_start:start].strip() or html[end:line_end].strip():
+        return start, end
+    return line_start, line_end
+
+def apply_schema(html: str, rel: str, budget: int = SCHEMA_BUDGET) -> str:
+    """Replace every JSON-LD block of the page with the one generated graph."""
+    blocks = ld_json_blocks(html)
+    parsed = [(el, nodes) for el, nodes in blocks if nodes is not None]
+    block = f'<script id="{SCHEMA_ID}" type="{LD_JSON}">{build_graph(html, rel, foreign_nodes(parsed), budget)}</script>'
+
+    if not parsed:
+        head_end = html.find("</head>")
+        if head_end != -1:
+            return html[:head_end] + block + "\n" + html[head_end:]
+        body_end = html.find("</body>")
+        if body_end != -1:
+            return html[:body_end] + block + "\n" + html[body_end:]
+        return html + "\n" + block + "\n"
+
+    first = parsed[0][0]
+    edits = [(first.start, first.end, block)]
+    edits += [(*_block_span(html, el.start, el.end), "") for el, _ in parsed[1:]]
+    return splice(html, edits)
+
+# -----------------------------
+# REPORT
+# -----------------------------
+
+def schema_report(pages: Iterable[tuple[str, str]], budget: int = SCHEMA_BUDGET) -> list[dict]:
+    """Per page: JSON-LD bytes, block and node counts, and FAQ questions trimmed by the budget."""
+    rows = []
+    for rel, html in sorted(pages):
+        blocks = ld_json_blocks(html)
+        nodes = [n for _, ns in blocks for n in ns or []]
+        size = sum(len(el.inner(html).encode("utf-8")) for el, _ in blocks)
+        in_schema = sum(len(n.get("mainEntity", [])) for n in nodes if "FAQPage" in _node_types(n))
+        visible = len(extract_faqs(html))
+        rows.append({
+            "File": rel,
+            "Bytes": size,
+            "Blocks": len(blocks),
+            "Nodes": len(nodes),
+            "Faqs": visible,
+            "FaqsTrimmed": max(0, visible - in_schema),
+            "OverBudget": size > budget,
+        })
+    return rows
+
+def print_report(rows: list[dict], budget: int = SCHEMA_BUDGET) -> None:
+    if not rows:
+        return
+    largest = max(rows, key=lambda r: r["Bytes"])
+    trimmed = [r for r in rows if r["FaqsTrimmed"]]
+    over = [r for r in rows if r["OverBudget"]]
+    print(f"  {len(rows)} pages; largest {largest['Bytes']:,} bytes ({largest['File']}) of a {budget:,}-byte budget")
+    for r in trimmed:
+        print(f"  {r['File']}: {r['FaqsTrimmed']} of {r['Faqs']} FAQ questions left out of the FAQPage node")
+    for r in over:
+        print(f"  {r['File']}: {r['Bytes']:,} bytes is over budget")
+    for r in rows:
+        if r["Blocks"] > 1:
+            print(f"  {r['File']}: {r['Blocks']} JSON-LD blocks (invalid JSON is left in place)")
 
 def write_text_lf(path: Path, text: str) -> None:
     # Force LF newlines on disk without relying on pathlib newline handling.
-    text = text.replace("\\r\\n", "\\n").replace("\\r", "\\n")
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
     path.write_bytes(text.encode("utf-8"))
 
-targets = []
-targets += list(ROOT.glob("*.html"))
-targets += list(ROOT.glob("**/index.html"))
+def main() -> None:
+    targets = []
+    targets += list(ROOT.glob("*.html"))
+    targets += list(ROOT.glob("**/index.html"))
+
+    scanned = 0
+    updated = 0
+    pages = []
 
-scanned = 0
-updated = 0
+    for p in sorted(set(targets)):
+        if not p.is_file():
+            continue
+        if is_skippable(p.relative_to(ROOT)) or "template" in p.name.lower():
+            continue  # city-template.html is a source, not a page
 
-for p in sorted(set(targets)):
-    if not p.is_file():
-        continue
-    if is_skippable(p):
-        continue
+        scanned += 1
+        rel = p.relative_to(ROOT).as_posix()
+        html = p.read_text(encoding="utf-8", errors="replace")
+        new_html = apply_schema(html, rel)
+        pages.append((rel, new_html))
 
-    scanned += 1
-    html = p.read_text(encoding="utf-8", errors="replace")
-    graph = build_graph(html, p)
-    new_html = inject_schema(html, graph)
+        if new_html != html:
+            write_text_lf(p, new_html)
+            updated += 1
 
-    if new_html != html:
-        write_text_lf(p, new_html)
-        updated += 1
+    print(f"OK: scanned {scanned} pages; updated {updated} pages with JSON-LD "
+          "(LocalBusiness/WebSite/WebPage + Service/BreadcrumbList/FAQPage where they apply).")
+    print_report(schema_report(pages))
 
-print(f"OK: scanned {scanned} pages; updated {updated} pages with JSON-LD (LocalBusiness/WebSite/WebPage/Service + FAQPage when visible).")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Conservative JavaScript minifier for the site's hand-written scripts.
+
+Strips comments, indentation and blank lines, and the spaces around
+punctuation. Strings, template literals and regex literals are copied
+verbatim. Line breaks are kept wherever automatic semicolon insertion could
+depend on them, so the output parses exactly like the input; identifiers are
+never renamed.
+
+Usage:
+  python tools/js_minify.py assets/js/tracking.js > tracking.min.js
+"""
+from __future__ import annotations
+
+import re
+import sys
+
+WORD_CHARS = re.compile(r"[\w$]")
+# After these a "/" starts a regex literal rather than a division.
+REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+REGEX_KEYWORDS = {
+    "return", "typeof", "case", "do", "else", "in", "of", "new", "delete",
+    "void", "throw", "instanceof", "yield", "await",
+}
+# A line break next to these can't end a statement, so it can go.
+NO_ASI_BEFORE = set("{([,;:=?&|*%<>!")
+NO_ASI_AFTER = set("})],;:?.=&|*%<>")
+TOKEN_RE = re.compile(r"[\w$]+|.", re.S)
+
+def _scan_quoted(js: str, i: int, quote: str) -> int:
+    """Index just past the string/template literal starting at js[i]."""
+    i += 1
+    while i < len(js):
+        ch = js[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == quote:
+            return i + 1
+        i += 1
+    return i
+
+def _scan_regex(js: str, i: int) -> int:
+    """Index just past the regex literal (and its flags) starting at js[i]."""
+    i += 1
+    in_class = False
+    while i < len(js):
+        ch = js[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "[":
+            in_class = True
+        elif ch == "]":
+            in_class = False
+        elif ch == "/" and not in_class:
+            i += 1
+            break
+        elif ch == "\n":
+            break
+        i += 1
+    while i < len(js) and WORD_CHARS.match(js[i]):
+        i += 1
+    return i
+
+def _regex_allowed(out: list[str]) -> bool:
+    text = "".join(out[-2:]).rstrip()
+    if not text:
+        return True
+    if text[-1] in REGEX_PRECEDERS:
+        return True
+    word = re.search(r"[\w$]+$", text)
+    return word is not None and word.group() in REGEX_KEYWORDS
+
+def _separator(prev: str, nxt: str, newline: bool) -> str:
+    """What a run of whitespace/comments between `prev` and `nxt` collapses to."""
+    if not prev or not nxt:
+        return ""
+    if newline and prev not in NO_ASI_BEFORE and nxt not in NO_ASI_AFTER:
+        return "\n"
+    if WORD_CHARS.match(prev) and WORD_CHARS.match(nxt):
+        return " "
+    # "a + +b", "a - -b", "a / /re/" must not fuse into one token.
+    if prev == nxt and prev in "+-/":
+        return " "
+    return ""
+
+def minify_js(js: str) -> str:
+    out: list[str] = []
+    i, n = 0, len(js)
+    gap, newline = False, False
+
+    def emit(token: str) -> None:
+        nonlocal gap, newline
+        if gap and out:
+            sep = _separator(out[-1][-1], token[0], newline)
+            if sep:
+                out.append(sep)
+        out.append(token)
+        gap = newline = False
+
+    while i < n:
+        ch = js[i]
+        if ch.isspace():
+            gap = True
+            newline = newline or ch in "\n\r\u2028\u2029"
+            i += 1
+        elif js.startswith("//", i):
+            end = js.find("\n", i)
+            i = n if end == -1 else end
+            gap = True
+        elif js.startswith("/*", i):
+            end = js.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            gap = True
+            newline = newline or "\n" in js[i:end]
+            i = end
+        elif ch in "'\"`":
+            end = _scan_quoted(js, i, ch)
+            emit(js[i:end])
+            i = end
+        elif ch == "/" and _regex_allowed(out):
+            end = _scan_regex(js, i)
+            emit(js[i:end])
+            i = end
+        else:
+            m = TOKEN_RE.match(js, i)
+            emit(m.group())
+            i = m.end()
+    return "".join(out).strip() + "\n"
+
+def main() -> None:
+    if len(sys.argv) != 2:
+        raise SystemExit("Usage: python tools/js_minify.py FILE.js")
+    with open(sys.argv[1], encoding="utf-8") as f:
+        sys.stdout.write(minify_js(f.read()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Lead deduplication: one email per homeowner per time window.
+
+A double-clicked "Send my info", or the same homeowner filling in the form on
+three city pages, is queued as separate leads. The dispatcher
+(tools/lead_queue.py) asks this index before sending each batch: a lead
+whose normalized phone or email already got an email within the window
+(default 24 hours, by the leads' own received times) is a duplicate and is
+not sent. The queue still keeps every submission.
+
+Keys:
+  phone  digits only, US country code dropped: "(515) 329-5128" == "+1 515.329.5128"
+  email  trimmed and casefolded, "+tag" dropped: "Ann+gutters@Example.com" == "ann@example.com"
+
+The index is a dbm file (.leads/dedupe; dbm.gnu or dbm.ndbm where Python has
+them, dbm.dumb otherwise): a hash table on disk, so a lookup is one probe
+however many leads have been seen. Each entry is a 12-byte BLAKE2b digest of
+the key (the file holds no phone numbers or emails) mapped to the 4-byte time
+the key was last emailed. Entries older than the window are ignored on
+lookup, and sweep() deletes them and compacts the file; the dispatcher sweeps
+at most once per SWEEP_INTERVAL. Running totals (leads checked, duplicates)
+are kept in the same file, for the dedupe rate. Reports (this script without
+--sweep, `lead_server.py status`) open the index read-only, so they can run
+next to a live dispatcher without writing to its file.
+
+A key is recorded only after its batch was sent, so a failed send never
+suppresses the retry, and a batch sent just before a crash is recognized
+(not re-sent) when the dispatcher starts over from it.
+
+A duplicate's other keys are recorded too, with the stamp of the key it
+matched: the same phone with a new email makes the new email a repeat for
+the rest of that window (not a fresh lead, and not a longer window).
+
+Usage (standalone: show the dedupe rate and index size, or sweep it now):
+  python tools/lead_dedupe.py
+  python tools/lead_dedupe.py --sweep
+"""
+from __future__ import annotations
+
+import argparse
+import dbm
+import hashlib
+import json
+import re
+import struct
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from lead_queue import LEADS_DIR
+
+INDEX_PATH = LEADS_DIR / "dedupe"
+WINDOW = 24 * 3600
+SWEEP_INTERVAL = 3600
+
+STATS_KEY = b"!stats"  # never a key digest: those are exactly DIGEST_SIZE bytes
+DIGEST_SIZE = 12
+_STAMP = struct.Struct(">I")
+_NON_DIGITS = re.compile(r"\D+")
+
+def normalize_phone(phone: str) -> str:
+    digits = _NON_DIGITS.sub("", phone)
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits if len(digits) >= 7 else ""
+
+def normalize_email(email: str) -> str:
+    email = email.strip().casefold()
+    local, at, domain = email.rpartition("@")
+    if not at or not local or "." not in domain:
+        return ""
+    return f"{local.split('+', 1)[0]}@{domain}"
+
+def lead_keys(lead: dict) -> list[bytes]:
+    """The index keys for a lead: its normalized phone and email, as digests."""
+    keys = []
+    for kind, value in (("phone", normalize_phone(lead.get("phone", ""))),
+                        ("email", normalize_email(lead.get("email", "")))):
+        if value:
+            keys.append(hashlib.blake2b(f"{kind}:{value}".encode("utf-8"), digest_size=DIGEST_SIZE).digest())
+    return keys
+
+def received_at(record: dict) -> int:
+    """A queued record's received time in epoch seconds (now, if it has none)."""
+    try:
+        return int(datetime.fromisoformat(record["received"]).timestamp())
+    except (KeyError, TypeError, ValueError):
+        return int(time.time())
+
+class DedupeIndex:
+    """Which phone numbers and emails were emailed when, in a dbm file."""
+
+    def __init__(self, path: Path = INDEX_PATH, window: int = WINDOW, readonly: bool = False) -> None:
+        if not readonly:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.window = window
+        self.readonly = readonly
+        self._db = dbm.open(str(path), "r" if readonly else "c")
+        self._lock = threading.Lock()
+        raw = self._db.get(STATS_KEY)
+        self.stats = json.loads(raw) if raw else {"checked": 0, "duplicates": 0, "swept": 0}
+
+    def close(self) -> None:
+        with self._lock:
+            if not self.readonly:
+                self._save_stats()
+            self._db.close()
+
+    def _save_stats(self) -> None:
+        self._db[STATS_KEY] = json.dumps(self.stats, separators=(",", ":")).encode("ascii")
+
+    def _stamp(self, key: bytes, pending: dict[bytes, int]) -> int | None:
+        stamp = pending.get(key)
+        if stamp is None:
+            raw = self._db.get(key)
+            stamp = _STAMP.unpack(raw)[0] if raw else None
+        return stamp
+
+    def _match(self, record: dict, pending: dict[bytes, int]) -> tuple[int | None, list[bytes]]:
+        """(stamp of the first key emailed within the window or None, the keys that weren't)."""
+        when = received_at(record)
+        matched, unmatched = None, []
+        for key in lead_keys(record["lead"]):
+            stamp = self._stamp(key, pending)
+            if stamp is not None and abs(when - stamp) < self.window:
+                if matched is None:
+                    matched = stamp
+            else:
+                unmatched.append(key)
+        return matched, unmatched
+
+    def split(self, records: list[dict]) -> tuple[list[dict], list[dict]]:
+        """(records to send, duplicates), in order. Repeats inside `records` count too."""
+        fresh, duplicates = [], []
+        pending: dict[bytes, int] = {}
+        with self._lock:
+            for record in records:
+                matched, unmatched = self._match(record, pending)
+                if matched is not None:
+                    duplicates.append(record)
+                    for key in unmatched:
+                        pending[key] = matched
+                    continue
+                fresh.append(record)
+                for key in unmatched:
+                    pending[key] = received_at(record)
+        return fresh, duplicates
+
+    def add(self, sent: list[dict], duplicates: list[dict] = ()) -> None:
+        """Record that `sent` was emailed and `duplicates` were held back (their new keys, and the rate)."""
+        with self._lock:
+            self.stats["checked"] += len(sent) + len(duplicates)
+            self.stats["duplicates"] += len(duplicates)
+            for record in sent:
+                stamp = _STAMP.pack(received_at(record) & 0xFFFFFFFF)
+                for key in lead_keys(record["lead"]):
+                    self._db[key] = stamp
+            for record in duplicates:
+                matched, unmatched = self._match(record, {})
+                if matched is not None:
+                    for key in unmatched:
+                        self._db[key] = _STAMP.pack(matched)
+            self._save_stats()
+            self._sync()
+
+    def sweep(self, now: float | None = None) -> int:
+        """Delete entries older than the window and compact the file; returns how many went."""
+        cutoff = int(now if now is not None else time.time()) - self.window
+        with self._lock:
+            expired = [key for key in self._db.keys()
+                       if len(key) == DIGEST_SIZE and _STAMP.unpack(self._db[key])[0] <= cutoff]
+            for key in expired:
+                del self._db[key]
+            self.stats["swept"] = int(time.time())
+            if expired:
+                self._compact()
+            self._save_stats()
+            self._sync()
+        return len(expired)
+
+    def _sync(self) -> None:
+        # dbm.dumb appends each new key to its directory file as it is written; its sync()
+        # rewrites that whole file, which would make every batch cost O(index size).
+        if hasattr(self._db, "sync") and type(self._db).__module__ != "dbm.dumb":
+            self._db.sync()
+
+    def _compact(self) -> None:
+        if hasattr(self._db, "reorganize"):  # dbm.gnu
+            self._db.reorganize()
+            return
+        # Other backends keep deleted entries' space: rewrite the live ones into a fresh file.
+        live = {key: self._db[key] for key in self._db.keys()}
+        self._db.close()
+        self._db = dbm.open(str(self.path), "n")
+        for key, value in live.items():
+            self._db[key] = value
+
+    def sweep_due(self) -> bool:
+        return time.time() - self.stats.get("swept", 0) >= SWEEP_INTERVAL
+
+    def __len__(self) -> int:
+        return sum(1 for key in self._db.keys() if len(key) == DIGEST_SIZE)
+
+    @property
+    def rate(self) -> float:
+        """Share of checked leads that were duplicates."""
+        return self.stats["duplicates"] / self.stats["checked"] if self.stats["checked"] else 0.0
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Show or sweep the lead dedupe index.")
+    parser.add_argument("--index", type=Path, default=INDEX_PATH, help="index path (default .leads/dedupe)")
+    parser.add_argument("--window", type=float, default=WINDOW / 3600, help="window in hours (default 24)")
+    parser.add_argument("--sweep", action="store_true", help="expire old entries and compact now")
+    args = parser.parse_args()
+
+    if not args.sweep and not dbm.whichdb(str(args.index)):
+        raise SystemExit(f"No dedupe index at {args.index}")
+    index = DedupeIndex(args.index, window=int(args.window * 3600), readonly=not args.sweep)
+    try:
+        if args.sweep:
+            print(f"Expired {index.sweep()} key(s) older than {args.window:g} h")
+        stats = index.stats
+        print(f"Dedupe: {stats['duplicates']} of {stats['checked']} lead(s) were duplicates ({index.rate:.1%}); "
+              f"{len(index)} key(s) in {dbm.whichdb(str(args.index)) or 'dbm'} index {args.index}")
+    finally:
+        index.close()
+
+if __name__ == "__main__":
+    main()
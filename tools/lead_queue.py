@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Durable lead queue and batch dispatcher for the local lead stand-in (tools/lead_server.py).
+
+Intake and email are decoupled: a lead is accepted once its record is
+appended (and fsynced) to an append-only JSONL file, one record per line, the
+way requests.jsonl is kept. Nothing is ever rewritten in place; the dispatcher
+keeps its position in a separate offset file (the byte offset just past the
+last record it delivered), replaced atomically after every batch, so a crash
+at any point loses no lead and re-sends at most one batch.
+
+The dispatcher reads the records past the offset in groups of `batch_size`,
+drops repeat submissions if it has a dedupe index (tools/lead_dedupe.py), and
+hands each group to a mail sink in one call. A failed call is retried
+with exponential backoff and full jitter (a random delay in
+[0, min(max_delay, base_delay * 2**attempt)]); a batch that still fails after
+`max_attempts` ends the flush with the offset left before it, and the next
+flush starts from the same batch. Delivery is at-least-once.
+
+MockMailSink stands in for the email API: it appends each message to an
+outbox JSONL file, and can be told to be slow or to fail a share of its calls
+so the retry path can be exercised locally.
+
+Files (under .leads/, ignored by git):
+  queue.jsonl     {"id", "received", "lead"} per accepted lead
+  queue.offset    dispatch position in queue.jsonl
+  outbox.jsonl    what MockMailSink "sent"
+  dedupe*         the dedupe index (tools/lead_dedupe.py)
+"""
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: a second concurrent dispatcher isn't guarded against
+    fcntl = None
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+LEADS_DIR = SITE_ROOT / ".leads"
+
+BATCH_SIZE = 50
+MAX_BATCH = 100  # the most messages the mail API takes in one batch call
+MAX_ATTEMPTS = 5
+BASE_DELAY = 0.5
+MAX_DELAY = 30.0
+
+class SinkError(Exception):
+    """A mail sink call that failed and may be retried."""
+
+# -----------------------------
+# QUEUE
+# -----------------------------
+
+class LeadQueue:
+    """Append-only JSONL queue with a separately stored dispatch offset."""
+
+    def __init__(self, directory: Path = LEADS_DIR, fsync: bool = True) -> None:
+        self.directory = directory
+        self.path = directory / "queue.jsonl"
+        self.offset_path = directory / "queue.offset"
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = None
+
+    def append(self, record: dict) -> None:
+        """Write one record; it is durable when this returns."""
+        line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            if self._file is None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "ab", buffering=0)
+            self._file.write(line)
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def offset(self) -> int:
+        try:
+            return int(self.offset_path.read_text(encoding="ascii").strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def commit(self, offset: int) -> None:
+        """Record that everything before byte `offset` has been delivered."""
+        tmp = self.offset_path.with_suffix(".offset.tmp")
+        tmp.write_text(f"{offset}\n", encoding="ascii")
+        os.replace(tmp, self.offset_path)
+
+    def pending(self) -> Iterator[tuple[int, dict]]:
+        """(end offset, record) for each complete record past the dispatch offset.
+
+        A line still being written (no trailing newline yet) is left for the next read.
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(self.offset())
+            while True:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    return
+                yield f.tell(), json.loads(line)
+
+    def stats(self) -> dict:
+        size = self.path.stat().st_size if self.path.exists() else 0
+        return {"bytes": size, "dispatched_bytes": self.offset(), "pending": sum(1 for _ in self.pending())}
+
+# -----------------------------
+# MAIL SINK
+# -----------------------------
+
+class MockMailSink:
+    """Writes messages to an outbox file instead of sending them."""
+
+    def __init__(self, outbox: Path = LEADS_DIR / "outbox.jsonl", fail_rate: float = 0.0,
+                 latency: float = 0.0, seed: int | None = None) -> None:
+        self.outbox = outbox
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def send_batch(self, messages: list[dict]) -> list[str]:
+        """Deliver every message or none of them; returns one id per message."""
+        if len(messages) > MAX_BATCH:
+            raise ValueError(f"batch of {len(messages)} exceeds the {MAX_BATCH}-message limit")
+        with self._lock:
+            self.calls += 1
+            if self.latency:
+                time.sleep(self.latency)
+            if self._random.random() < self.fail_rate:
+                raise SinkError("mock mail sink: simulated upstream failure (502)")
+            self.outbox.parent.mkdir(parents=True, exist_ok=True)
+            ids = [f"mock-{os.urandom(6).hex()}" for _ in messages]
+            with self.outbox.open("a", encoding="utf-8") as f:
+                for message_id, message in zip(ids, messages):
+                    f.write(json.dumps({"id": message_id, **message}, ensure_ascii=False) + "\n")
+            return ids
+
+# -----------------------------
+# DISPATCH
+# -----------------------------
+
+@dataclass
+class DispatchReport:
+    sent: int = 0
+    batches: int = 0
+    retries: int = 0
+    duplicates: int = 0       # held back by the dedupe index (tools/lead_dedupe.py)
+    failed: bool = False      # a batch ran out of attempts; it is retried on the next flush
+    error: str = ""
+
+def backoff(attempt: int, base: float = BASE_DELAY, cap: float = MAX_DELAY,
+            rng: Callable[[float, float], float] = random.uniform) -> float:
+    """Full-jitter exponential backoff before retry number `attempt` (0-based)."""
+    return rng(0.0, min(cap, base * (2 ** attempt)))
+
+class Dispatcher:
+    """Flushes a LeadQueue to a mail sink in batches, with retry and backoff."""
+
+    def __init__(self, queue: LeadQueue, sink, render: Callable[[dict], dict],
+                 batch_size: int = BATCH_SIZE, max_attempts: int = MAX_ATTEMPTS,
+                 base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY,
+                 sleep: Callable[[float], None] = time.sleep, open_dedupe: Callable[[], object] | None = None) -> None:
+        if not 1 <= batch_size <= MAX_BATCH:
+            raise SystemExit(f"batch size must be between 1 and {MAX_BATCH}")
+        self.queue = queue
+        self.sink = sink
+        self.render = render            # queued record -> mail message
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        # Opens a lead_dedupe.DedupeIndex, or None to send every lead. The index is opened per
+        # flush, inside the dispatch lock, so a `flush` next to a running `serve` never makes
+        # two writers on the same dbm file.
+        self.open_dedupe = open_dedupe
+
+    def _batches(self) -> Iterator[tuple[int, list[dict]]]:
+        batch, end = [], 0
+        for end, record in self.queue.pending():
+            batch.append(record)
+            if len(batch) == self.batch_size:
+                yield end, batch
+                batch = []
+        if batch:
+            yield end, batch
+
+    def flush(self) -> DispatchReport:
+        """Send everything queued so far; stops at the first batch that exhausts its retries."""
+        report = DispatchReport()
+        with _DispatchLock(self.queue):
+            dedupe = self.open_dedupe() if self.open_dedupe is not None else None
+            try:
+                self._flush(dedupe, report)
+                if dedupe is not None and dedupe.sweep_due():
+                    dedupe.sweep()
+            finally:
+                if dedupe is not None:
+                    dedupe.close()
+        return report
+
+    def _flush(self, dedupe, report: DispatchReport) -> None:
+        for end, records in self._batches():
+            duplicates = []
+            if dedupe is not None:
+                records, duplicates = dedupe.split(records)
+            if records and not self._send(records, report):
+                return
+            if dedupe is not None:
+                # Before the commit: a batch re-read after a crash here is recognized, not re-sent.
+                dedupe.add(records, duplicates)
+            self.queue.commit(end)
+            report.sent += len(records)
+            report.duplicates += len(duplicates)
+            report.batches += bool(records)
+
+    def _send(self, records: list[dict], report: DispatchReport) -> bool:
+        messages = [self.render(record) for record in records]
+        for attempt in range(self.max_attempts):
+            try:
+                self.sink.send_batch(messages)
+                return True
+            except SinkError as e:
+                report.error = str(e)
+                if attempt + 1 == self.max_attempts:
+                    report.failed = True
+                    return False
+                report.retries += 1
+                self.sleep(backoff(attempt, self.base_delay, self.max_delay))
+        return False
+
+class _DispatchLock:
+    """One dispatcher per queue directory at a time (advisory; POSIX only)."""
+
+    def __init__(self, queue: LeadQueue) -> None:
+        self.path = queue.directory / "dispatch.lock"
+        self._file = None
+
+    def __enter__(self) -> None:
+        if fcntl is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w")
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc: object) -> None:
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+class DispatchLoop(threading.Thread):
+    """Flushes the queue every `interval` seconds until stop(); flushes once more on the way out."""
+
+    def __init__(self, dispatcher: Dispatcher, interval: float = 2.0,
+                 report: Callable[[DispatchReport], None] | None = None) -> None:
+        super().__init__(name="lead-dispatch", daemon=True)
+        self.dispatcher = dispatcher
+        self.interval = interval
+        self.report = report
+        self._stopping = threading.Event()
+
+    def run(self) -> None:
+        while True:
+            stopping = self._stopping.wait(self.interval)
+            result = self.dispatcher.flush()
+            if self.report is not None and (result.sent or result.duplicates or result.failed):
+                self.report(result)
+            if stopping:
+                return
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self.join()
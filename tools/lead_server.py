@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the /api/lead Cloudflare function (functions/api/lead.js).
+
+Accepts the same requests and answers the same way: POST only (405 with
+`allow: POST` otherwise), JSON, form-encoded or multipart bodies, the same
+field mapping (normalize_lead_fields is a port of normalizeLeadFields), the
+honeypot (`website` filled in: pretend success, keep nothing), the same
+validation (name plus email or phone), and a 303 to /thank-you/ or, when the
+client sends `Accept: application/json`, a JSON body.
+
+The difference is what happens to an accepted lead. lead.js makes one email
+API call per submission, inside the request, so a slow or failing email API
+makes the form slow or loses the lead with a 502. Here the request only
+appends the lead to a durable queue (tools/lead_queue.py) and returns; a
+background dispatcher flushes the queue to a mock mail sink in batches, with
+retry and backoff, skipping repeat submissions (tools/lead_dedupe.py) and
+building each message the way lead.js does (buildEmailText,
+sendResendEmail's payload). Capture latency is one fsynced
+append, whatever the mail side is doing.
+
+For development and load testing; the site itself still posts to lead.js.
+
+Usage:
+  python tools/lead_server.py serve                    # http://127.0.0.1:8788/api/lead
+  python tools/lead_server.py serve --port 9000 --fail-rate 0.3   # exercise retries
+  python tools/lead_server.py serve --no-dispatch      # queue only
+  python tools/lead_server.py flush                    # dispatch what's queued, then exit
+  python tools/lead_server.py status                   # queue depth, outbox size, dedupe rate
+"""
+from __future__ import annotations
+
+import argparse
+import dbm
+import json
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl
+
+from lead_dedupe import WINDOW, DedupeIndex
+from lead_queue import (
+    BATCH_SIZE, LEADS_DIR, MAX_ATTEMPTS, Dispatcher, DispatchLoop, DispatchReport, LeadQueue, MockMailSink,
+)
+
+ENDPOINT = "/api/lead"
+PORT = 8788  # wrangler pages dev's default
+MAX_BODY = 1 << 20
+
+# Mail settings (LEAD_TO / LEAD_FROM in the Cloudflare env); only the mock sink sees them here.
+LEAD_TO = os.environ.get("LEAD_TO", "leads@localhost")
+LEAD_FROM = os.environ.get("LEAD_FROM", "Iowa Gutter Guards <leads@localhost>")
+
+# -----------------------------
+# FIELDS (port of lead.js)
+# -----------------------------
+
+NAME_KEYS = ("name", "Name", "full_name", "FullName")
+EMAIL_KEYS = ("email", "Email")
+PHONE_KEYS = ("phone", "Phone", "tel", "Tel")
+CITY_KEYS = ("city", "City", "town", "Town")
+MESSAGE_KEYS = ("message", "Message", "notes", "Notes", "note", "Note")
+HONEYPOT_KEYS = ("website", "Website", "url", "URL")
+KNOWN_KEYS = frozenset(NAME_KEYS + EMAIL_KEYS + PHONE_KEYS + CITY_KEYS + MESSAGE_KEYS + HONEYPOT_KEYS)
+
+REQUIRED_ERROR = "Missing required fields: name and (email or phone)."
+
+def pick_first(data: dict, keys: tuple[str, ...]) -> str:
+    for key in keys:
+        value = data.get(key)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return ""
+
+def normalize_lead_fields(data: dict) -> dict:
+    """Port of normalizeLeadFields: the site's capitalized keys and the lowercase ones both work."""
+    extras = {
+        str(key): value.strip() for key, value in data.items()
+        if key not in KNOWN_KEYS and isinstance(value, str) and value.strip()
+    }
+    return {
+        "name": pick_first(data, NAME_KEYS),
+        "email": pick_first(data, EMAIL_KEYS),
+        "phone": pick_first(data, PHONE_KEYS),
+        "city": pick_first(data, CITY_KEYS),
+        "message": pick_first(data, MESSAGE_KEYS),
+        "website": pick_first(data, HONEYPOT_KEYS),
+        "extras": extras,
+    }
+
+def build_email_text(lead: dict) -> str:
+    """Port of buildEmailText."""
+    lines = [f"Name: {lead['name'] or '-'}", f"Email: {lead['email'] or '-'}", f"Phone: {lead['phone'] or '-'}"]
+    if lead["city"]:
+        lines.append(f"City: {lead['city']}")
+    if lead["message"]:
+        lines.append(f"Notes: {lead['message']}")
+    extras = lead.get("extras") or {}
+    if extras:
+        lines += ["", "Extra fields:"] + [f"{key}: {extras[key]}" for key in sorted(extras)]
+    return "\n".join(lines)
+
+def email_message(record: dict) -> dict:
+    """The message sendResendEmail would post for a queued lead."""
+    lead = record["lead"]
+    subject_city = f" ({lead['city']})" if lead["city"] else ""
+    message = {
+        "from": LEAD_FROM,
+        "to": [LEAD_TO],
+        "subject": f"New IGG Lead: {lead['name'] or 'New Lead'}{subject_city}",
+        "text": build_email_text(lead),
+    }
+    if lead["email"]:
+        message["reply_to"] = lead["email"]
+    return message
+
+# -----------------------------
+# REQUEST BODIES
+# -----------------------------
+
+def form_fields(body: bytes) -> dict:
+    # request.formData() into a plain object: a repeated key keeps its last value.
+    return dict(parse_qsl(body.decode("utf-8", "replace"), keep_blank_values=True))
+
+def multipart_fields(content_type: str, body: bytes) -> dict:
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body)
+    if not message.is_multipart():
+        raise ValueError("malformed multipart body")
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if not name:
+            continue
+        if part.get_filename() is not None:
+            fields[name] = "[file]"
+        else:
+            payload = part.get_payload(decode=True) or b""
+            fields[name] = payload.decode(part.get_content_charset() or "utf-8", "replace")
+    return fields
+
+def parse_body(content_type: str, body: bytes) -> dict | None:
+    """The submitted fields, or None if the Content-Type isn't one lead.js reads."""
+    ct = content_type.lower()
+    if "application/json" in ct:
+        data = json.loads(body or b"null")
+        return data if isinstance(data, dict) else {}
+    if "application/x-www-form-urlencoded" in ct:
+        return form_fields(body)
+    if "multipart/form-data" in ct:
+        return multipart_fields(content_type, body)
+    return None
+
+# -----------------------------
+# SERVER
+# -----------------------------
+
+class LeadHandler(BaseHTTPRequestHandler):
+    server_version = "IGGLeadStandIn/1.0"
+    protocol_version = "HTTP/1.1"
+    queue: LeadQueue  # set by make_server()
+    quiet = True
+
+    def log_message(self, format: str, *args: object) -> None:
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body: bytes = b"", content_type: str | None = None,
+              headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        if content_type:
+            self.send_header("content-type", content_type)
+            self.send_header("cache-control", "no-store")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _text(self, status: int, text: str, headers: dict[str, str] | None = None) -> None:
+        self._send(status, text.encode("utf-8"), "text/plain; charset=utf-8", headers)
+
+    def _json(self, status: int, obj: dict) -> None:
+        self._send(status, json.dumps(obj, indent=2).encode("utf-8"), "application/json; charset=utf-8")
+
+    def _reply(self, wants_json: bool, status: int, error: str | None = None) -> None:
+        """lead.js's response: JSON for API clients, a redirect or plain-text error for forms."""
+        if wants_json:
+            self._json(status, {"ok": True} if error is None else {"ok": False, "error": error})
+        elif error is None:
+            self._send(303, headers={"location": "/thank-you/"})
+        else:
+            self._text(status, error)
+
+    def _method_not_allowed(self) -> None:
+        allow = {"allow": "POST"}
+        if self.command in ("GET", "HEAD"):
+            self._text(405, f"Method Not Allowed. POST a lead to {ENDPOINT}.", allow)
+        else:
+            self._text(405, "Method Not Allowed.", allow)
+
+    do_GET = do_HEAD = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = _method_not_allowed
+
+    def do_POST(self) -> None:
+        if self.path.split("?", 1)[0] != ENDPOINT:
+            self._text(404, "Not Found")
+            return
+        wants_json = "application/json" in self.headers.get("accept", "").lower()
+        length = int(self.headers.get("content-length") or 0)
+        if length > MAX_BODY:
+            self.close_connection = True
+            self._reply(wants_json, 413, "Request body too large.")
+            return
+        body = self.rfile.read(length)
+        try:
+            data = parse_body(self.headers.get("content-type", ""), body)
+            if data is None:
+                self._reply(wants_json, 400, "Unsupported Content-Type")
+                return
+            lead = normalize_lead_fields(data)
+            if lead["website"]:
+                # Honeypot hit: pretend success, keep nothing.
+                self._reply(wants_json, 200)
+                return
+            if not lead["name"] or (not lead["email"] and not lead["phone"]):
+                self._reply(wants_json, 400, REQUIRED_ERROR)
+                return
+            self.queue.append({
+                "id": uuid.uuid4().hex,
+                "received": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                "lead": lead,
+            })
+        except Exception as e:  # lead.js answers any other failure with a 500
+            msg = str(e) or type(e).__name__
+            if wants_json:
+                self._json(500, {"ok": False, "error": "Internal error", "detail": msg})
+            else:
+                self._text(500, f"Internal error: {msg}")
+            return
+        self._reply(wants_json, 200)
+
+class LeadServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # socketserver's default backlog of 5 drops connections in a burst of form posts.
+    request_queue_size = 256
+
+def make_server(queue: LeadQueue, host: str = "127.0.0.1", port: int = PORT,
+                quiet: bool = True) -> LeadServer:
+    """A server bound to (host, port) that queues into `queue`; port 0 picks a free port."""
+    handler = type("BoundLeadHandler", (LeadHandler,), {"queue": queue, "quiet": quiet})
+    return LeadServer((host, port), handler)
+
+def make_dispatcher(queue: LeadQueue, args: argparse.Namespace) -> Dispatcher:
+    sink = MockMailSink(queue.directory / "outbox.jsonl", fail_rate=args.fail_rate,
+                        latency=args.sink_latency, seed=args.seed)
+    window = int(args.dedupe_window * 3600)
+    open_dedupe = None if args.no_dedupe else lambda: DedupeIndex(queue.directory / "dedupe", window=window)
+    return Dispatcher(queue, sink, email_message, batch_size=args.batch_size, max_attempts=args.max_attempts,
+                      open_dedupe=open_dedupe)
+
+def print_dispatch(report: DispatchReport) -> None:
+    line = f"Dispatched {report.sent} lead(s) in {report.batches} batch(es), {report.retries} retr{'y' if report.retries == 1 else 'ies'}"
+    if report.duplicates:
+        line += f", {report.duplicates} duplicate(s) not sent"
+    if report.failed:
+        line += f"; stopped on a failing batch, will retry: {report.error}"
+    print(line, flush=True)
+
+# -----------------------------
+# MAIN
+# -----------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for /api/lead with a durable queue.")
+    parser.add_argument("command", nargs="?", default="serve", choices=("serve", "flush", "status"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--dir", type=Path, default=LEADS_DIR, help="queue directory (default .leads/)")
+    parser.add_argument("--no-fsync", action="store_true", help="don't fsync each append (faster, not crash-safe)")
+    parser.add_argument("--no-dispatch", action="store_true", help="serve: queue leads but don't send them")
+    parser.add_argument("--flush-interval", type=float, default=2.0, help="serve: seconds between flushes")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="messages per mail sink call")
+    parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS, help="tries per batch before giving up until the next flush")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of mock sink calls that fail")
+    parser.add_argument("--sink-latency", type=float, default=0.0, help="seconds each mock sink call takes")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the mock sink's failures")
+    parser.add_argument("--no-dedupe", action="store_true", help="email every lead, repeats included")
+    parser.add_argument("--dedupe-window", type=float, default=WINDOW / 3600,
+                        help="hours within which a repeat phone/email isn't emailed again (default 24)")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    queue = LeadQueue(args.dir, fsync=not args.no_fsync)
+
+    if args.command == "status":
+        stats = queue.stats()
+        outbox = args.dir / "outbox.jsonl"
+        sent = sum(1 for _ in outbox.open(encoding="utf-8")) if outbox.exists() else 0
+        print(f"Queue: {stats['pending']} pending, {stats['bytes']:,} bytes "
+              f"({stats['dispatched_bytes']:,} dispatched); outbox: {sent} message(s)")
+        if dbm.whichdb(str(args.dir / "dedupe")):
+            # Read-only: a running dispatcher may hold the index open for writing.
+            index = DedupeIndex(args.dir / "dedupe", readonly=True)
+            print(f"Dedupe: {index.stats['duplicates']} of {index.stats['checked']} lead(s) were duplicates "
+                  f"({index.rate:.1%}); {len(index)} key(s) indexed")
+            index.close()
+        return
+
+    if args.command == "flush":
+        report = make_dispatcher(queue, args).flush()
+        print_dispatch(report)
+        sys.exit(1 if report.failed else 0)
+
+    server = make_server(queue, args.host, args.port, quiet=not args.verbose)
+    loop = None
+    if not args.no_dispatch:
+        loop = DispatchLoop(make_dispatcher(queue, args), args.flush_interval, print_dispatch)
+        loop.start()
+    host, port = server.server_address[:2]
+    print(f"Lead stand-in on http://{host}:{port}{ENDPOINT} (queue: {queue.path})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if loop is not None:
+            loop.stop()
+        queue.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Load test for the lead endpoint: a burst of realistic form submissions at a set concurrency.
+
+Submissions look like what reaches /api/lead: mostly the site's own form
+(Name, Email, Phone, Address, Stories, Notes and the empty `website`
+honeypot), plus API-style clients using the other keys normalizeLeadFields
+accepts (name/full_name, email, phone/tel, city, message/notes). A few are
+bots that fill in the honeypot, a few are missing their contact fields, and
+a few repeat an earlier lead (a double-click, or another city page's form).
+They are sent form-encoded, multipart and as JSON (JSON clients ask for a
+JSON reply). Each one has an expected status (303 or 200, or 400 for the
+incomplete ones); anything else counts as an error.
+
+Every worker keeps one keep-alive connection and all workers start together.
+The report gives p50/p95/p99 latency, throughput and errors by kind, overall
+and per encoding.
+
+By default the target is a tools/lead_server.py stand-in, started in its own
+process with a temporary queue and its dispatcher running. The queue is
+checked afterwards: every accepted lead must be in it exactly once. The emails
+the mock sink received give the dedupe rate (tools/lead_dedupe.py). Pass
+--url to test another server instead, e.g. `npx wrangler pages dev .` for
+lead.js itself, at http://127.0.0.1:8788/api/lead.
+
+Results go to .build-cache/loadtest/: latest.json, and one file per run under
+runs/, named by the git revision. Run with --save-baseline to keep a run as
+the baseline. Later runs of the same shape (target, requests, concurrency,
+seed, encodings) are compared with it and exit with status 1 when p95/p99
+latency grows past the threshold or the error rate rises.
+
+Usage:
+  python tools/load_test.py                                   # 1,000 leads, 50 at a time
+  python tools/load_test.py --requests 5000 --concurrency 200
+  python tools/load_test.py --encodings json                  # only JSON bodies
+  python tools/load_test.py --url http://127.0.0.1:8788/api/lead
+  python tools/load_test.py --save-baseline
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+from city_registry import load_cities
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+LOADTEST_DIR = SITE_ROOT / ".build-cache" / "loadtest"
+BASELINE_PATH = LOADTEST_DIR / "baseline.json"
+RESULTS_PATH = LOADTEST_DIR / "latest.json"
+RUNS_DIR = LOADTEST_DIR / "runs"
+
+ENCODINGS = ("form", "multipart", "json")
+DEFAULT_REQUESTS = 1000
+DEFAULT_CONCURRENCY = 50
+DEFAULT_THRESHOLD = 0.20
+
+# Latencies under this are too noisy to judge against a percentage threshold.
+MIN_COMPARABLE_MS = 1.0
+
+# Share of submissions that are bots (honeypot filled in) and that are missing email and phone.
+BOT_SHARE = 0.02
+INCOMPLETE_SHARE = 0.03
+# Share that repeat an earlier lead: a double-click, or the same homeowner on another city page.
+REPEAT_SHARE = 0.05
+# Share of the rest sent by API-style clients rather than the site's form.
+API_CLIENT_SHARE = 0.25
+
+FIRST_NAMES = ["Ann", "Brian", "Carla", "Dave", "Erin", "Frank", "Gina", "Hector", "Ines", "Jake",
+               "Kara", "Luis", "Megan", "Nate", "Olivia", "Paul", "Rosa", "Sam", "Tina", "Walt"]
+LAST_NAMES = ["Anderson", "Brown", "Christensen", "Dvorak", "Erickson", "Fischer", "Garcia", "Hansen",
+              "Jensen", "Kruse", "Larson", "Miller", "Nguyen", "Olson", "Peterson", "Schmidt"]
+STREETS = ["Oak St", "Maple Ave", "Grand Ave", "Ingersoll Ave", "Euclid Ave", "Hickman Rd", "Ashworth Rd", "NE 36th St"]
+STORIES = ["1 story", "1.5 story", "2 story", "3+ stories"]
+NOTES = [
+    "", "Gutters overflow every time it storms.", "Two big oaks over the back of the house.",
+    "Pine needles clog the downspouts each fall.", "Please call after 5pm.",
+    "Had ice dams last winter, want to know if guards help.",
+]
+
+# -----------------------------
+# PAYLOADS
+# -----------------------------
+
+@dataclass(frozen=True)
+class Submission:
+    kind: str        # "lead", "repeat", "bot" or "incomplete"
+    encoding: str    # one of ENCODINGS
+    fields: dict
+
+    @property
+    def expected(self) -> int:
+        if self.kind == "incomplete":
+            return 400
+        return 200 if self.encoding == "json" else 303
+
+def make_fields(rng: random.Random, kind: str, cities: list[str]) -> dict:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    name = f"{first} {last}"
+    email = f"{first}.{last}{rng.randint(1, 999)}@example.com".lower()
+    phone = f"(515) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}"
+    city = rng.choice(cities)
+    note = rng.choice(NOTES)
+
+    if rng.random() < API_CLIENT_SHARE:
+        fields = {rng.choice(["name", "full_name"]): name, rng.choice(["phone", "tel"]): phone,
+                  "email": email, "city": city, rng.choice(["message", "notes"]): note}
+    else:
+        # The site's form, field for field (wire_forms_to_api_lead adds the honeypot).
+        fields = {"Name": name, "Email": email, "Phone": phone,
+                  "Address": f"{rng.randint(100, 9999)} {rng.choice(STREETS)}, {city}, IA",
+                  "Stories": rng.choice(STORIES), "Notes": note, "website": ""}
+
+    if kind == "bot":
+        fields["website"] = "http://cheap-pills.example"
+    elif kind == "incomplete":
+        for key in ("Email", "Phone", "email", "phone", "tel"):
+            fields.pop(key, None)
+    return fields
+
+def make_submissions(count: int, encodings: list[str], seed: int) -> list[Submission]:
+    """A reproducible mix of leads, bots and incomplete submissions across the encodings."""
+    rng = random.Random(seed)
+    cities = [city["name"] for city in load_cities()]
+    out, leads = [], []
+    for i in range(count):
+        encoding, roll = encodings[i % len(encodings)], rng.random()
+        if roll < REPEAT_SHARE and leads:
+            out.append(Submission("repeat", encoding, dict(rng.choice(leads[-20:]))))
+            continue
+        roll -= REPEAT_SHARE
+        kind = "bot" if roll < BOT_SHARE else "incomplete" if roll < BOT_SHARE + INCOMPLETE_SHARE else "lead"
+        out.append(Submission(kind, encoding, make_fields(rng, kind, cities)))
+        if kind == "lead":
+            leads.append(out[-1].fields)
+    return out
+
+def encode(sub: Submission) -> tuple[bytes, dict[str, str]]:
+    """Request body and headers, as a browser form post or a fetch() client would send them."""
+    if sub.encoding == "json":
+        return json.dumps(sub.fields).encode("utf-8"), {
+            "content-type": "application/json", "accept": "application/json"}
+    if sub.encoding == "form":
+        return urlencode(sub.fields).encode("utf-8"), {"content-type": "application/x-www-form-urlencoded"}
+    boundary = f"----lead-load-test-{random.getrandbits(48):012x}"
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'
+        for key, value in sub.fields.items()
+    ]
+    body = "".join(parts) + f"--{boundary}--\r\n"
+    return body.encode("utf-8"), {"content-type": f"multipart/form-data; boundary={boundary}"}
+
+# -----------------------------
+# CLIENT
+# -----------------------------
+
+@dataclass
+class Result:
+    encoding: str
+    seconds: float
+    status: int | None
+    error: str       # "" when the status was the expected one
+
+def run_load(host: str, port: int, path: str, submissions: list[Submission],
+             concurrency: int, timeout: float) -> tuple[list[Result], float]:
+    """Send every submission across `concurrency` keep-alive connections; (results, wall seconds)."""
+    requests = [(sub, *encode(sub)) for sub in submissions]
+    results: list[Result] = []
+    lock = threading.Lock()
+    next_index = iter(range(len(requests)))
+    start = threading.Barrier(concurrency + 1)
+
+    def worker() -> None:
+        conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        local = []
+        start.wait()
+        while True:
+            with lock:
+                i = next(next_index, None)
+            if i is None:
+                break
+            sub, body, headers = requests[i]
+            t0 = time.perf_counter()
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                status = resp.status
+                error = "" if status == sub.expected else f"HTTP {status} (expected {sub.expected})"
+                if resp.will_close:
+                    conn.close()
+            except (OSError, http.client.HTTPException) as e:
+                status, error = None, type(e).__name__
+                conn.close()
+            local.append(Result(sub.encoding, time.perf_counter() - t0, status, error))
+        conn.close()
+        with lock:
+            results.extend(local)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    return results, time.perf_counter() - t0
+
+# -----------------------------
+# STATS
+# -----------------------------
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list (0 for an empty one)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+def latency_ms(results: list[Result]) -> dict:
+    values = sorted(r.seconds * 1000 for r in results)
+    return {
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(values[-1], 3) if values else 0.0,
+        "mean": round(sum(values) / len(values), 3) if values else 0.0,
+    }
+
+def summarize(results: list[Result], wall: float) -> dict:
+    errors = Counter(r.error for r in results if r.error)
+    by_encoding = defaultdict(list)
+    for r in results:
+        by_encoding[r.encoding].append(r)
+    return {
+        "requests": len(results),
+        "errors": sum(errors.values()),
+        "error_rate": round(sum(errors.values()) / len(results), 4) if results else 0.0,
+        "error_kinds": dict(errors.most_common()),
+        "statuses": {str(k): v for k, v in sorted(Counter(r.status for r in results if r.status).items())},
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(results) / wall, 1) if wall else 0.0,
+        "latency_ms": latency_ms(results),
+        "encodings": {
+            name: {"requests": len(rs), "errors": sum(1 for r in rs if r.error), "latency_ms": latency_ms(rs)}
+            for name, rs in sorted(by_encoding.items())
+        },
+    }
+
+# -----------------------------
+# TARGET
+# -----------------------------
+
+def run_against_stand_in(submissions: list[Submission], concurrency: int, timeout: float,
+                         fsync: bool) -> dict:
+    """Load a tools/lead_server.py process with a throwaway queue; checks the queue afterwards.
+
+    The server runs in its own process so it doesn't share a GIL with the client threads.
+    """
+    from lead_queue import LeadQueue
+    from lead_server import ENDPOINT
+
+    with tempfile.TemporaryDirectory(prefix="lead-load-") as tmp:
+        cmd = [sys.executable, str(Path(__file__).with_name("lead_server.py")), "serve",
+               "--port", "0", "--dir", tmp, "--flush-interval", "0.5"]
+        if not fsync:
+            cmd.append("--no-fsync")
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+        try:
+            banner = proc.stdout.readline()
+            match = re.search(r"http://([^:/]+):(\d+)/", banner)
+            if not match:
+                raise SystemExit(f"lead_server.py didn't start: {banner.strip() or proc.wait()}")
+            results, wall = run_load(match[1], int(match[2]), ENDPOINT, submissions, concurrency, timeout)
+        finally:
+            # Ctrl-C makes the server stop and flush once more.
+            proc.send_signal(signal.SIGINT if os.name == "posix" else signal.SIGTERM)
+            proc.communicate(timeout=60)
+        summary = summarize(results, wall)
+        queue = LeadQueue(Path(tmp))
+        accepted = sum(1 for sub in submissions if sub.kind in ("lead", "repeat"))
+        outbox = Path(tmp) / "outbox.jsonl"
+        emailed = sum(1 for _ in outbox.open(encoding="utf-8")) if outbox.exists() else 0
+        ids = [json.loads(line)["id"] for line in queue.path.open(encoding="utf-8")] if queue.path.exists() else []
+        summary["queue"] = {"expected": accepted, "queued": len(ids), "unique": len(set(ids)),
+                            "pending_after_flush": queue.stats()["pending"], "emailed": emailed,
+                            "repeats": sum(1 for sub in submissions if sub.kind == "repeat"),
+                            "dedupe_rate": round(1 - emailed / accepted, 4) if accepted else 0.0}
+        return summary
+
+def git_revision() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SITE_ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+# -----------------------------
+# REPORT
+# -----------------------------
+
+def run_shape(results: dict) -> dict:
+    """What has to match for two runs' latencies to be comparable."""
+    return {key: results.get(key) for key in ("target", "requests", "concurrency", "seed", "sent_encodings")}
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for key in ("p95", "p99"):
+        now, before = current["latency_ms"][key], baseline["latency_ms"][key]
+        if before >= MIN_COMPARABLE_MS and now > before * (1 + threshold):
+            regressions.append(f"{key} latency {before:.1f} ms -> {now:.1f} ms (+{(now / before - 1) * 100:.0f}%)")
+    if current["error_rate"] > baseline["error_rate"]:
+        regressions.append(f"error rate {baseline['error_rate']:.2%} -> {current['error_rate']:.2%}")
+    return regressions
+
+def print_report(results: dict, baseline: dict | None) -> None:
+    print(f"\n{results['requests']} requests, {results['concurrency']} concurrent, {results['target']}")
+    print(f"  throughput {results['throughput_rps']:,.1f} req/s over {results['wall_s']:.2f} s")
+    base = (baseline or {}).get("latency_ms", {})
+    print(f"  {'':<10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    rows = [("all", results)] + list(results["encodings"].items())
+    for name, row in rows:
+        r = row["latency_ms"]
+        print(f"  {name:<10} {r['p50']:>9.2f} {r['p95']:>9.2f} {r['p99']:>9.2f} {r['max']:>9.2f} {row['errors']:>7}")
+    if base:
+        print(f"  {'baseline':<10} {base['p50']:>9.2f} {base['p95']:>9.2f} {base['p99']:>9.2f} "
+              f"{base['max']:>9.2f} {baseline['errors']:>7}")
+    print(f"  statuses: {', '.join(f'{k} x{v}' for k, v in results['statuses'].items()) or '-'}")
+    for kind, count in results["error_kinds"].items():
+        print(f"  error: {kind} x{count}")
+    queue = results.get("queue")
+    if queue:
+        print(f"  queue: {queue['queued']} queued of {queue['expected']} accepted, "
+              f"{queue['queued'] - queue['unique']} queued twice, {queue['pending_after_flush']} left unsent")
+        print(f"  email: {queue['emailed']} sent for {queue['expected']} accepted ({queue['repeats']} repeat "
+              f"submissions); dedupe rate {queue['dedupe_rate']:.1%}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the lead endpoint with a burst of form submissions.")
+    parser.add_argument("--url", help="endpoint to test (default: a local tools/lead_server.py)")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="submissions to send")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="simultaneous connections")
+    parser.add_argument("--encodings", nargs="+", choices=ENCODINGS, default=list(ENCODINGS),
+                        help="body encodings to rotate through")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the generated submissions")
+    parser.add_argument("--no-fsync", action="store_true", help="stand-in: don't fsync each queued lead")
+    parser.add_argument("--label", default=None, help="name for this run (default: git revision)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed p95/p99 growth as a fraction (default 0.20)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args()
+    if args.requests < 1 or args.concurrency < 1:
+        raise SystemExit("--requests and --concurrency must be at least 1")
+
+    submissions = make_submissions(args.requests, args.encodings, args.seed)
+    concurrency = min(args.concurrency, args.requests)
+    if args.url:
+        url = urlsplit(args.url)
+        if url.scheme != "http" or not url.hostname:
+            raise SystemExit(f"--url must be an http:// URL, got {args.url!r}")
+        results = summarize(*run_load(url.hostname, url.port or 80, url.path or "/",
+                                      submissions, concurrency, args.timeout))
+        target = args.url
+    else:
+        results = run_against_stand_in(submissions, concurrency, args.timeout, fsync=not args.no_fsync)
+        target = "tools/lead_server.py" + (" (no fsync)" if args.no_fsync else "")
+
+    label = args.label or git_revision()
+    results = {"label": label, "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+               "python": platform.python_version(), "machine": platform.machine(), "target": target,
+               "concurrency": concurrency, "seed": args.seed, "sent_encodings": args.encodings, **results}
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.is_file() else None
+    if baseline is not None and run_shape(baseline) != run_shape(results) and not args.save_baseline:
+        print(f"Baseline {baseline.get('label', '')} was a different run "
+              f"({', '.join(f'{k}={v}' for k, v in run_shape(baseline).items())}); not comparing.")
+        baseline = None
+    print_report(results, baseline)
+
+    RUNS_DIR.mkdir(parents=True, exist_ok=True)
+    text = json.dumps(results, indent=1) + "\n"
+    RESULTS_PATH.write_text(text, encoding="utf-8")
+    stamp = results["time"].replace(":", "").replace("-", "")
+    (RUNS_DIR / f"{stamp}-{label}.json").write_text(text, encoding="utf-8")
+
+    queue = results.get("queue")
+    if queue and not (queue["queued"] == queue["unique"] == queue["expected"]):
+        raise SystemExit("FAIL: the stand-in's queue doesn't hold every accepted lead exactly once.")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(text, encoding="utf-8")
+        print(f"\nSaved baseline: {args.baseline}")
+        return
+
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one.")
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nREGRESSIONS vs {baseline.get('label', 'baseline')} (threshold {args.threshold:.0%}):")
+        for line in regressions:
+            print(f"  {line}")
+        raise SystemExit(1)
+    print(f"\nOK: no regression against {baseline.get('label', 'baseline')} past {args.threshold:.0%}.")
+
+if __name__ == "__main__":
+    main()
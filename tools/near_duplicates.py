@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for the service-area pages (MinHash + LSH).
+
+The visible text of each city page (header, nav and footer left out) is
+lowercased, the page's own city name is replaced by "<city>" so a template
+filled in with a different town still counts as the same text, and the words
+are cut into overlapping 5-word shingles. Each page gets a 128-value MinHash
+signature (one-permutation hashing, so one pass per page); LSH banding (32
+bands of 4 rows) buckets the signatures, and only pages that share a bucket
+are compared, with the exact Jaccard similarity of their shingle sets. Nothing is compared pairwise across the whole site, so
+1,000+ city pages stay fast; pages are scanned across --jobs processes.
+
+Blocks (paragraphs, list items, headings) are fingerprinted the same way, and
+the blocks repeated on the most pages are reported: the boilerplate to
+rewrite first (what fix_site_content.REPETITIVE_CITY_MARKER used to find by
+hand).
+
+Writes:
+  audit/city-page-uniqueness.csv     per page: nearest page, similarity, share of unique shingles
+  audit/city-page-similar-pairs.csv  every pair at or above --threshold
+  audit/city-page-shared-blocks.csv  blocks by number of pages they appear on
+
+Usage (standalone; tools/build.py runs this with the site audit):
+  python tools/near_duplicates.py
+  python tools/near_duplicates.py --threshold 0.6 --jobs 4
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import re
+from collections import Counter, defaultdict
+from html.parser import HTMLParser
+from itertools import combinations
+from pathlib import Path
+from typing import Iterable
+
+from city_registry import load_cities
+from render_pool import default_jobs, render_all
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+AUDIT_DIR = SITE_ROOT / "audit"
+CITY_PREFIX = "service-areas/"
+
+SHINGLE_WORDS = 5
+NUM_PERM = 128
+BANDS, ROWS = 32, 4  # candidate pairs from ~0.42 similarity up: (1/BANDS) ** (1/ROWS)
+THRESHOLD = 0.8
+MIN_BLOCK_WORDS = 8
+CITY_TOKEN = "<city>"
+
+WORD_RE = re.compile(r"[a-z0-9]+(?:['’][a-z]+)?")
+
+# -----------------------------
+# TEXT
+# -----------------------------
+
+class ContentScanner(HTMLParser):
+    """Visible page text, and the text of each block element, minus site chrome."""
+
+    SKIP = {"script", "style", "noscript", "template", "header", "nav", "footer"}
+    BLOCKS = {"p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "dt", "dd", "td", "th", "blockquote", "figcaption"}
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.text: list[str] = []
+        self.blocks: list[str] = []
+        self._skip = 0
+        self._block: list[str] | None = None
+        self._block_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in self.SKIP:
+            self._skip += 1
+        elif tag in self.BLOCKS:
+            if self._block_depth == 0:
+                self._block = []
+            self._block_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.SKIP:
+            self._skip = max(0, self._skip - 1)
+        elif tag in self.BLOCKS and self._block_depth:
+            self._block_depth -= 1
+            if self._block_depth == 0 and self._block:
+                self.blocks.append(" ".join(self._block))
+                self._block = None
+
+    def handle_data(self, data: str) -> None:
+        if self._skip:
+            return
+        self.text.append(data)
+        if self._block is not None:
+            self._block.append(data)
+
+def city_words(rel: str) -> list[str]:
+    """service-areas/des-moines-ia/index.html -> ["des", "moines"]"""
+    city = load_cities().city_for_page(rel)
+    if city is not None:
+        return WORD_RE.findall(city["name"].lower())
+    slug = rel[len(CITY_PREFIX):].split("/", 1)[0]
+    return slug.removesuffix("-ia").split("-")
+
+def normalize(text: str, city: list[str]) -> list[str]:
+    """Lowercased words with the page's own city name replaced by CITY_TOKEN."""
+    words = WORD_RE.findall(text.lower().replace("’", "'"))
+    out, n, i = [], len(city), 0
+    while i < len(words):
+        if words[i:i + n] == city:
+            out.append(CITY_TOKEN)
+            i += n
+        else:
+            out.append(words[i])
+            i += 1
+    return out
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+def shingles(words: list[str], k: int = SHINGLE_WORDS) -> set[int]:
+    if len(words) < k:
+        return {_hash64(" ".join(words))} if words else set()
+    return {_hash64(" ".join(words[i:i + k])) for i in range(len(words) - k + 1)}
+
+def minhash(hashes: set[int]) -> tuple[int, ...]:
+    """One-permutation MinHash: each shingle hash lands in one of NUM_PERM bins
+    (hash % NUM_PERM) and each bin keeps its smallest value, so a page costs one
+    pass over its shingles instead of NUM_PERM. Empty bins borrow from the next
+    filled bin (densification), offset by the distance so they stay distinct."""
+    bins: list[int | None] = [None] * NUM_PERM
+    for h in hashes:
+        b, v = h % NUM_PERM, h // NUM_PERM
+        if bins[b] is None or v < bins[b]:
+            bins[b] = v
+    if all(v is None for v in bins):
+        return tuple([0] * NUM_PERM)
+    sig = []
+    for i in range(NUM_PERM):
+        step = 0
+        while bins[(i + step) % NUM_PERM] is None:
+            step += 1
+        sig.append(bins[(i + step) % NUM_PERM] + (step << 64))
+    return tuple(sig)
+
+# -----------------------------
+# SIMILARITY
+# -----------------------------
+
+def scan_page(task: tuple[str, str]) -> tuple[str, set[int], tuple[int, ...], dict[int, str]]:
+    """(rel, shingle hashes, signature, {block hash: block text}) for one page."""
+    rel, html = task
+    scan = ContentScanner()
+    scan.feed(html)
+    scan.close()
+    city = city_words(rel)
+    hashes = shingles(normalize(" ".join(scan.text), city))
+    blocks = {}
+    for block in scan.blocks:
+        words = normalize(block, city)
+        if len(words) >= MIN_BLOCK_WORDS:
+            blocks.setdefault(_hash64(" ".join(words)), " ".join(block.split()))
+    return rel, hashes, minhash(hashes), blocks
+
+def candidate_pairs(signatures: dict[str, tuple[int, ...]]) -> set[tuple[str, str]]:
+    """Pages that agree on every row of at least one band."""
+    pairs: set[tuple[str, str]] = set()
+    for band in range(BANDS):
+        buckets: dict[tuple[int, ...], list[str]] = defaultdict(list)
+        lo = band * ROWS
+        for rel, sig in signatures.items():
+            buckets[sig[lo:lo + ROWS]].append(rel)
+        for bucket in buckets.values():
+            if len(bucket) > 1:
+                pairs.update(combinations(sorted(bucket), 2))
+    return pairs
+
+def jaccard(a: set[int], b: set[int]) -> float:
+    if not a and not b:
+        return 1.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+def find_near_duplicates(pages: Iterable[tuple[str, str]], threshold: float = THRESHOLD,
+                         jobs: int = 1) -> dict:
+    """Similar pairs, per-page nearest neighbours and shared blocks for (rel, html) city pages."""
+    shingle_sets: dict[str, set[int]] = {}
+    signatures: dict[str, tuple[int, ...]] = {}
+    block_pages: dict[int, list[str]] = defaultdict(list)
+    block_text: dict[int, str] = {}
+
+    def collect(result: tuple[str, set[int], tuple[int, ...], dict[int, str]]) -> None:
+        rel, hashes, sig, blocks = result
+        shingle_sets[rel] = hashes
+        signatures[rel] = sig
+        for digest, text in blocks.items():
+            block_pages[digest].append(rel)
+            block_text.setdefault(digest, text)
+
+    render_all(sorted(pages), scan_page, collect, jobs=jobs)
+
+    nearest: dict[str, tuple[str, float]] = {}
+    similar = []
+    for a, b in candidate_pairs(signatures):
+        score = jaccard(shingle_sets[a], shingle_sets[b])
+        if score >= threshold:
+            similar.append((a, b, score))
+        for x, y in ((a, b), (b, a)):
+            if score > nearest.get(x, ("", -1.0))[1]:
+                nearest[x] = (y, score)
+    similar.sort(key=lambda p: (-p[2], p[0], p[1]))
+
+    seen = Counter(h for hashes in shingle_sets.values() for h in hashes)
+    pages_out = []
+    for rel in sorted(shingle_sets):
+        hashes = shingle_sets[rel]
+        unique = sum(1 for h in hashes if seen[h] == 1)
+        near_rel, score = nearest.get(rel, ("", 0.0))
+        pages_out.append({
+            "File": rel,
+            "Shingles": len(hashes),
+            "NearestFile": near_rel,
+            "Similarity": round(score, 3),
+            "UniqueShare": round(unique / len(hashes), 3) if hashes else 0.0,
+        })
+
+    shared = sorted(((len(rels), digest) for digest, rels in block_pages.items() if len(rels) > 1), reverse=True)
+    blocks_out = [
+        {"Pages": count, "Share": round(count / len(shingle_sets), 3), "Text": block_text[digest],
+         "Files": " | ".join(sorted(block_pages[digest]))}
+        for count, digest in shared
+    ]
+    return {"pages": pages_out, "pairs": similar, "blocks": blocks_out, "threshold": threshold}
+
+# -----------------------------
+# REPORT
+# -----------------------------
+
+def _write_csv(path: Path, columns: list[str], rows: Iterable[dict]) -> None:
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, quoting=csv.QUOTE_ALL)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def write_reports(report: dict, out_dir: Path = AUDIT_DIR) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    _write_csv(out_dir / "city-page-uniqueness.csv",
+               ["File", "Shingles", "NearestFile", "Similarity", "UniqueShare"], report["pages"])
+    _write_csv(out_dir / "city-page-similar-pairs.csv", ["FileA", "FileB", "Similarity"],
+               ({"FileA": a, "FileB": b, "Similarity": round(s, 3)} for a, b, s in report["pairs"]))
+    _write_csv(out_dir / "city-page-shared-blocks.csv", ["Pages", "Share", "Text", "Files"], report["blocks"])
+
+def print_report(report: dict, limit: int = 5) -> None:
+    pages = report["pages"]
+    if not pages:
+        print("  No city pages.")
+        return
+    mean = sum(p["Similarity"] for p in pages) / len(pages)
+    print(f"  {len(pages)} city pages; {len(report['pairs'])} pair(s) at or above {report['threshold']:.2f} "
+          f"similarity; mean nearest-page similarity {mean:.2f}")
+    for block in report["blocks"][:limit]:
+        text = block["Text"] if len(block["Text"]) <= 90 else block["Text"][:87] + "..."
+        print(f"  on {block['Pages']:>4} pages: {text}")
+
+def main() -> None:
+    from pipeline import discover_pages
+
+    parser = argparse.ArgumentParser(description="Find near-duplicate city pages (MinHash/LSH).")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help=f"report pairs at or above this Jaccard similarity (default {THRESHOLD})")
+    parser.add_argument("--jobs", type=int, default=default_jobs(), help="scan pages across N worker processes")
+    args = parser.parse_args()
+
+    pages = [(rel, p.source) for rel, p in discover_pages().items()
+             if rel.startswith(CITY_PREFIX) and p.source is not None]
+    report = find_near_duplicates(pages, threshold=args.threshold, jobs=args.jobs)
+    write_reports(report)
+    print_report(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Single-pass build pipeline shared by tools/build.py.
+
+Every page is read from disk once, run through the registered transform
+stages in memory, and written back once at the end (only if it changed).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import profiling
+from render_pool import render_all
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+MANIFEST_PATH = SITE_ROOT / ".build-manifest.json"
+
+# Bump to invalidate every manifest entry (e.g. when the pipeline itself changes).
+MANIFEST_VERSION = 1
+
+SKIP_DIRS = {".git", "node_modules", ".next", "dist", "build", ".cache", "audit", "tools"}
+
+CITY_PAGE_RE = re.compile(r"^service-areas/([^/]+)/index\.html$")
+
+def normalize_newlines(s: str) -> str:
+    return s.replace("\r\n", "\n").replace("\r", "\n")
+
+def sha256_text(s: str) -> str:
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+
+def record_hash(record) -> str:
+    """Stable hash of a JSON-serializable data record (dict, list, str...)."""
+    return sha256_text(json.dumps(record, sort_keys=True, ensure_ascii=False))
+
+@dataclass
+class Page:
+    rel: str                # posix path relative to SITE_ROOT
+    source: str | None      # content as read from disk, None for pages that don't exist yet
+    html: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.html:
+            self.html = self.source or ""
+
+    @property
+    def path(self) -> Path:
+        return SITE_ROOT / self.rel
+
+    @property
+    def city_slug(self) -> str | None:
+        m = CITY_PAGE_RE.match(self.rel)
+        return m.group(1) if m else None
+
+    @property
+    def changed(self) -> bool:
+        return self.html != (self.source or "")
+
+@dataclass
+class BuildContext:
+    pages: dict[str, Page]
+    _file_hashes: dict[str, str] = field(default_factory=dict)
+    _assets: dict[str, str] = field(default_factory=dict)
+
+    def file_hash(self, rel: str) -> str:
+        """Hash of a shared input file as it was when the build started (read at most once)."""
+        if rel not in self._file_hashes:
+            page = self.pages.get(rel)
+            if page is not None:
+                self._file_hashes[rel] = sha256_text(page.source or "")
+            else:
+                path = SITE_ROOT / rel
+                data = path.read_bytes() if path.is_file() else b""
+                self._file_hashes[rel] = hashlib.sha256(data).hexdigest()
+        return self._file_hashes[rel]
+
+    def asset_text(self, rel: str) -> str:
+        """Text of a shared non-page input (stylesheet, script) as it was when the build started."""
+        if rel not in self._assets:
+            path = SITE_ROOT / rel
+            if not path.is_file():
+                raise SystemExit(f"ERROR: {rel} is required by the build but was not found.")
+            self._assets[rel] = path.read_text(encoding="utf-8")
+        return self._assets[rel]
+
+    def source_of(self, rel: str) -> str:
+        page = self.pages.get(rel)
+        if page is None or page.source is None:
+            raise SystemExit(f"ERROR: {rel} is required by the build but was not found.")
+        return page.source
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    fn: Callable[[Page, BuildContext], str]
+    applies: Callable[[Page], bool]
+    # Bump when the transform's output changes for the same inputs.
+    version: int = 1
+    # Returns a fingerprint of everything the stage reads besides the page itself
+    # (per-city data records, templates, shared files).
+    inputs: Callable[[Page, BuildContext], str] | None = None
+
+# Stages run in registration order.
+STAGES: list[Stage] = []
+
+def register_stage(
+    name: str,
+    applies: Callable[[Page], bool] | None = None,
+    version: int = 1,
+    inputs: Callable[[Page, BuildContext], str] | None = None,
+):
+    """Register fn(page, ctx) -> new html as a page transform stage."""
+    def decorator(fn: Callable[[Page, BuildContext], str]):
+        if any(s.name == name for s in STAGES):
+            raise ValueError(f"Duplicate build stage: {name}")
+        STAGES.append(Stage(name, fn, applies or (lambda page: True), version, inputs))
+        return fn
+    return decorator
+
+def page_inputs_key(page: Page, ctx: BuildContext, stages: list[Stage]) -> str:
+    """Hash of every input that determines this page's output."""
+    parts = [f"manifest:{MANIFEST_VERSION}"]
+    for stage in stages:
+        if stage.applies(page):
+            extra = stage.inputs(page, ctx) if stage.inputs else ""
+            parts.append(f"{stage.name}:{stage.version}:{extra}")
+    return sha256_text("\n".join(parts))
+
+class Manifest:
+    """Persistent record of each page's input hash and the hash of what was written."""
+
+    def __init__(self, path: Path = MANIFEST_PATH, load: bool = True):
+        self.path = path
+        self.pages: dict[str, dict] = {}
+        if load and path.is_file():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("version") == MANIFEST_VERSION:
+                self.pages = data.get("pages", {})
+
+    def is_fresh(self, page: Page, key: str) -> bool:
+        entry = self.pages.get(page.rel)
+        if entry is None or entry.get("inputs") != key or page.source is None:
+            return False
+        # A page edited by hand (or by an old script) since the last build is rebuilt.
+        return entry.get("output") == sha256_text(normalize_newlines(page.source))
+
+    def record(self, page: Page, key: str) -> None:
+        self.pages[page.rel] = {"inputs": key, "output": sha256_text(normalize_newlines(page.html))}
+
+    def refresh(self, page: Page) -> None:
+        """Re-record the output of a page that a site-level step edited after its stages ran."""
+        entry = self.pages.get(page.rel)
+        if entry is not None:
+            entry["output"] = sha256_text(normalize_newlines(page.html))
+
+    def save(self, live: set[str]) -> None:
+        pages = {rel: entry for rel, entry in sorted(self.pages.items()) if rel in live}
+        payload = {"version": MANIFEST_VERSION, "pages": pages}
+        self.path.write_text(json.dumps(payload, indent=1) + "\n", encoding="utf-8")
+
+def discover_pages(extra: list[str] | None = None) -> dict[str, Page]:
+    """Read every HTML page under SITE_ROOT once. `extra` adds pages that may not exist yet."""
+    rels = set()
+    for p in SITE_ROOT.glob("**/*.html"):
+        rel = p.relative_to(SITE_ROOT)
+        if any(part in SKIP_DIRS for part in rel.parts[:-1]):
+            continue
+        if p.is_file():
+            rels.add(rel.as_posix())
+    rels.update(extra or [])
+
+    pages = {}
+    for rel in sorted(rels):
+        path = SITE_ROOT / rel
+        source = path.read_text(encoding="utf-8", errors="replace") if path.is_file() else None
+        pages[rel] = Page(rel, source)
+    return pages
+
+# Per-process state for parallel builds (see run_stages).
+_worker_ctx: BuildContext | None = None
+_worker_stages: list[Stage] = []
+
+def _init_worker(sources: dict[str, str | None], stage_names: list[str]) -> None:
+    global _worker_ctx, _worker_stages
+    _worker_ctx = BuildContext(pages={rel: Page(rel, src) for rel, src in sources.items()})
+    by_name = {s.name: s for s in STAGES}
+    _worker_stages = [by_name[name] for name in stage_names]
+
+def _render_page(rel: str) -> tuple[str, str, list[str]]:
+    page = _worker_ctx.pages[rel]
+    prof = profiling.active()
+    if prof is not None:
+        prof.page = rel
+    applied = []
+    for stage in _worker_stages:
+        if stage.applies(page):
+            if prof is not None:
+                page.html = prof.call(stage.name, stage.fn, page, _worker_ctx, bytes_in=profiling.text_size(page.html))
+            else:
+                page.html = stage.fn(page, _worker_ctx)
+            applied.append(stage.name)
+    return rel, page.html, applied
+
+def run_stages(
+    ctx: BuildContext,
+    stages: list[Stage],
+    manifest: Manifest | None = None,
+    jobs: int = 1,
+) -> dict[str, int]:
+    """Run each page through every applicable stage. Returns pages touched per stage.
+
+    With a manifest, pages whose inputs are unchanged since the last build are skipped.
+    With jobs > 1, pages are rendered in a process pool; stages only read the page
+    and the shared sources, so the output is identical to the serial run.
+    """
+    counts = {s.name: 0 for s in stages}
+    counts["(up to date)"] = 0
+
+    keys = {}
+    for page in ctx.pages.values():
+        key = page_inputs_key(page, ctx, stages) if manifest is not None else ""
+        if manifest is not None and manifest.is_fresh(page, key):
+            counts["(up to date)"] += 1
+            continue
+        keys[page.rel] = key
+
+    def collect(result: tuple[str, str, list[str]]) -> None:
+        rel, html, applied = result
+        page = ctx.pages[rel]
+        page.html = html
+        for name in applied:
+            counts[name] += 1
+        if manifest is not None:
+            manifest.record(page, keys[rel])
+
+    sources = {rel: page.source for rel, page in ctx.pages.items()}
+    render_all(list(keys), _render_page, collect, jobs=jobs,
+               initializer=_init_worker, initargs=(sources, [s.name for s in stages]))
+    return counts
+
+def _write_bytes(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+def write_pages(ctx: BuildContext) -> list[Page]:
+    """Write every changed page exactly once (UTF-8, LF newlines)."""
+    prof = profiling.active()
+    written = []
+    for page in ctx.pages.values():
+        if not page.changed:
+            continue
+        data = normalize_newlines(page.html).encode("utf-8")
+        if prof is not None:
+            prof.page = page.rel
+            with prof.span("write_page", len(data)) as event:
+                _write_bytes(page.path, data)
+                event["bytes_out"] = len(data)
+        else:
+            _write_bytes(page.path, data)
+        written.append(page)
+    return written
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Opt-in profiling for the build (python tools/build.py --profile).
+
+instrument() swaps every public function of the transform modules for a
+wrapper that records, per call: the page being built, the call stack, wall
+time and the size of the HTML going in and out. Calls made inside a module
+go through the module globals, so helpers like add_lazy_loading are timed
+underneath the stage that called them.
+
+The report is a flame-style tree on stdout, a folded-stacks file that
+flamegraph tools read, and a JSON timeline. Compare two timelines with:
+
+  python tools/profiling.py OLD.json NEW.json
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from types import ModuleType
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+PROFILE_DIR = SITE_ROOT / ".build-cache" / "profile"
+
+TIMELINE_VERSION = 1
+
+_active: Profiler | None = None
+
+def active() -> Profiler | None:
+    return _active
+
+def enable() -> Profiler:
+    global _active
+    _active = Profiler()
+    return _active
+
+def text_size(value) -> int:
+    """UTF-8 size of the HTML in a transform's argument or result (0 if there is none)."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (tuple, list)):
+        return next((text_size(v) for v in value if isinstance(v, str)), 0)
+    return 0
+
+class Profiler:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.page: str | None = None
+        self.events: list[dict] = []
+        self._stack: list[str] = []
+
+    @contextmanager
+    def span(self, name: str, bytes_in: int = 0):
+        """Time a block; set the yielded dict's "bytes_out" to record output size."""
+        self._stack.append(name)
+        event = {"page": self.page, "name": name, "stack": ";".join(self._stack),
+                 "bytes_in": bytes_in, "bytes_out": 0}
+        start = time.perf_counter()
+        try:
+            yield event
+        finally:
+            event["start_s"] = start - self.t0
+            event["dur_s"] = time.perf_counter() - start
+            self._stack.pop()
+            self.events.append(event)
+
+    def call(self, name: str, fn, *args, bytes_in: int | None = None):
+        with self.span(name, text_size(args) if bytes_in is None else bytes_in) as event:
+            result = fn(*args)
+            event["bytes_out"] = text_size(result)
+        return result
+
+    def wrap(self, name: str, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self.span(name, text_size(args)) as event:
+                result = fn(*args, **kwargs)
+                event["bytes_out"] = text_size(result)
+            return result
+        return wrapper
+
+    def instrument(self, module: ModuleType) -> int:
+        """Wrap the public functions defined in `module`. Returns how many were wrapped."""
+        wrapped = 0
+        for name, obj in list(vars(module).items()):
+            if name.startswith("_") or name == "main":
+                continue
+            if inspect.isfunction(obj) and obj.__module__ == module.__name__:
+                setattr(module, name, self.wrap(f"{module.__name__}.{name}", obj))
+                wrapped += 1
+        return wrapped
+
+    # -----------------------------
+    # REPORTS
+    # -----------------------------
+
+    def stacks(self) -> dict[str, dict]:
+        """calls / total / self time per call stack."""
+        out: dict[str, dict] = defaultdict(lambda: {"calls": 0, "total_s": 0.0, "self_s": 0.0})
+        for e in self.events:
+            entry = out[e["stack"]]
+            entry["calls"] += 1
+            entry["total_s"] += e["dur_s"]
+            entry["self_s"] += e["dur_s"]
+            parent = e["stack"].rpartition(";")[0]
+            if parent:
+                out[parent]["self_s"] -= e["dur_s"]
+        return dict(out)
+
+    def transforms(self) -> dict[str, dict]:
+        """calls / cumulative time / bytes in and out per transform, across all pages."""
+        out: dict[str, dict] = defaultdict(lambda: {"calls": 0, "total_s": 0.0, "bytes_in": 0, "bytes_out": 0})
+        for e in self.events:
+            entry = out[e["name"]]
+            entry["calls"] += 1
+            entry["total_s"] += e["dur_s"]
+            entry["bytes_in"] += e["bytes_in"]
+            entry["bytes_out"] += e["bytes_out"]
+        return dict(sorted(out.items(), key=lambda kv: -kv[1]["total_s"]))
+
+    def per_page(self) -> dict[str, dict[str, dict]]:
+        out: dict[str, dict[str, dict]] = defaultdict(dict)
+        for e in self.events:
+            entry = out[e["page"] or "(site)"].setdefault(
+                e["name"], {"calls": 0, "total_s": 0.0, "bytes_in": 0, "bytes_out": 0})
+            entry["calls"] += 1
+            entry["total_s"] += e["dur_s"]
+            entry["bytes_in"] += e["bytes_in"]
+            entry["bytes_out"] += e["bytes_out"]
+        return dict(sorted(out.items()))
+
+    def flame_text(self, min_share: float = 0.005) -> str:
+        """Indented call tree, widest first, hiding frames below `min_share` of the total."""
+        stacks = self.stacks()
+        total = sum(v["total_s"] for k, v in stacks.items() if ";" not in k) or 1e-9
+        children: dict[str, list[str]] = defaultdict(list)
+        for stack in stacks:
+            children[stack.rpartition(";")[0]].append(stack)
+
+        lines = [f"{'frame':<60} {'total':>8} {'self':>8} {'%':>6} {'calls':>7}"]
+
+        def walk(parent: str, depth: int) -> None:
+            for stack in sorted(children.get(parent, []), key=lambda s: -stacks[s]["total_s"]):
+                s = stacks[stack]
+                share = s["total_s"] / total
+                if share < min_share:
+                    continue
+                label = "  " * depth + stack.rpartition(";")[2]
+                lines.append(f"{label[:60]:<60} {s['total_s']:>7.3f}s {s['self_s']:>7.3f}s "
+                             f"{share * 100:>5.1f}% {s['calls']:>7}")
+                walk(stack, depth + 1)
+
+        walk("", 0)
+        lines.append(f"{'TOTAL':<60} {total:>7.3f}s")
+        return "\n".join(lines)
+
+    def folded(self) -> str:
+        """Brendan Gregg's folded-stack format (self time in microseconds)."""
+        return "".join(f"{stack} {round(max(s['self_s'], 0) * 1e6)}\n"
+                       for stack, s in sorted(self.stacks().items()))
+
+    def timeline(self) -> dict:
+        return {
+            "version": TIMELINE_VERSION,
+            "total_s": time.perf_counter() - self.t0,
+            "transforms": self.transforms(),
+            "pages": self.per_page(),
+            "events": sorted(self.events, key=lambda e: e["start_s"]),
+        }
+
+    def write_reports(self, out_dir: Path = PROFILE_DIR) -> tuple[Path, Path]:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        timeline_path = out_dir / "timeline.json"
+        folded_path = out_dir / "build.folded"
+        timeline_path.write_text(json.dumps(self.timeline(), indent=1) + "\n", encoding="utf-8")
+        folded_path.write_text(self.folded(), encoding="utf-8")
+        return timeline_path, folded_path
+
+# -----------------------------
+# TIMELINE DIFF
+# -----------------------------
+
+def diff_timelines(old: dict, new: dict, limit: int = 30) -> str:
+    names = set(old["transforms"]) | set(new["transforms"])
+    zero = {"calls": 0, "total_s": 0.0, "bytes_out": 0}
+    rows = []
+    for name in names:
+        a = old["transforms"].get(name, zero)
+        b = new["transforms"].get(name, zero)
+        rows.append((b["total_s"] - a["total_s"], name, a, b))
+    rows.sort(key=lambda r: -abs(r[0]))
+
+    lines = [f"{'transform':<50} {'old':>8} {'new':>8} {'delta':>9} {'calls':>11} {'bytes out delta':>16}"]
+    for delta, name, a, b in rows[:limit]:
+        calls = f"{a['calls']}->{b['calls']}" if a["calls"] != b["calls"] else str(b["calls"])
+        lines.append(f"{name[:50]:<50} {a['total_s']:>7.3f}s {b['total_s']:>7.3f}s {delta:>+8.3f}s "
+                     f"{calls:>11} {b['bytes_out'] - a['bytes_out']:>+16,}")
+    lines.append(f"{'TOTAL':<50} {old['total_s']:>7.3f}s {new['total_s']:>7.3f}s "
+                 f"{new['total_s'] - old['total_s']:>+8.3f}s")
+    return "\n".join(lines)
+
+def main() -> None:
+    if len(sys.argv) != 3:
+        raise SystemExit("Usage: python tools/profiling.py OLD_TIMELINE.json NEW_TIMELINE.json")
+    old, new = (json.loads(Path(p).read_text(encoding="utf-8")) for p in sys.argv[1:])
+    print(diff_timelines(old, new))
+
+if __name__ == "__main__":
+    main()
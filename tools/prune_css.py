@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tree-shake the site stylesheet against every built page.
+
+Collects the tags, classes and ids used by all pages (plus the classes that
+inline scripts and assets/js/tracking.js add at runtime), drops every rule
+of assets/css/styles.css that can't match any of them, and writes the result
+minified to assets/css/styles.min.css, the file the pages link.
+
+The selectors removed are listed in .build-cache/css-prune.json.
+
+Usage (standalone; tools/build.py runs this after writing pages):
+  python tools/prune_css.py
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Iterable
+
+import css_rules
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+SOURCE_CSS = "assets/css/styles.css"
+OUTPUT_CSS = "assets/css/styles.min.css"
+SCRIPTS = ["assets/js/tracking.js"]
+REPORT_PATH = SITE_ROOT / ".build-cache" / "css-prune.json"
+
+# Markup that is never in a static page (e.g. injected by a third-party widget).
+SAFELIST = css_rules.UsedTokens(tags={"html", "body"})
+
+def site_tokens(pages: Iterable[str], scripts: Iterable[str] = ()) -> css_rules.UsedTokens:
+    used = css_rules.UsedTokens()
+    used.update(SAFELIST)
+    for html in pages:
+        used.update(css_rules.html_tokens(html))
+    for js in scripts:
+        used.update(css_rules.js_tokens(js))
+    return used
+
+def removed_selectors(before: list[css_rules.Rule], after: list[css_rules.Rule]) -> list[str]:
+    def selectors(rules, prefix=""):
+        for rule in rules:
+            if rule.children is not None:
+                yield from selectors(rule.children, f"{prefix}{rule.prelude} ")
+            elif rule.at_keyword:
+                yield f"{prefix}{rule.prelude}"
+            else:
+                for sel in rule.selectors:
+                    yield f"{prefix}{sel}"
+    kept = set(selectors(after))
+    return [s for s in selectors(before) if s not in kept]
+
+def prune(css_text: str, used: css_rules.UsedTokens | None) -> tuple[str, dict]:
+    """Minified stylesheet without unused rules, plus a report of what went."""
+    rules = css_rules.parse_css(css_text)
+    kept = css_rules.filter_rules(rules, used) if used is not None else rules
+    full = css_rules.serialize(rules, minify=True)
+    pruned = css_rules.serialize(kept, minify=True)
+    report = {
+        "source_bytes": len(css_text.encode("utf-8")),
+        "minified_bytes": len(full.encode("utf-8")),
+        "pruned_bytes": len(pruned.encode("utf-8")),
+        "removed": removed_selectors(rules, kept),
+    }
+    return pruned, report
+
+def prune_site(pages: Iterable[str] | None) -> dict:
+    """Write the stylesheet pruned for these page sources (None keeps every rule). Returns the report."""
+    css_text = (SITE_ROOT / SOURCE_CSS).read_text(encoding="utf-8")
+    if pages is None:
+        pruned, report = prune(css_text, None)
+    else:
+        scripts = [(SITE_ROOT / rel).read_text(encoding="utf-8") for rel in SCRIPTS if (SITE_ROOT / rel).is_file()]
+        pruned, report = prune(css_text, site_tokens(pages, scripts))
+
+    out = SITE_ROOT / OUTPUT_CSS
+    if not out.is_file() or out.read_text(encoding="utf-8") != pruned:
+        out.write_text(pruned, encoding="utf-8")
+    REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    REPORT_PATH.write_text(json.dumps(report, indent=1) + "\n", encoding="utf-8")
+    return report
+
+def print_report(report: dict) -> None:
+    saved = report["minified_bytes"] - report["pruned_bytes"]
+    share = saved / report["minified_bytes"] if report["minified_bytes"] else 0
+    print(f"  {SOURCE_CSS}: {report['source_bytes']:,} bytes, {report['minified_bytes']:,} minified")
+    print(f"  {OUTPUT_CSS}: {report['pruned_bytes']:,} bytes "
+          f"(-{saved:,} bytes / {share:.0%} unused, {len(report['removed'])} selectors removed)")
+
+def main() -> None:
+    from pipeline import discover_pages
+
+    pages = discover_pages()
+    report = prune_site(p.source or "" for rel, p in pages.items() if "template" not in Path(rel).name.lower())
+    print_report(report)
+    print(f"Removed selectors: {REPORT_PATH.relative_to(SITE_ROOT)}")
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,18 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
 import re
 from pathlib import Path
 from html import escape
 
-ROOT = Path(".").resolve()
+from city_registry import load_cities
+from render_pool import render_all
+
+ROOT = Path(__file__).resolve().parents[1]
 INDEX = ROOT / "index.html"
 SERVICE_AREAS = ROOT / "service-areas"
 
-if not INDEX.exists():
-    raise SystemExit("ERROR: index.html not found in repo root.")
-if not SERVICE_AREAS.exists():
-    raise SystemExit("ERROR: service-areas/ folder not found. Your repo tree shows it exists, so run this from the repo root.")
-
-base = INDEX.read_text(encoding="utf-8", errors="replace")
-
 DOMAIN = "https://iowagutterguards.online"
 
 def replace_title(html: str, new_title: str) -> str:
@@ -74,7 +71,12 @@ def titlecase_from_slug(slug: str) -> str:
     return " ".join(w.capitalize() for w in words)
 
 def extract_city_from_existing(existing_html: str, slug: str) -> str:
-    # Prefer existing H1 text if present
+    # Listed cities take their name from data/cities.json
+    listed = load_cities().get(slug)
+    if listed is not None:
+        return listed["name"]
+
+    # Otherwise prefer existing H1 text if present
     m = re.search(r"<h1\b[^>]*>(.*?)</h1>", existing_html, flags=re.I | re.S)
     if m:
         h1 = re.sub(r"<[^>]+>", "", m.group(1))
@@ -107,25 +109,48 @@ def build_city_page(home_html: str, city: str, slug: str) -> str:
     html = insert_city_intro_after_first_section(html, city)
     return html
 
-# Iterate every service area folder
-targets = []
-for d in sorted(SERVICE_AREAS.iterdir()):
-    if not d.is_dir():
-        continue
-    slug = d.name
-    out = d / "index.html"
-    if out.exists():
-        targets.append((slug, out))
-
-if not targets:
-    raise SystemExit("ERROR: No service-areas/*/index.html pages found to regenerate.")
-
-written = 0
-for slug, out_path in targets:
+_base = ""
+
+def _set_base(home_html: str) -> None:
+    global _base
+    _base = home_html
+
+def render_target(target: tuple[str, Path]) -> tuple[Path, str]:
+    slug, out_path = target
     existing_html = out_path.read_text(encoding="utf-8", errors="replace")
     city = extract_city_from_existing(existing_html, slug)
-    new_html = build_city_page(base, city, slug)
+    return out_path, build_city_page(_base, city, slug)
+
+def write_target(result: tuple[Path, str]) -> None:
+    out_path, new_html = result
     out_path.write_text(new_html, encoding="utf-8", newline="\n")
-    written += 1
 
-print(f"OK: regenerated {written} service-area pages as homepage clones (consistent layout).")
\ No newline at end of file
+def main(jobs: int = 1) -> None:
+    if not INDEX.exists():
+        raise SystemExit("ERROR: index.html not found in repo root.")
+    if not SERVICE_AREAS.exists():
+        raise SystemExit("ERROR: service-areas/ folder not found. Your repo tree shows it exists, so run this from the repo root.")
+
+    base = INDEX.read_text(encoding="utf-8", errors="replace")
+
+    # Iterate every service area folder
+    targets = []
+    for d in sorted(SERVICE_AREAS.iterdir()):
+        if not d.is_dir():
+            continue
+        slug = d.name
+        out = d / "index.html"
+        if out.exists():
+            targets.append((slug, out))
+
+    if not targets:
+        raise SystemExit("ERROR: No service-areas/*/index.html pages found to regenerate.")
+
+    written = render_all(targets, render_target, write_target, jobs=jobs, initializer=_set_base, initargs=(base,))
+
+    print(f"OK: regenerated {written} service-area pages as homepage clones (consistent layout).")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate service-area pages as homepage clones.")
+    parser.add_argument("--jobs", type=int, default=1, help="render pages across N worker processes")
+    main(jobs=parser.parse_args().jobs)
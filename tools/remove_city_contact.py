@@ -1,32 +1,15 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
-import re
 from pathlib import Path
 
+from html_index import SectionIndex, remove_element
+
 SITE_ROOT = Path(__file__).resolve().parents[1]
 
 def remove_section_by_id(html_text: str, section_id: str) -> tuple[str, bool]:
     # Removes <section ... id="section_id"> ... </section> including nested sections.
-    pattern = re.compile(rf'(<section\b[^>]*\bid="{re.escape(section_id)}"[^>]*>)', re.I)
-    m = pattern.search(html_text)
-    if not m:
-        return html_text, False
-
-    start = m.start(1)
-    i = start
-    depth = 0
-    while i < len(html_text):
-        if html_text.startswith("<section", i):
-            depth += 1
-        elif html_text.startswith("</section>", i):
-            depth -= 1
-            if depth == 0:
-                end = i + len("</section>")
-                return html_text[:start] + html_text[end:], True
-        i += 1
-
-    return html_text, False
+    return remove_element(html_text, SectionIndex(html_text).by_id(section_id))
 
 def main() -> None:
     sa_dir = SITE_ROOT / "service-areas"
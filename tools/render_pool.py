@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Shared helper for rendering pages across a process pool.
+
+Rendering fans out to worker processes; writing stays in the calling process,
+in task order, with at most `jobs * WINDOW_PER_JOB` rendered pages held in
+memory at once. With jobs=1 everything runs inline, so the parallel and serial
+paths call the same render/write functions and produce identical files.
+"""
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Rendered-but-unwritten results allowed per worker before the writer catches up.
+WINDOW_PER_JOB = 4
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
+
+def render_all(
+    tasks: Iterable[T],
+    render: Callable[[T], R],
+    write: Callable[[R], None],
+    jobs: int = 1,
+    initializer: Callable[..., None] | None = None,
+    initargs: tuple = (),
+) -> int:
+    """Render every task and hand each result to write() in task order.
+
+    `render` must be a module-level function (it is pickled to the workers).
+    `initializer(*initargs)` runs once per worker, and once inline for jobs=1,
+    so large shared inputs like templates aren't re-sent with every task.
+    Returns the number of results written.
+    """
+    if initializer is not None and jobs <= 1:
+        initializer(*initargs)
+
+    written = 0
+    if jobs <= 1:
+        for task in tasks:
+            write(render(task))
+            written += 1
+        return written
+
+    limit = jobs * WINDOW_PER_JOB
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer, initargs=initargs) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(render, task))
+            if len(pending) >= limit:
+                write(pending.popleft().result())
+                written += 1
+        while pending:
+            write(pending.popleft().result())
+            written += 1
+    return written
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Serve every content image as resized AVIF/WebP variants with explicit dimensions.
+
+encode_images() decodes each raster image under assets/ and writes variants
+at the standard widths (never wider than the source):
+
+  assets/images/igg-logo.png -> assets/images/variants/igg-logo-1f2e3d4c-320w.avif, ...-320w.webp, ...
+
+Variant names carry the source hash, so an unchanged image is never
+re-encoded: its variants are found on disk. What each page can use is
+recorded in data/images.json. Commit the records and the variants with the
+pages: a build without Pillow reads both as they are and produces the same
+pages.
+
+responsive_html() then turns each <img> of those images into
+
+  <picture data-responsive>
+    <source type="image/avif" srcset="...-320w.avif 320w, ..." sizes="...">
+    <source type="image/webp" srcset="..." sizes="...">
+    <img src="original.png" width="500" height="333" ...>
+  </picture>
+
+The width/height attributes (read from the file header) reserve the image's
+box before it loads, so the page doesn't shift. Images above the fold are
+fetched eagerly with high priority; the rest stay lazy.
+
+Encoding needs Pillow (pip install pillow; AVIF needs Pillow 11.3+ or
+pillow-avif-plugin). Without it, committed variants are still used, and
+images without variants still get width/height attributes.
+
+Usage (standalone; tools/build.py runs this as the responsive_images stage):
+  python tools/responsive_images.py
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import posixpath
+import re
+import struct
+from pathlib import Path
+
+from critical_css import fold_bounds
+from html_index import HtmlIndex, splice
+from render_pool import render_all
+
+try:
+    from PIL import Image, features
+except ImportError:  # optional dependency
+    Image = features = None
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+IMAGE_DIR = "assets"
+VARIANTS_DIR = "assets/images/variants"
+RECORDS_REL = "data/images.json"
+RECORDS_PATH = SITE_ROOT / RECORDS_REL
+
+RASTER_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+# Social cards are fetched by crawlers that expect the original JPEG.
+SKIP_PREFIXES = ("og-",)
+
+WIDTHS = (320, 480, 640, 960, 1280, 1920)
+QUALITY = {"avif": 55, "webp": 80}
+MIME = {"avif": "image/avif", "webp": "image/webp"}
+
+# Rendered size per image (a `sizes` attribute); anything else is assumed full-width.
+# .logo-img is 150px tall (126px on phones) and the logo is 3:2.
+SIZES = {
+    "assets/images/igg-logo.png": "(max-width: 640px) 190px, 226px",
+}
+DEFAULT_SIZES = "100vw"
+
+# -----------------------------
+# SOURCE IMAGES
+# -----------------------------
+
+def image_size(data: bytes) -> tuple[int, int] | None:
+    """(width, height) from a PNG or JPEG header, without decoding the image."""
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR":
+        return struct.unpack(">II", data[16:24])
+    if data[:2] == b"\xff\xd8":
+        i = 2
+        while i + 9 < len(data):
+            if data[i] != 0xFF:
+                i += 1
+                continue
+            marker = data[i + 1]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+                i += 1 if marker == 0xFF else 2
+                continue
+            length = struct.unpack(">H", data[i + 2:i + 4])[0]
+            # SOF0..SOF15, except DHT (C4), JPG (C8) and DAC (CC).
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", data[i + 5:i + 9])
+                return width, height
+            i += 2 + length
+    return None
+
+def find_images() -> list[str]:
+    rels = []
+    for path in sorted((SITE_ROOT / IMAGE_DIR).rglob("*")):
+        rel = path.relative_to(SITE_ROOT).as_posix()
+        if (path.suffix.lower() in RASTER_EXTENSIONS and not rel.startswith(VARIANTS_DIR + "/")
+                and not path.name.startswith(SKIP_PREFIXES)):
+            rels.append(rel)
+    return rels
+
+def available_formats() -> list[str]:
+    """Variant formats this Pillow can encode, best first."""
+    if Image is None:
+        return []
+    formats = []
+    try:
+        has_avif = features.check("avif")
+    except ValueError:  # Pillow without the avif feature flag
+        has_avif = False
+    if not has_avif:
+        try:
+            import pillow_avif  # noqa: F401  (registers the AVIF plugin)
+            has_avif = True
+        except ImportError:
+            pass
+    if has_avif:
+        formats.append("avif")
+    if features.check("webp"):
+        formats.append("webp")
+    return formats
+
+def variant_widths(width: int) -> list[int]:
+    return [w for w in WIDTHS if w < width] + [width]
+
+def variant_rel(rel: str, digest: str, width: int, fmt: str) -> str:
+    return f"{VARIANTS_DIR}/{Path(rel).stem}-{digest[:8]}-{width}w.{fmt}"
+
+# -----------------------------
+# ENCODING
+# -----------------------------
+
+def encode(job: tuple[str, list[str]]) -> tuple[str, list[tuple[str, bytes]]]:
+    """Every variant of one source image, as (variant rel, encoded bytes)."""
+    rel, formats = job
+    data = (SITE_ROOT / rel).read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    out = []
+    with Image.open(io.BytesIO(data)) as im:
+        im.load()
+        has_alpha = im.mode in ("RGBA", "LA") or "transparency" in im.info
+        im = im.convert("RGBA" if has_alpha else "RGB")
+        for width in variant_widths(im.width):
+            height = max(1, round(im.height * width / im.width))
+            resized = im if width == im.width else im.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                buf = io.BytesIO()
+                resized.save(buf, fmt.upper(), quality=QUALITY[fmt])
+                out.append((variant_rel(rel, digest, width, fmt), buf.getvalue()))
+    return rel, out
+
+def existing_formats(rel: str, digest: str, widths: list[int]) -> list[str]:
+    """Formats whose variants of this exact source are all on disk already."""
+    return [fmt for fmt in MIME
+            if all((SITE_ROOT / variant_rel(rel, digest, w, fmt)).is_file() for w in widths)]
+
+def encode_images(jobs: int = 1, write: bool = True) -> tuple[dict[str, dict], list[str]]:
+    """Bring every image's variants up to date. Returns (records, rels encoded this run).
+
+    Variant names carry the source hash, so variants already on disk are
+    reused as they are. With write=False nothing is encoded, deleted or written.
+    """
+    formats = available_formats() if write else []
+    records: dict[str, dict] = {}
+    todo = []
+    for rel in find_images():
+        data = (SITE_ROOT / rel).read_bytes()
+        size = image_size(data)
+        if size is None:
+            continue
+        digest = hashlib.sha256(data).hexdigest()
+        widths = variant_widths(size[0])
+        have = existing_formats(rel, digest, widths)
+        missing = [fmt for fmt in formats if fmt not in have]
+        if missing:
+            todo.append((rel, missing))
+        ready = [fmt for fmt in MIME if fmt in have or fmt in missing]
+        records[rel] = {"sha256": digest, "width": size[0], "height": size[1],
+                        "formats": ready, "widths": widths if ready else []}
+
+    encoded = []
+
+    def save(result: tuple[str, list[tuple[str, bytes]]]) -> None:
+        rel, variants = result
+        for vrel, data in variants:
+            path = SITE_ROOT / vrel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        encoded.append(rel)
+
+    if write:
+        render_all(todo, encode, save, jobs=jobs)
+        # Variants of images that changed or are gone.
+        live = {variant_rel(rel, r["sha256"], w, f) for rel, r in records.items()
+                for w in r["widths"] for f in r["formats"]}
+        variants_dir = SITE_ROOT / VARIANTS_DIR
+        if variants_dir.is_dir():
+            for path in variants_dir.iterdir():
+                if path.relative_to(SITE_ROOT).as_posix() not in live:
+                    path.unlink()
+
+        text = json.dumps(records, indent=1, sort_keys=True) + "\n"
+        if not RECORDS_PATH.is_file() or RECORDS_PATH.read_text(encoding="utf-8") != text:
+            RECORDS_PATH.write_text(text, encoding="utf-8")
+    return records, encoded
+
+# -----------------------------
+# MARKUP
+# -----------------------------
+
+def resolve(page_rel: str, url: str) -> str | None:
+    """Site-relative path an <img src> points at, or None for external images."""
+    path = re.split(r"[?#]", url, 1)[0]
+    if not path or "://" in path or path.startswith(("//", "data:")):
+        return None
+    if path.startswith("/"):
+        return posixpath.normpath(path.lstrip("/"))
+    return posixpath.normpath(posixpath.join(posixpath.dirname(page_rel), path))
+
+def url_for(page_rel: str, target: str, like: str) -> str:
+    """URL of `target` from the page, root-absolute or relative like the original src."""
+    if like.startswith("/"):
+        return "/" + target
+    return posixpath.relpath(target, posixpath.dirname(page_rel) or ".")
+
+def _set_attrs(open_tag: str, add: dict[str, str], drop: tuple[str, ...] = ()) -> str:
+    for name in drop:
+        open_tag = re.sub(rf"""\s{name}\s*=\s*(?:"[^"]*"|'[^']*'|[^\s>"']+)""", "", open_tag, flags=re.I)
+    end = -2 if open_tag.endswith("/>") else -1
+    extra = "".join(f' {k}="{v}"' for k, v in add.items())
+    return open_tag[:end].rstrip() + extra + open_tag[end:]
+
+def picture_html(img_tag: str, page_rel: str, rel: str, src: str, record: dict) -> str:
+    sizes = SIZES.get(rel, DEFAULT_SIZES)
+    sources = []
+    for fmt in record["formats"]:
+        srcset = ", ".join(
+            f"{url_for(page_rel, variant_rel(rel, record['sha256'], w, fmt), src)} {w}w" for w in record["widths"])
+        sources.append(f'<source type="{MIME[fmt]}" srcset="{srcset}" sizes="{sizes}">')
+    return "<picture data-responsive>" + "".join(sources) + img_tag + "</picture>"
+
+def responsive_html(html: str, page_rel: str, records: dict[str, dict]) -> str:
+    """Rewrite the page's <img> tags of known images; re-running replaces earlier <picture>s."""
+    index = HtmlIndex(html)
+    pictures = [p for p in index.by_tag("picture") if "data-responsive" in p.attr_text]
+    _, fold_end = fold_bounds(html)
+
+    edits = []
+    for img in index.by_tag("img"):
+        src = img.attrs.get("src")
+        rel = resolve(page_rel, src) if src else None
+        record = records.get(rel)
+        if record is None:
+            continue
+
+        add = {}
+        drop = ()
+        if "width" not in img.attrs and "height" not in img.attrs:
+            add.update(width=str(record["width"]), height=str(record["height"]))
+        if img.start < fold_end:
+            # Lazy-loading the logo or hero image only delays the first paint.
+            if "loading" in img.attrs:
+                drop = ("loading",)
+            if "fetchpriority" not in img.attrs:
+                add["fetchpriority"] = "high"
+        elif "loading" not in img.attrs:
+            add["loading"] = "lazy"
+        if "decoding" not in img.attrs:
+            add["decoding"] = "async"
+        img_tag = _set_attrs(img.open_tag(html), add, drop) if add or drop else img.open_tag(html)
+
+        wrapper = next((p for p in pictures if p.start < img.start < p.end), None)
+        if record["formats"]:
+            new = picture_html(img_tag, page_rel, rel, src, record)
+        else:
+            new = img_tag
+        if wrapper is not None:
+            edits.append((wrapper.start, wrapper.end, new))
+        elif new != img.open_tag(html):
+            edits.append((img.start, img.end, new))
+    return splice(html, edits) if edits else html
+
+def print_report(records: dict[str, dict], encoded: list[str]) -> None:
+    for rel in encoded:
+        r = records[rel]
+        print(f"  {rel}: {r['width']}x{r['height']} -> {', '.join(r['formats'])} at {len(r['widths'])} width(s)")
+    print(f"Encoded {len(encoded)} image(s), {len(records) - len(encoded)} unchanged.")
+    if Image is None:
+        print("Note: Pillow is not installed (pip install pillow); used the committed variants, encoded none.")
+
+def main() -> None:
+    from pipeline import discover_pages
+
+    records, encoded = encode_images()
+    print_report(records, encoded)
+
+    changed = 0
+    for rel, page in discover_pages().items():
+        if page.source is None or "template" in Path(rel).name.lower():
+            continue
+        html = responsive_html(page.source, rel, records)
+        if html != page.source:
+            page.path.write_text(html, encoding="utf-8")
+            changed += 1
+    print(f"OK: rewrote images in {changed} page(s).")
+
+if __name__ == "__main__":
+    main()
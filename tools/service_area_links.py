@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+The service-area link list ("Where we install gutter guards"), from the city registry.
+
+The homepage and every city page link to each city page from a
+<ul class="service-area-list">. Its items are rendered from data/cities.json
+(tools/city_registry.py), in file order, so a city added there is listed on
+every page by the next build; city-template.html leaves the list empty. The
+rest of the section (heading, intro) is left alone.
+
+Usage (standalone; tools/build.py runs this as the service_area_links stage):
+  python tools/service_area_links.py
+"""
+from __future__ import annotations
+
+import re
+from html import escape
+from pathlib import Path
+from typing import Iterable
+
+from city_registry import CITY_PREFIX, load_cities
+from html_index import HtmlIndex, splice
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+
+LIST_CLASS = "service-area-list"
+INDENT_RE = re.compile(r"[ \t]*")
+
+def render_items(cities: Iterable[dict], indent: str) -> str:
+    """The list's inner HTML: one item per city, indented one step past the <ul>."""
+    items = [f'{indent}  <li><a href="/{CITY_PREFIX}{city["slug"]}">{escape(city["name"], quote=False)}, IA gutter guards</a></li>'
+             for city in cities]
+    return "\n" + "".join(item + "\n" for item in items) + indent
+
+def apply_service_area_links(html: str, cities: Iterable[dict]) -> str | None:
+    """Fill every service-area list on the page. Returns None if it has none."""
+    lists = [el for el in HtmlIndex(html).by_class(LIST_CLASS) if el.tag == "ul"]
+    if not lists:
+        return None
+    cities = list(cities)
+    edits = []
+    for el in lists:
+        indent = INDENT_RE.match(html, html.rfind("\n", 0, el.start) + 1).group()
+        edits.append((el.open_end, el.close_start, render_items(cities, indent)))
+    return splice(html, edits)
+
+def main() -> None:
+    cities = load_cities()
+    pages = [SITE_ROOT / "index.html"] + [SITE_ROOT / cities.page_rel(slug) for slug in cities.slugs]
+    updated = 0
+    for page in pages:
+        if not page.exists():
+            continue
+        html = page.read_text(encoding="utf-8")
+        new_html = apply_service_area_links(html, cities)
+        if new_html is None:
+            print(f"Warning: no <ul class=\"{LIST_CLASS}\"> in {page.relative_to(SITE_ROOT)}")
+        elif new_html != html:
+            page.write_text(new_html, encoding="utf-8")
+            updated += 1
+    print(f"OK: {len(cities)} cities listed; updated {updated} pages.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+SEO/content audit of every built page (replaces the PowerShell audit runs).
+
+Each page is parsed once, in a single html.parser pass that collects the
+title, meta description, canonical, robots meta, <h1>s, visible body text
+and footer; pages are scanned across --jobs worker processes. Writes:
+
+  audit/site-audit.csv       one row per page (same columns as the PowerShell
+                             audit, plus H1Count, MultipleH1 and ThinUnder200)
+  audit/city-issues.csv      city pages: thin content, repeated boilerplate, footer hash
+  audit/footer-fingerprint.csv  pages grouped by identical footer
+  audit/site-audit.json      all of the above
+
+Usage (standalone; tools/build.py runs this after writing pages):
+  python tools/site_audit.py
+  python tools/site_audit.py --jobs 4 --fail-on MissingTitle --fail-on MissingH1
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import re
+from collections import defaultdict
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Iterable
+
+from fix_site_content import REPETITIVE_CITY_MARKER
+from render_pool import default_jobs, render_all
+from sitemap import BASE_URL, page_url
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+AUDIT_DIR = SITE_ROOT / "audit"
+
+META_DESC_MIN = 70
+META_DESC_MAX = 160
+THIN_WORDS = 200
+
+SITE_AUDIT_COLUMNS = [
+    "File", "Url", "Title", "TitleLen", "MetaDescription", "MetaDescLen", "Canonical", "H1", "WordCount",
+    "MissingTitle", "MissingMetaDescription", "MissingCanonical", "MissingH1", "MetaDescTooShort",
+    "MetaDescTooLong", "H1Count", "MultipleH1", "ThinUnder200",
+]
+CITY_ISSUE_COLUMNS = ["File", "WordCount", "ThinUnder200", "HasGenericCitySentence", "HasLetsTextBlock", "FooterHash"]
+FOOTER_COLUMNS = ["Count", "FooterHash", "Files"]
+
+# The "Text us about your gutters" block that fix_site_content removes.
+LETS_TEXT_RE = re.compile(r"Let[’']s\s+text|Text\s+us\s+about\s+your\s+gutters", re.I)
+# True/False columns: counted in the summary and accepted by --fail-on.
+ISSUE_COLUMNS = [c for c in SITE_AUDIT_COLUMNS if c.startswith(("Missing", "MetaDescToo", "Multiple", "Thin"))]
+ISSUE_COLUMNS += ["HasGenericCitySentence", "HasLetsTextBlock"]
+
+# -----------------------------
+# PARSE
+# -----------------------------
+
+class PageScanner(HTMLParser):
+    """Everything the audit needs from one page, in one pass."""
+
+    SKIP_TEXT = {"script", "style", "noscript", "template"}
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.title: list[str] = []
+        self.meta_description: str | None = None
+        self.canonical: str | None = None
+        self.noindex = False
+        self.h1s: list[list[str]] = []
+        self.words: list[str] = []
+        self.footer: list[str] = []
+        self._skip = 0
+        self._in_title = self._in_body = False
+        self._h1_depth = self._footer_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        a = {k: v or "" for k, v in attrs}
+        if tag == "meta":
+            name = a.get("name", "").lower()
+            if name == "description" and self.meta_description is None:
+                self.meta_description = a.get("content", "").strip()
+            elif name == "robots" and "noindex" in a.get("content", "").lower():
+                self.noindex = True
+        elif tag == "link" and "canonical" in a.get("rel", "").lower().split() and self.canonical is None:
+            self.canonical = a.get("href", "").strip()
+        elif tag == "title" and not self._in_body:
+            self._in_title = True
+        elif tag == "body":
+            self._in_body = True
+        elif tag in self.SKIP_TEXT:
+            self._skip += 1
+        elif tag == "h1":
+            self._h1_depth += 1
+            if self._h1_depth == 1:
+                self.h1s.append([])
+        elif tag == "footer":
+            self._footer_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title":
+            self._in_title = False
+        elif tag in self.SKIP_TEXT:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "h1":
+            self._h1_depth = max(0, self._h1_depth - 1)
+        elif tag == "footer":
+            self._footer_depth = max(0, self._footer_depth - 1)
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title.append(data)
+            return
+        if self._skip or not self._in_body:
+            return
+        words = data.split()
+        self.words.extend(words)
+        if self._h1_depth:
+            self.h1s[-1].extend(words)
+        if self._footer_depth:
+            self.footer.extend(words)
+
+# -----------------------------
+# AUDIT
+# -----------------------------
+
+def audit_page(task: tuple[str, str]) -> dict:
+    rel, html = task
+    scan = PageScanner()
+    scan.feed(html)
+    scan.close()
+
+    title = " ".join("".join(scan.title).split())
+    desc = scan.meta_description or ""
+    h1s = [" ".join(words) for words in scan.h1s]
+    text = " ".join(scan.words)
+    word_count = len(scan.words)
+    return {
+        "File": rel,
+        "Url": BASE_URL + page_url(rel),
+        "Title": title,
+        "TitleLen": len(title),
+        "MetaDescription": desc,
+        "MetaDescLen": len(desc),
+        "Canonical": scan.canonical or "",
+        "H1": h1s[0] if h1s else "",
+        "WordCount": word_count,
+        "MissingTitle": not title,
+        "MissingMetaDescription": not desc,
+        "MissingCanonical": not scan.canonical,
+        "MissingH1": not h1s,
+        "MetaDescTooShort": 0 < len(desc) < META_DESC_MIN,
+        "MetaDescTooLong": len(desc) > META_DESC_MAX,
+        "H1Count": len(h1s),
+        "MultipleH1": len(h1s) > 1,
+        "ThinUnder200": word_count < THIN_WORDS,
+        "Noindex": scan.noindex,
+        "HasGenericCitySentence": REPETITIVE_CITY_MARKER in text,
+        "HasLetsTextBlock": LETS_TEXT_RE.search(text) is not None,
+        "FooterHash": hashlib.sha256(" ".join(scan.footer).encode("utf-8")).hexdigest() if scan.footer else "",
+    }
+
+def footer_groups(rows: list[dict]) -> list[dict]:
+    groups: dict[str, list[str]] = defaultdict(list)
+    for row in rows:
+        if row["FooterHash"]:
+            groups[row["FooterHash"]].append(row["File"])
+    return [
+        {"Count": len(files), "FooterHash": digest, "Files": files}
+        for digest, files in sorted(groups.items(), key=lambda g: (-len(g[1]), g[0]))
+    ]
+
+def _write_csv(path: Path, columns: list[str], rows: Iterable[dict]) -> None:
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, quoting=csv.QUOTE_ALL, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+def audit_site(pages: Iterable[tuple[str, str]], jobs: int = 1, out_dir: Path = AUDIT_DIR) -> list[dict]:
+    """Audit (rel, html) pages and write the reports. Returns one row per page, sorted by file."""
+    rows: list[dict] = []
+    render_all(list(pages), audit_page, rows.append, jobs=jobs)
+    rows.sort(key=lambda r: r["File"])
+    footers = footer_groups(rows)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    _write_csv(out_dir / "site-audit.csv", SITE_AUDIT_COLUMNS, rows)
+    _write_csv(out_dir / "city-issues.csv", CITY_ISSUE_COLUMNS,
+               (r for r in rows if r["File"].startswith("service-areas/")))
+    _write_csv(out_dir / "footer-fingerprint.csv", FOOTER_COLUMNS,
+               ({**g, "Files": " | ".join(g["Files"])} for g in footers))
+    report = {"pages": rows, "footers": footers, "issues": issue_counts(rows)}
+    (out_dir / "site-audit.json").write_text(json.dumps(report, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+    return rows
+
+def issue_counts(rows: list[dict]) -> dict[str, int]:
+    return {c: sum(1 for r in rows if r[c]) for c in ISSUE_COLUMNS}
+
+def failures(rows: list[dict], columns: list[str]) -> list[tuple[str, str]]:
+    """(file, column) for every indexable page with one of the given issues."""
+    return [(r["File"], c) for r in rows if not r["Noindex"] for c in columns if r[c]]
+
+def print_summary(rows: list[dict]) -> None:
+    counts = {c: n for c, n in issue_counts(rows).items() if n}
+    issues = ", ".join(f"{c} {n}" for c, n in counts.items()) or "no issues"
+    print(f"  {len(rows)} pages audited: {issues}")
+    print(f"  Reports: {AUDIT_DIR.relative_to(SITE_ROOT)}/site-audit.csv, city-issues.csv, "
+          "footer-fingerprint.csv, site-audit.json")
+
+def main() -> None:
+    from pipeline import discover_pages
+
+    parser = argparse.ArgumentParser(description="Audit every built page for SEO/content issues.")
+    parser.add_argument("--jobs", type=int, default=default_jobs(), help="scan pages across N worker processes")
+    parser.add_argument("--fail-on", action="append", default=[], choices=ISSUE_COLUMNS, metavar="COLUMN",
+                        help="exit 1 if any indexable page has this issue (repeatable)")
+    args = parser.parse_args()
+
+    pages = [(rel, p.source) for rel, p in discover_pages().items()
+             if p.source is not None and "template" not in Path(rel).name.lower()]
+    rows = audit_site(pages, jobs=args.jobs)
+    print_summary(rows)
+
+    failing = failures(rows, args.fail_on)
+    for rel, column in failing:
+        print(f"FAIL {column}: {rel}")
+    if failing:
+        raise SystemExit(f"Audit failed: {len(failing)} issue(s).")
+
+if __name__ == "__main__":
+    main()
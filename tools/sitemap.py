@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Write sitemap.xml from the built pages, with a real <lastmod> per URL.
+
+Each page's lastmod is the date its content last changed: the hash of what a
+crawler indexes (the <body>, minus scripts and styles) is stored with the
+date in data/sitemap-lastmod.json, and the date only moves when the hash
+does. Rebuilding an unchanged page, or re-fingerprinting the stylesheet,
+leaves it alone.
+
+Pages marked noindex are left out. Past the protocol limits (50,000 URLs or
+50 MB per file) the URLs are split into sitemap-1.xml, sitemap-2.xml, ... and
+sitemap.xml becomes a sitemap index, so robots.txt keeps pointing at the
+same file. Its .gz sidecar, like every other, is written by
+tools/compress_assets.py.
+
+Usage (standalone; tools/build.py runs this after the pages are built):
+  python tools/sitemap.py
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from datetime import date
+from pathlib import Path
+from typing import Iterable
+from xml.sax.saxutils import escape
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+BASE_URL = "https://iowagutterguards.online"
+SITEMAP = "sitemap.xml"
+SHARD = "sitemap-{n}.xml"
+STATE_PATH = SITE_ROOT / "data" / "sitemap-lastmod.json"
+
+# Sitemap protocol limits per file.
+MAX_URLS = 50_000
+MAX_BYTES = 50 * 1024 * 1024
+
+PRIORITIES = {
+    "/": "1.0",
+    "/warranty/": "0.7",
+    "/customer-service/": "0.6",
+    "/privacy-policy/": "0.3",
+    "/terms-of-service/": "0.3",
+}
+CITY_PRIORITY = "0.8"
+DEFAULT_PRIORITY = "0.5"
+
+NOINDEX_RE = re.compile(r"""<meta[^>]+name=["']robots["'][^>]*content=["'][^"']*noindex""", re.I)
+BODY_RE = re.compile(r"<body\b.*?</body>", re.I | re.S)
+SCRIPT_STYLE_RE = re.compile(r"<(script|style)\b.*?</\1\s*>", re.I | re.S)
+
+URLSET_OPEN = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_CLOSE = "</urlset>\n"
+INDEX_OPEN = '<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+INDEX_CLOSE = "</sitemapindex>\n"
+
+def page_url(rel: str) -> str:
+    if rel == "index.html":
+        return "/"
+    if rel.endswith("/index.html"):
+        return "/" + rel[:-len("index.html")]
+    return "/" + rel
+
+def priority(url: str) -> str:
+    if url.startswith("/service-areas/"):
+        return CITY_PRIORITY
+    return PRIORITIES.get(url, DEFAULT_PRIORITY)
+
+def content_hash(html: str) -> str:
+    """Hash of what a crawler indexes; asset URLs in <head> and script edits don't count."""
+    m = BODY_RE.search(html)
+    body = SCRIPT_STYLE_RE.sub("", m.group() if m else html)
+    return hashlib.sha256(" ".join(body.split()).encode("utf-8")).hexdigest()
+
+def url_entry(url: str, lastmod: str) -> str:
+    return (f"  <url>\n    <loc>{escape(BASE_URL + url)}</loc>\n    <lastmod>{lastmod}</lastmod>\n"
+            f"    <priority>{priority(url)}</priority>\n  </url>\n")
+
+def shard(entries: list[str], max_urls: int = MAX_URLS, max_bytes: int = MAX_BYTES) -> list[list[str]]:
+    budget = max_bytes - len(URLSET_OPEN) - len(URLSET_CLOSE)
+    shards: list[list[str]] = [[]]
+    size = 0
+    for entry in entries:
+        if len(shards[-1]) >= max_urls or (shards[-1] and size + len(entry.encode("utf-8")) > budget):
+            shards.append([])
+            size = 0
+        shards[-1].append(entry)
+        size += len(entry.encode("utf-8"))
+    return shards
+
+def _write(rel: str, text: str) -> None:
+    data = text.encode("utf-8")
+    path = SITE_ROOT / rel
+    if not path.is_file() or path.read_bytes() != data:
+        path.write_bytes(data)
+
+def write_sitemap(pages: Iterable[tuple[str, str]], today: str | None = None,
+                  max_urls: int = MAX_URLS, max_bytes: int = MAX_BYTES) -> dict:
+    """Write sitemap.xml (and shards) for (rel, html) pages. Returns a summary."""
+    today = today or date.today().isoformat()
+    state = json.loads(STATE_PATH.read_text(encoding="utf-8")) if STATE_PATH.is_file() else {}
+
+    new_state, changed = {}, []
+    for rel, html in sorted(pages, key=lambda p: page_url(p[0])):
+        if NOINDEX_RE.search(html):
+            continue
+        url = page_url(rel)
+        digest = content_hash(html)
+        prev = state.get(url)
+        if prev is not None and prev["sha256"] == digest:
+            new_state[url] = prev
+        else:
+            new_state[url] = {"sha256": digest, "lastmod": today}
+            changed.append(url)
+
+    entries = [url_entry(url, rec["lastmod"]) for url, rec in new_state.items()]
+    shards = shard(entries, max_urls, max_bytes)
+    old_shards = sorted(SITE_ROOT.glob(SHARD.format(n="*")))
+    if len(shards) == 1:
+        _write(SITEMAP, URLSET_OPEN + "".join(entries) + URLSET_CLOSE)
+        written = [SITEMAP]
+    else:
+        index = []
+        written = []
+        for n, urls in enumerate(shards, 1):
+            rel = SHARD.format(n=n)
+            _write(rel, URLSET_OPEN + "".join(urls) + URLSET_CLOSE)
+            lastmod = max(re.findall(r"<lastmod>([^<]+)</lastmod>", "".join(urls)))
+            index.append(f"  <sitemap>\n    <loc>{BASE_URL}/{rel}</loc>\n    <lastmod>{lastmod}</lastmod>\n  </sitemap>\n")
+            written.append(rel)
+        _write(SITEMAP, INDEX_OPEN + "".join(index) + INDEX_CLOSE)
+        written.insert(0, SITEMAP)
+
+    # Shards from a bigger site that are no longer listed.
+    for path in old_shards:
+        if path.name not in written:
+            path.unlink()
+
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    STATE_PATH.write_text(json.dumps(new_state, indent=1) + "\n", encoding="utf-8")
+    return {"urls": len(new_state), "changed": changed, "files": written}
+
+def print_report(summary: dict) -> None:
+    files = ", ".join(summary["files"])
+    print(f"  {summary['urls']} URLs in {files}; lastmod moved for {len(summary['changed'])}")
+
+def main() -> None:
+    from pipeline import discover_pages
+
+    pages = [(rel, p.source) for rel, p in discover_pages().items()
+             if p.source is not None and "template" not in Path(rel).name.lower()]
+    print_report(write_sitemap(pages))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Compiled {{PLACEHOLDER}} templates (city-template.html).
+
+A template is parsed once into literal segments and placeholder slots, so
+rendering a page is a single "".join over the output pieces instead of one
+full-string copy per str.replace(). Compiled templates are memoized in-process
+and cached on disk under .build-cache/templates/, keyed by the template hash.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+SITE_ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = SITE_ROOT / ".build-cache" / "templates"
+
+PLACEHOLDER_RE = re.compile(r"\{\{([A-Z0-9_]+)\}\}")
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    # segments[i] is the literal text before slots[i]; segments[-1] follows the last slot.
+    segments: tuple[str, ...]
+    slots: tuple[str, ...]
+
+    @property
+    def placeholders(self) -> frozenset[str]:
+        return frozenset(self.slots)
+
+    def render(self, values: dict[str, str]) -> str:
+        missing = self.placeholders.difference(values)
+        if missing:
+            raise ValueError(f"No value for template placeholder(s): {', '.join(sorted(missing))}")
+        parts = [""] * (len(self.segments) + len(self.slots))
+        parts[0::2] = self.segments
+        parts[1::2] = [values[name] for name in self.slots]
+        return "".join(parts)
+
+@lru_cache(maxsize=8)
+def compile_template(text: str) -> CompiledTemplate:
+    segments = []
+    slots = []
+    pos = 0
+    for m in PLACEHOLDER_RE.finditer(text):
+        segments.append(text[pos:m.start()])
+        slots.append(m.group(1))
+        pos = m.end()
+    segments.append(text[pos:])
+    return CompiledTemplate(tuple(segments), tuple(slots))
+
+def load_template(path: str | Path, cache_dir: Path = CACHE_DIR) -> CompiledTemplate:
+    """Read and compile a template file, reusing the on-disk compile cache when the file is unchanged."""
+    text = Path(path).read_text(encoding="utf-8")
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    cache_file = cache_dir / f"{digest}.json"
+
+    if cache_file.is_file():
+        data = json.loads(cache_file.read_text(encoding="utf-8"))
+        return CompiledTemplate(tuple(data["segments"]), tuple(data["slots"]))
+
+    compiled = compile_template(text)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    payload = {"segments": compiled.segments, "slots": compiled.slots}
+    cache_file.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    return compiled
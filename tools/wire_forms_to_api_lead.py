@@ -4,7 +4,9 @@ from __future__ import annotations
 import re
 from pathlib import Path
 
-ROOT = Path(".").resolve()
+from html_index import HtmlIndex
+
+ROOT = Path(__file__).resolve().parents[1]
 SKIP_DIRS = {".git", "node_modules", ".next", "dist", "build", ".cache"}
 
 def skippable(p: Path) -> bool:
@@ -56,13 +58,15 @@ def patch_form_open_tag(open_tag: str) -> str:
     t = t.replace(" >", ">")
     return t
 
-def ensure_honeypot_after_open(html: str, open_tag: str) -> str:
+def ensure_honeypot_after_open(html: str, insert_at: int) -> str:
     # If honeypot already exists, do nothing
     if re.search(r'name\s*=\s*(["\'])website\1', html, flags=re.I):
         return html
-    return html.replace(open_tag, open_tag + "\n" + HONEYPOT_HTML + "\n", 1)
+    return html[:insert_at] + "\n" + HONEYPOT_HTML + "\n" + html[insert_at:]
+
+SEND_BUTTON_RE = re.compile(r'<button[^>]+type\s*=\s*(["\'])submit\1[^>]*>\s*Send my info\s*</button>', re.I)
 
-def looks_like_our_lead_form(open_tag: str, html: str) -> bool:
+def looks_like_our_lead_form(open_tag: str, form_html: str) -> bool:
     # Primary match: the exact mailto/onsubmit style you currently have
     if "mailto:" in open_tag.lower():
         return True
@@ -71,7 +75,22 @@ def looks_like_our_lead_form(open_tag: str, html: str) -> bool:
 
     # Fallback: if the form contains a submit button "Send my info", treat it as the lead form
     # (Your scan shows that button everywhere.)
-    return bool(re.search(r'<button[^>]+type\s*=\s*(["\'])submit\1[^>]*>\s*Send my info\s*</button>', html, flags=re.I))
+    return bool(SEND_BUTTON_RE.search(form_html))
+
+def wire_lead_form(html: str) -> str:
+    # Patch the first form that looks like the lead form (on your site, it's the first form).
+    form = next(
+        (f for f in HtmlIndex(html).by_tag("form") if looks_like_our_lead_form(f.open_tag(html), f.outer(html))),
+        None,
+    )
+    if form is None:
+        return html
+
+    open_tag = form.open_tag(html)
+    new_open = patch_form_open_tag(open_tag)
+    html = html[:form.start] + new_open + html[form.open_end:]
+    # Even if tag already matches, still ensure honeypot exists
+    return ensure_honeypot_after_open(html, form.start + len(new_open))
 
 def main() -> None:
     pages = []
@@ -87,42 +106,17 @@ def main() -> None:
             continue
 
         scanned += 1
-        html = p.read_text(encoding="utf-8", errors="replace")
-        html = normalize_newlines(html)
+        original = p.read_text(encoding="utf-8", errors="replace")
+        html = normalize_newlines(original)
 
-        m = FORM_OPEN_RE.search(html)
-        if not m:
+        if not FORM_OPEN_RE.search(html):
             continue
-
-        open_tag = m.group(0)
         forms_seen += 1
 
-        # Only patch pages where the first form looks like the lead form
-        # (On your site, it does.)
-        if not looks_like_our_lead_form(open_tag, html):
-            # Try to find ANY form tag that matches mailto/handleSubmit
-            found = None
-            for fm in FORM_OPEN_RE.finditer(html):
-                tag = fm.group(0)
-                if looks_like_our_lead_form(tag, html):
-                    found = tag
-                    break
-            if not found:
-                continue
-            open_tag = found
-
-        new_open = patch_form_open_tag(open_tag)
-        if new_open != open_tag:
-            html = html.replace(open_tag, new_open, 1)
-            html = ensure_honeypot_after_open(html, new_open)
-            write_utf8_lf(p, html)
+        new_html = wire_lead_form(html)
+        if new_html != html:
+            write_utf8_lf(p, new_html)
             updated += 1
-        else:
-            # Even if tag already matches, still ensure honeypot exists
-            html2 = ensure_honeypot_after_open(html, open_tag)
-            if html2 != html:
-                write_utf8_lf(p, html2)
-                updated += 1
 
     print(f"OK: scanned {scanned} pages; updated {updated} pages. (Forms examined: {forms_seen})")
     print("Expected result: every lead form now POSTs to /api/lead (no mailto, no onsubmit handler).")